@@ -0,0 +1,183 @@
+"""Hot path benchmark
+Times the request preparation (prepare_request, _check_args), response_builder with each data handler and the
+handlers' data_extraction alone, on synthetic payloads of 100, 5000 and 10000 coins and on recorded bodies, and
+reports the median time and the peak allocations. Runs offline. --save writes the results, --compare fails (exit
+1) when a case got slower or allocates more than in a saved run, so regressions show up in review.
+
+Usage:
+        python src/benchmarks/bench_handlers.py --sizes 100 5000 10000 --repeat 5 --save baseline.json
+        python src/benchmarks/bench_handlers.py --compare baseline.json --max-slowdown 1.5
+        python src/benchmarks/bench_handlers.py --recorded recorded_listing.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+from cmc_api import cmc_utils  # noqa: E402
+from cmc_api.cmc_datahandler import (  # noqa: E402
+    HandlerDataDict,
+    HandlerDataList,
+    HandlerDataNestedDataKey,
+    HandlerDataSingleDict,
+)
+from cmc_api.cmc_helper import Cryptocurrency, Urls  # noqa: E402
+
+# handler: payload of the endpoints it is used for
+HANDLER_PAYLOADS = {
+    HandlerDataList: fixtures.make_listing,
+    HandlerDataDict: fixtures.make_quotes,
+    HandlerDataNestedDataKey: fixtures.make_nested,
+    HandlerDataSingleDict: fixtures.make_category,
+}
+LISTING_PARAMS = {
+    "start": 1,
+    "limit": 5000,
+    "convert": "USD,BTC",
+    "sort": "market_cap",
+    "sort_dir": "desc",
+    "cryptocurrency_type": "all",
+    "tag": "all",
+    "aux": "num_market_pairs,cmc_rank,date_added,tags,platform,max_supply,circulating_supply,total_supply",
+    "unknown": "dropped by _check_args",
+}
+
+
+def measure(function: Callable[[], object], repeat: int, number: int = 1) -> dict:
+    """Median milliseconds of one call and peak MiB allocated by one call"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start) / number)
+    gc.collect()
+    tracemalloc.start()
+    result = function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"ms": statistics.median(times) * 1000, "peak_mib": peak / 2**20}
+
+
+def handler_for(payload: dict):
+    """Handler matching the shape of a recorded body"""
+    data = payload["data"]
+    if isinstance(data, list):
+        return HandlerDataList
+    if isinstance(data.get("data"), list):
+        return HandlerDataNestedDataKey
+    if data and all(isinstance(value, dict) for value in data.values()):
+        return HandlerDataDict
+    return HandlerDataSingleDict
+
+
+def handler_cases(name: str, handler, body: bytes) -> dict:
+    """response_builder on the body, and data_extraction alone on the parsed payload"""
+    payload = json.loads(body)
+    return {
+        f"response_builder {handler.__name__} {name}": lambda: handler.response_builder(
+            body, handler.data_extraction
+        ),
+        # the handlers don't copy the payload, a fresh one is not needed per call
+        f"data_extraction {handler.__name__} {name}": lambda: handler.data_extraction(
+            payload
+        ),
+    }
+
+
+def cases(sizes: list[int], recorded: list[str]) -> dict:
+    """Name: function of every case"""
+    url = Urls.BASE.value
+    endpoint_args = Cryptocurrency.LATEST_LIST_PRICE.value[1]
+    found = {
+        "prepare_request listing": lambda: cmc_utils.prepare_request(
+            url, Cryptocurrency.LATEST_LIST_PRICE, LISTING_PARAMS
+        ),
+        "_check_args listing": lambda: cmc_utils._check_args(
+            endpoint_args, LISTING_PARAMS
+        ),
+    }
+    for size in sizes:
+        for handler, make_payload in HANDLER_PAYLOADS.items():
+            body = json.dumps(make_payload(size)).encode("utf-8")
+            found.update(handler_cases(f"{size} coins", handler, body))
+    for path in recorded:
+        with open(file=path, mode="rb") as file:
+            body = file.read()
+        handler = handler_for(json.loads(body))
+        found.update(handler_cases(os.path.basename(path), handler, body))
+    return found
+
+
+def run(sizes: list[int], repeat: int, recorded: list[str] = ()) -> dict:
+    """Results of every case: {name: {"ms": median, "peak_mib": peak}}"""
+    results = {}
+    for name, function in cases(sizes, list(recorded)).items():
+        # the cases that take microseconds are timed over many calls
+        if name.startswith(("prepare_request", "_check_args")):
+            number = 1000
+        elif name.startswith("data_extraction"):
+            number = 100
+        else:
+            number = 1
+        results[name] = measure(function, repeat, number)
+    return results
+
+
+def compare(results: dict, baseline: dict, max_slowdown: float) -> list[str]:
+    """Cases slower than max_slowdown times, or allocating 10% more than, the baseline"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        # a few microseconds of jitter are not a regression
+        if result["ms"] > before["ms"] * max_slowdown + 0.005:
+            regressions.append(f"{name}: {before['ms']:.3f} -> {result['ms']:.3f} ms")
+        if result["peak_mib"] > before["peak_mib"] * 1.1 + 0.01:
+            regressions.append(
+                f"{name}: {before['peak_mib']:.2f} -> {result['peak_mib']:.2f} MiB"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 5000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--recorded", nargs="*", default=[])
+    parser.add_argument("--save", default=None)
+    parser.add_argument("--compare", default=None)
+    parser.add_argument("--max-slowdown", type=float, default=1.5)
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, args.recorded)
+    print(f"  {'case':<58} {'median ms':>10} {'peak MiB':>10}")
+    for name, result in results.items():
+        print(f"  {name:<58} {result['ms']:>10.3f} {result['peak_mib']:>10.2f}")
+
+    if args.save:
+        with open(file=args.save, mode="w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(file=args.compare, mode="r", encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.max_slowdown)
+        for regression in regressions:
+            print(f"  regression {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
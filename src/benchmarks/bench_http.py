@@ -0,0 +1,176 @@
+"""HTTP settings benchmark
+Sends the same listing requests with each cmc_http.HttpConfig setting (compression, keep-alive, pool size and
+blocking, HTTP/2) and reports the bytes on the wire per request, the connections opened, the throughput and the
+latency percentiles. By default it runs against mock_server.py, which counts the bytes it sends, with a simulated
+bandwidth so the size of the bodies shows in the latency. With --url it runs against a real server (TLS, HTTP/2),
+the bytes on the wire are then not known, except from h2_server.py which serves the mock answers over TLS and
+HTTP/2, its certificate is trusted with --ca-file.
+
+Usage:
+        python src/benchmarks/bench_http.py --requests 200 --workers 16 --coins 1000 --bandwidth-mbps 50
+        python src/benchmarks/bench_http.py --url https://sandbox-api.coinmarketcap.com --api-key KEY --coins 100
+        python src/benchmarks/bench_http.py --url https://localhost:8443 --ca-file cert.pem --coins 1000
+"""
+
+import argparse
+import json
+import os
+import ssl
+import statistics
+import sys
+import time
+from urllib import request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import bench_load  # noqa: E402
+from cmc_api import cmc, cmc_http  # noqa: E402
+
+
+def settings(
+    workers: int, https: bool, ssl_context: ssl.SSLContext | None = None
+) -> dict:
+    """Name: HttpConfig of every setting measured, br and HTTP/2 when their libraries are installed"""
+    small_pool = max(1, workers // 4)
+    found = {
+        "identity": cmc_http.HttpConfig(compression="identity"),
+        "gzip": cmc_http.HttpConfig(compression="gzip"),
+        "gzip, no keep-alive": cmc_http.HttpConfig(
+            compression="gzip", keep_alive=False
+        ),
+        f"gzip, pool {small_pool} blocking": cmc_http.HttpConfig(
+            compression="gzip", pool_maxsize=small_pool, pool_block=True
+        ),
+    }
+    if cmc_http._installed("brotli") or cmc_http._installed("brotlicffi"):
+        found["br"] = cmc_http.HttpConfig(compression="br")
+    # httpx negotiates HTTP/2 with TLS only, over http it would measure HTTP/1.1
+    if https and cmc_http._installed("httpx", "h2"):
+        found["gzip, http2"] = cmc_http.HttpConfig(compression="gzip", http2=True)
+    for config in found.values():
+        config.ssl_context = ssl_context
+    return found
+
+
+def server_stats(url: str, ssl_context: ssl.SSLContext | None = None) -> dict | None:
+    """Counters of mock_server.py or h2_server.py, None for another server"""
+    try:
+        with request.urlopen(
+            f"{url}/_stats", timeout=5, context=ssl_context
+        ) as response:
+            return json.load(response)
+    except (OSError, ValueError):
+        return None
+
+
+def measure(
+    url: str,
+    api_key: str,
+    config: cmc_http.HttpConfig,
+    requests: int,
+    limit: int,
+    workers: int,
+    stats_context: ssl.SSLContext | None = None,
+) -> dict:
+    """Send the requests from workers threads with config, stats_context is the TLS context of /_stats"""
+    client = cmc.Cmc(
+        url=url,
+        api_key=api_key,
+        startup="lazy",
+        single_flight=False,
+        max_workers=workers,
+        http_config=config,
+    )
+
+    def call(start):
+        started = time.perf_counter()
+        response = client.get_listing(start, limit)
+        return time.perf_counter() - started, "data" in response
+
+    before = server_stats(url, stats_context)
+    wall = time.perf_counter()
+    results = [
+        result.value
+        for result in client.map([(call, start) for start in range(1, requests + 1)])
+    ]
+    wall = time.perf_counter() - wall
+    after = server_stats(url, stats_context)
+    client.request_session.close()
+    latencies = [seconds * 1000 for seconds, _ in results]
+    measured = {
+        "requests": len(results),
+        "errors": sum(1 for _, ok in results if not ok),
+        "throughput": len(results) / wall,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": bench_load.percentile(latencies, 95),
+        "kib_per_request": None,
+        "connections": None,
+    }
+    if before is not None and after is not None:
+        measured["kib_per_request"] = (
+            (after["bytes_sent"] - before["bytes_sent"]) / len(results) / 2**10
+        )
+        # the connection of the second /_stats request is counted in after
+        measured["connections"] = after["connections"] - before["connections"] - 1
+    return measured
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--coins", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--bandwidth-mbps", type=float, default=50.0)
+    parser.add_argument("--url", default=None, help="use a running server")
+    parser.add_argument("--api-key", default="bench")
+    parser.add_argument("--ca-file", default=None, help="certificate of a https --url")
+    args = parser.parse_args()
+    args.rate_429 = 0.0
+    ssl_context = stats_context = None
+    if args.ca_file:
+        ssl_context = ssl.create_default_context(cafile=args.ca_file)
+        # urllib offers no ALPN protocol with a given context, h2_server.py would then answer in HTTP/2
+        stats_context = ssl.create_default_context(cafile=args.ca_file)
+        stats_context.set_alpn_protocols(["http/1.1"])
+
+    if args.url:
+        server, url = None, args.url
+    else:
+        server, url = bench_load.start_server(
+            args, "--bandwidth-mbps", str(args.bandwidth_mbps)
+        )
+    try:
+        print(
+            f"{args.requests} listing requests of {args.coins} coins from {args.workers} threads to {url}"
+        )
+        print(
+            f"  {'setting':<24} {'KiB/req':>8} {'conns':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>6}"
+        )
+        for name, config in settings(
+            args.workers, url.startswith("https"), ssl_context
+        ).items():
+            result = measure(
+                url,
+                args.api_key,
+                config,
+                args.requests,
+                args.coins,
+                args.workers,
+                stats_context,
+            )
+            size = result["kib_per_request"]
+            connections = result["connections"]
+            print(
+                f"  {name:<24} {'-' if size is None else f'{size:.1f}':>8} "
+                f"{'-' if connections is None else connections:>6} {result['throughput']:>8.1f} "
+                f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['errors']:>6}"
+            )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Import-time benchmark
+Imports the package in fresh interpreters and reports the wall time, the heavy modules pulled in and the side
+effects (log folder, handlers). Exits with 1 when --max-ms is exceeded or a heavy module is imported, so it can
+guard regressions in CI.
+
+Usage:
+        python src/benchmarks/bench_import.py --runs 20 --max-ms 60
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported when they are used
+HEAVY_MODULES = [
+    "requests",
+    "urllib3",
+    "asyncio",
+    "aiohttp",
+    "sqlite3",
+    "concurrent.futures",
+    "numpy",
+    "httpx",
+]
+
+PROBE = """
+import json, logging, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "ms": elapsed * 1000,
+    "heavy": [name for name in {heavy!r} if name in sys.modules],
+    "handlers": sum(len(logging.getLogger(name).handlers) for name in ("utils", "cmc_api.cmc_utils")),
+}}))
+"""
+
+
+def probe(module: str) -> dict:
+    """Import the module in a new interpreter, inside an empty working directory"""
+    with tempfile.TemporaryDirectory() as parent:
+        cwd = os.path.join(parent, "work")
+        os.mkdir(cwd)
+        env = {**os.environ, "PYTHONPATH": SRC_DIR}
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=cwd,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output)
+        result["created"] = sorted(os.listdir(parent) + os.listdir(cwd))
+        result["created"].remove("work")
+        return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="cmc_api.cmc")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    results = [probe(args.module) for _ in range(args.runs)]
+    times = [result["ms"] for result in results]
+    last = results[-1]
+    print(f"import {args.module}: {args.runs} runs")
+    print(f"  median {statistics.median(times):.1f} ms, min {min(times):.1f} ms")
+    print(f"  heavy modules: {last['heavy'] or 'none'}")
+    print(f"  log handlers: {last['handlers']}, files created: {last['created']}")
+
+    failed = bool(last["heavy"] or last["handlers"] or last["created"])
+    if args.max_ms is not None and statistics.median(times) > args.max_ms:
+        print(f"  median above the {args.max_ms} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
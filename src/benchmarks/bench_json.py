@@ -0,0 +1,75 @@
+"""JSON backend benchmark
+Compares parse time and peak memory of the available backends on listing payloads, parsing the body bytes
+directly against the former path (bytes decoded to str, then stdlib json.loads).
+
+Usage:
+        python src/benchmarks/bench_json.py --sizes 100 5000 10000 --repeat 5
+"""
+
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+from cmc_api import cmc_datahandler  # noqa: E402
+
+
+def _text_then_json(body: bytes):
+    """Path used before the change: response.text then json.loads"""
+    import json
+
+    return json.loads(body.decode("utf-8"))
+
+
+def backends() -> dict:
+    """Parsers to compare, the ones not installed are skipped"""
+    found = {"text + json (old)": _text_then_json}
+    for name in cmc_datahandler.JSON_BACKENDS:
+        try:
+            found[f"bytes + {name}"] = cmc_datahandler.select_json_backend(name)
+        except ImportError:
+            print(f"{name} is not installed, skipped")
+    return found
+
+
+def measure(loads, body: bytes, repeat: int) -> tuple[float, float]:
+    """Median seconds and peak MiB allocated while parsing"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        loads(body)
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    result = loads(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return statistics.median(times), peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 5000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    parsers = backends()
+    for size in args.sizes:
+        body = fixtures.make_listing_bytes(size)
+        print(f"\nlisting of {size} coins, body {len(body) / 2**20:.2f} MiB")
+        print(f"  {'backend':<20} {'median ms':>10} {'peak MiB':>10}")
+        for name, loads in parsers.items():
+            seconds, peak = measure(loads, body, args.repeat)
+            print(f"  {name:<20} {seconds * 1000:>10.2f} {peak:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
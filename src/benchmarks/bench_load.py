@@ -0,0 +1,226 @@
+"""Load benchmark
+Drives Cmc against the local mock server (mock_server.py) sequentially, on a thread pool (Cmc.map) and with
+asyncio (AsyncCmc), and reports the throughput, the latency percentiles, the CPU use and the peak memory of each
+mode. Every mode runs in a fresh interpreter so the memory figures don't mix, and the server runs in its own
+process so it does not compete for the client's GIL.
+
+Usage:
+        python src/benchmarks/bench_load.py --requests 500 --workers 16 --coins 100 --latency-ms 20
+        python src/benchmarks/bench_load.py --modes threads asyncio --workers 4 16 64 --rate-429 0.01
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SRC_DIR)
+
+MODES = ("sequential", "threads", "asyncio")
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest rank percentile, q in 0 .. 100"""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mib() -> float | None:
+    """Peak resident memory of the process, None where resource is not available"""
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _client_kwargs() -> dict:
+    # distinct requests are sent, coalescing or caching them would measure nothing
+    return {"api_key": "load-test", "save_to_json": False, "single_flight": False}
+
+
+def run_sequential(url: str, requests: int, limit: int, workers: int) -> list:
+    from cmc_api import cmc
+
+    client = cmc.Cmc(url=url, startup="lazy", **_client_kwargs())
+    results = []
+    for start in range(1, requests + 1):
+        started = time.perf_counter()
+        response = client.get_listing(start, limit)
+        results.append((time.perf_counter() - started, "data" in response))
+    return results
+
+
+def run_threads(url: str, requests: int, limit: int, workers: int) -> list:
+    from cmc_api import cmc
+
+    client = cmc.Cmc(url=url, startup="lazy", max_workers=workers, **_client_kwargs())
+
+    def call(start):
+        started = time.perf_counter()
+        response = client.get_listing(start, limit)
+        return time.perf_counter() - started, "data" in response
+
+    return [
+        result.value
+        for result in client.map([(call, start) for start in range(1, requests + 1)])
+    ]
+
+
+def run_asyncio(url: str, requests: int, limit: int, workers: int) -> list:
+    import asyncio
+
+    from cmc_api.cmc_async import AsyncCmc
+
+    async def main():
+        client = AsyncCmc(
+            url=url, max_in_flight=workers, pool_size=workers, **_client_kwargs()
+        )
+
+        # like the pool of the threads mode, the time waited for a slot is not latency
+        slots = asyncio.Semaphore(workers)
+
+        async def call(start):
+            async with slots:
+                started = time.perf_counter()
+                response = await client.get_listing(start, limit)
+                return time.perf_counter() - started, "data" in response
+
+        try:
+            return await asyncio.gather(
+                *(call(start) for start in range(1, requests + 1))
+            )
+        finally:
+            await client.close()
+
+    return list(asyncio.run(main()))
+
+
+RUNNERS = {
+    "sequential": run_sequential,
+    "threads": run_threads,
+    "asyncio": run_asyncio,
+}
+
+
+def measure(mode: str, url: str, requests: int, limit: int, workers: int) -> dict:
+    """Run one mode in this process and summarise it"""
+    wall, cpu = time.perf_counter(), time.process_time()
+    results = RUNNERS[mode](url, requests, limit, workers)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    latencies = [seconds * 1000 for seconds, _ in results]
+    return {
+        "mode": mode,
+        "workers": 1 if mode == "sequential" else workers,
+        "requests": len(results),
+        "errors": sum(1 for _, ok in results if not ok),
+        "seconds": wall,
+        "throughput": len(results) / wall,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "cpu_seconds": cpu,
+        "cpu_percent": 100 * cpu / wall,
+        "peak_rss_mib": peak_rss_mib(),
+    }
+
+
+def start_server(args, *options: str) -> tuple[subprocess.Popen, str]:
+    """The mock server in its own process, returns it and its url, options are more arguments of mock_server.py"""
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(SRC_DIR, "benchmarks", "mock_server.py"),
+            "--latency-ms",
+            str(args.latency_ms),
+            "--rate-429",
+            str(args.rate_429),
+            "--coins",
+            str(args.coins),
+            *options,
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    return server, server.stdout.readline().strip()
+
+
+def run_in_subprocess(
+    mode: str, url: str, requests: int, limit: int, workers: int
+) -> dict:
+    output = subprocess.run(
+        [
+            sys.executable,
+            os.path.abspath(__file__),
+            "--child",
+            mode,
+            "--url",
+            url,
+            "--requests",
+            str(requests),
+            "--coins",
+            str(limit),
+            "--workers",
+            str(workers),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[16])
+    parser.add_argument("--coins", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--url", default=None, help="use a running server")
+    parser.add_argument("--child", choices=MODES, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = measure(
+            args.child, args.url, args.requests, args.coins, args.workers[0]
+        )
+        print(json.dumps(result))
+        return
+
+    server, url = (None, args.url) if args.url else start_server(args)
+    try:
+        print(
+            f"{args.requests} listing requests of {args.coins} coins, "
+            f"server latency {args.latency_ms} ms, 429 rate {args.rate_429}"
+        )
+        print(
+            f"  {'mode':<11} {'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'errors':>6} {'cpu %':>6} {'rss MiB':>8}"
+        )
+        for mode in args.modes:
+            for workers in [1] if mode == "sequential" else args.workers:
+                result = run_in_subprocess(
+                    mode, url, args.requests, args.coins, workers
+                )
+                print(
+                    f"  {mode:<11} {result['workers']:>7} {result['throughput']:>9.1f} "
+                    f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                    f"{result['errors']:>6} {result['cpu_percent']:>6.1f} {result['peak_rss_mib'] or 0:>8.1f}"
+                )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
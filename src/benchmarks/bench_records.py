@@ -0,0 +1,56 @@
+"""Record output benchmark
+Compares the memory kept by the responses built with the dict handlers against HandlerRecords, for the ID map
+and the listing, and the time to build them.
+
+Usage:
+        python src/benchmarks/bench_records.py --sizes 100 5000 10000
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+from cmc_api.cmc_datahandler import HandlerDataList, HandlerRecords  # noqa: E402
+
+
+def measure(handler, body: bytes) -> tuple[float, float]:
+    """Seconds to build the response and MiB still allocated once it is built"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = handler.response_builder(body, handler.data_extraction)
+    seconds = time.perf_counter() - start
+    gc.collect()
+    kept, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del response
+    return seconds, kept / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 5000, 10000])
+    args = parser.parse_args()
+
+    payloads = {"map": fixtures.make_id_map, "listing": fixtures.make_listing}
+    for size in args.sizes:
+        print(f"\n{size} coins")
+        print(f"  {'endpoint':<10} {'handler':<16} {'build ms':>10} {'kept MiB':>10}")
+        for endpoint, make_payload in payloads.items():
+            body = json.dumps(make_payload(size)).encode("utf-8")
+            for handler in (HandlerDataList, HandlerRecords):
+                seconds, kept = measure(handler, body)
+                print(
+                    f"  {endpoint:<10} {handler.__name__:<16} {seconds * 1000:>10.2f} {kept:>10.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Streaming parse benchmark
+Peak memory and time of parsing a listing body at once (json.loads then HandlerDataList) against the streaming
+parser fed in CHUNK_SIZE chunks, the items are consumed and dropped one by one.
+
+Usage:
+        python src/benchmarks/bench_stream.py --sizes 100 5000 10000
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+from cmc_api import cmc_stream  # noqa: E402
+from cmc_api.cmc_datahandler import HandlerDataList  # noqa: E402
+
+
+def full_parse(body: bytes) -> int:
+    response = HandlerDataList.response_builder(body, HandlerDataList.data_extraction)
+    return sum(1 for _ in response["data"])
+
+
+def streamed_parse(body: bytes) -> int:
+    chunks = (
+        body[i : i + cmc_stream.CHUNK_SIZE]
+        for i in range(0, len(body), cmc_stream.CHUNK_SIZE)
+    )
+    return sum(1 for _ in cmc_stream.StreamedResponse(chunks))
+
+
+def measure(parse, body: bytes) -> tuple[float, float]:
+    """Seconds and peak MiB allocated while parsing, the body itself is not counted"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    parse(body)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 5000, 10000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        body = fixtures.make_listing_bytes(size)
+        print(f"\nlisting of {size} coins, body {len(body) / 2**20:.2f} MiB")
+        print(f"  {'mode':<10} {'ms':>10} {'peak MiB':>10}")
+        for name, parse in (("full", full_parse), ("streamed", streamed_parse)):
+            seconds, peak = measure(parse, body)
+            print(f"  {name:<10} {seconds * 1000:>10.2f} {peak:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
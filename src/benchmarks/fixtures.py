@@ -0,0 +1,316 @@
+"""Synthetic payloads shaped like the API responses, used by the benchmarks"""
+
+import json
+import random
+
+from cmc_api.cmc_datahandler import HandlerDataList
+
+TIMESTAMP = "2022-06-04T04:26:55.117Z"
+
+
+def _status(credit_count: int = 1) -> dict:
+    return {
+        "timestamp": TIMESTAMP,
+        "error_code": 0,
+        "error_message": None,
+        "elapsed": 10,
+        "credit_count": credit_count,
+        "notice": None,
+    }
+
+
+def _quote(rng: random.Random) -> dict:
+    price = rng.uniform(0.0001, 50000)
+    return {
+        "USD": {
+            "price": price,
+            "volume_24h": rng.uniform(0, 1e10),
+            "volume_change_24h": rng.uniform(-100, 100),
+            "percent_change_1h": rng.uniform(-10, 10),
+            "percent_change_24h": rng.uniform(-30, 30),
+            "percent_change_7d": rng.uniform(-50, 50),
+            "percent_change_30d": rng.uniform(-80, 80),
+            "percent_change_60d": rng.uniform(-90, 90),
+            "percent_change_90d": rng.uniform(-95, 95),
+            "market_cap": price * rng.uniform(1e3, 1e9),
+            "market_cap_dominance": rng.uniform(0, 50),
+            "fully_diluted_market_cap": price * rng.uniform(1e3, 2e9),
+            "tvl": None,
+            "last_updated": TIMESTAMP,
+        }
+    }
+
+
+def make_coin(cmc_id: int, rng: random.Random) -> dict:
+    """One coin as returned by /v1/cryptocurrency/listings/latest with the default aux fields"""
+    symbol = f"C{cmc_id}"
+    return {
+        "id": cmc_id,
+        "name": f"Coin {cmc_id}",
+        "symbol": symbol,
+        "slug": f"coin-{cmc_id}",
+        "num_market_pairs": rng.randint(1, 10000),
+        "date_added": "2013-04-28T00:00:00.000Z",
+        "tags": ["mineable", "pow", "sha-256", "store-of-value"][: rng.randint(0, 4)],
+        "max_supply": rng.choice([None, 21000000]),
+        "circulating_supply": rng.uniform(1e3, 1e12),
+        "total_supply": rng.uniform(1e3, 1e12),
+        "platform": rng.choice(
+            [
+                None,
+                {
+                    "id": 1027,
+                    "name": "Ethereum",
+                    "symbol": "ETH",
+                    "slug": "ethereum",
+                    "token_address": "0x" + "%040x" % rng.getrandbits(160),
+                },
+            ]
+        ),
+        "cmc_rank": cmc_id,
+        "self_reported_circulating_supply": None,
+        "self_reported_market_cap": None,
+        "tvl_ratio": None,
+        "last_updated": TIMESTAMP,
+        "quote": _quote(rng),
+    }
+
+
+def make_listing(size: int, seed: int = 1) -> dict:
+    """Payload of /v1/cryptocurrency/listings/latest with size coins"""
+    rng = random.Random(seed)
+    return {
+        "status": _status(credit_count=1 + size // 200),
+        "data": [make_coin(cmc_id, rng) for cmc_id in range(1, size + 1)],
+    }
+
+
+def make_listing_bytes(size: int, seed: int = 1) -> bytes:
+    """Body of /v1/cryptocurrency/listings/latest, as received from the network"""
+    return json.dumps(make_listing(size, seed)).encode("utf-8")
+
+
+def listing_response(size: int, timestamp: str, seed: int = 1) -> dict:
+    """Listing with size coins at timestamp, as returned by Cmc.get_listing"""
+    payload = make_listing(size, seed)
+    payload["status"]["timestamp"] = timestamp
+    metadata, data = HandlerDataList.data_extraction(payload)
+    return {"metadata": metadata, "data": data}
+
+
+def make_map_entry(cmc_id: int, rng: random.Random) -> dict:
+    """One coin as returned by /v1/cryptocurrency/map with the default aux fields"""
+    return {
+        "id": cmc_id,
+        "rank": cmc_id,
+        "name": f"Coin {cmc_id}",
+        "symbol": f"C{cmc_id}",
+        "slug": f"coin-{cmc_id}",
+        "is_active": 1,
+        "first_historical_data": "2013-04-28T18:47:21.000Z",
+        "last_historical_data": TIMESTAMP,
+        "platform": rng.choice(
+            [
+                None,
+                {
+                    "id": 1027,
+                    "name": "Ethereum",
+                    "symbol": "ETH",
+                    "slug": "ethereum",
+                    "token_address": "0x" + "%040x" % rng.getrandbits(160),
+                },
+            ]
+        ),
+    }
+
+
+def make_id_map(size: int, seed: int = 1) -> dict:
+    """Payload of /v1/cryptocurrency/map with size coins"""
+    rng = random.Random(seed)
+    return {
+        "status": _status(),
+        "data": [make_map_entry(cmc_id, rng) for cmc_id in range(1, size + 1)],
+    }
+
+
+def make_quotes(size: int, seed: int = 1) -> dict:
+    """Payload of /v2/cryptocurrency/quotes/latest for size ids, data keyed by id (HandlerDataDict)"""
+    rng = random.Random(seed)
+    return {
+        "status": _status(credit_count=1 + size // 100),
+        "data": {str(cmc_id): make_coin(cmc_id, rng) for cmc_id in range(1, size + 1)},
+    }
+
+
+def make_nested(size: int, seed: int = 1) -> dict:
+    """Payload with the list of coins under data.data (HandlerDataNestedDataKey)"""
+    rng = random.Random(seed)
+    return {
+        "status": _status(credit_count=1 + size // 200),
+        "data": {
+            "id": 270,
+            "name": "Binance",
+            "data": [make_coin(cmc_id, rng) for cmc_id in range(1, size + 1)],
+        },
+    }
+
+
+def make_category(size: int, seed: int = 1) -> dict:
+    """Payload of /v1/cryptocurrency/category with size coins (HandlerDataSingleDict)"""
+    rng = random.Random(seed)
+    return {
+        "status": _status(credit_count=1 + size // 200),
+        "data": {
+            "id": "605e2ce9d41eae1066535f7c",
+            "name": "A16Z Portfolio",
+            "title": "A16Z Portfolio",
+            "description": "A16Z Portfolio",
+            "num_tokens": size,
+            "avg_price_change": rng.uniform(-10, 10),
+            "market_cap": rng.uniform(1e9, 1e12),
+            "market_cap_change": rng.uniform(-10, 10),
+            "volume": rng.uniform(1e8, 1e10),
+            "volume_change": rng.uniform(-10, 10),
+            "last_updated": TIMESTAMP,
+            "coins": [make_coin(cmc_id, rng) for cmc_id in range(1, size + 1)],
+        },
+    }
+
+
+def make_info(size: int, seed: int = 1) -> dict:
+    """Payload of /v2/cryptocurrency/info for size ids, data keyed by id (HandlerDataDict)"""
+    rng = random.Random(seed)
+    data = {}
+    for cmc_id in range(1, size + 1):
+        coin = make_map_entry(cmc_id, rng)
+        data[str(cmc_id)] = {
+            "id": cmc_id,
+            "name": coin["name"],
+            "symbol": coin["symbol"],
+            "slug": coin["slug"],
+            "category": "coin" if coin["platform"] is None else "token",
+            "description": f"{coin['name']} is a synthetic coin.",
+            "logo": f"https://s2.coinmarketcap.com/static/img/coins/64x64/{cmc_id}.png",
+            "subreddit": "",
+            "notice": "",
+            "tags": ["mineable"],
+            "platform": coin["platform"],
+            "date_added": "2013-04-28T00:00:00.000Z",
+            "urls": {"website": [f"https://{coin['slug']}.org/"], "twitter": []},
+        }
+    return {"status": _status(credit_count=1 + size // 100), "data": data}
+
+
+def make_categories(size: int, seed: int = 1) -> dict:
+    """Payload of /v1/cryptocurrency/categories with size categories"""
+    rng = random.Random(seed)
+    return {
+        "status": _status(),
+        "data": [
+            {
+                "id": "%024x" % rng.getrandbits(96),
+                "name": f"Category {number}",
+                "title": f"Category {number}",
+                "description": f"Category {number}",
+                "num_tokens": rng.randint(1, 500),
+                "avg_price_change": rng.uniform(-10, 10),
+                "market_cap": rng.uniform(1e9, 1e12),
+                "market_cap_change": rng.uniform(-10, 10),
+                "volume": rng.uniform(1e8, 1e10),
+                "volume_change": rng.uniform(-10, 10),
+                "last_updated": TIMESTAMP,
+            }
+            for number in range(1, size + 1)
+        ],
+    }
+
+
+# (id, name, sign, symbol) of /v1/fiat/map, the US dollar first
+FIATS = [
+    (2781, "United States Dollar", "$", "USD"),
+    (2790, "Euro", "€", "EUR"),
+    (2791, "Pound Sterling", "£", "GBP"),
+    (2797, "Japanese Yen", "¥", "JPY"),
+    (2782, "Australian Dollar", "$", "AUD"),
+    (2784, "Canadian Dollar", "$", "CAD"),
+    (2785, "Swiss Franc", "Fr", "CHF"),
+    (2787, "Chinese Yuan", "¥", "CNY"),
+]
+
+
+def make_fiat_map(size: int) -> dict:
+    """Payload of /v1/fiat/map with at most size fiats"""
+    return {
+        "status": _status(),
+        "data": [
+            {"id": cmc_id, "name": name, "sign": sign, "symbol": symbol}
+            for cmc_id, name, sign, symbol in FIATS[:size]
+        ],
+    }
+
+
+def make_exchange_map(size: int, seed: int = 1) -> dict:
+    """Payload of /v1/exchange/map with size exchanges"""
+    rng = random.Random(seed)
+    return {
+        "status": _status(),
+        "data": [
+            {
+                "id": exchange_id,
+                "name": f"Exchange {exchange_id}",
+                "slug": f"exchange-{exchange_id}",
+                "is_active": rng.choice([0, 1, 1, 1]),
+                "first_historical_data": "2018-04-26T00:45:00.000Z",
+                "last_historical_data": TIMESTAMP,
+            }
+            for exchange_id in range(1, size + 1)
+        ],
+    }
+
+
+def make_exchange_info(size: int, seed: int = 1) -> dict:
+    """Payload of /v1/exchange/info for size ids, data keyed by id (HandlerDataDict)"""
+    rng = random.Random(seed)
+    return {
+        "status": _status(credit_count=1 + size // 100),
+        "data": {
+            str(exchange_id): {
+                "id": exchange_id,
+                "name": f"Exchange {exchange_id}",
+                "slug": f"exchange-{exchange_id}",
+                "logo": f"https://s2.coinmarketcap.com/static/img/exchanges/64x64/{exchange_id}.png",
+                "description": f"Exchange {exchange_id} is a synthetic exchange.",
+                "date_launched": "2017-07-14T00:00:00.000Z",
+                "notice": None,
+                "countries": [],
+                "fiats": ["USD", "EUR"],
+                "type": "",
+                "maker_fee": rng.uniform(0, 0.5),
+                "taker_fee": rng.uniform(0, 0.5),
+                "weekly_visits": rng.randint(0, 10**7),
+                "spot_volume_usd": rng.uniform(0, 1e10),
+                "spot_volume_last_updated": TIMESTAMP,
+                "urls": {"website": [f"https://exchange-{exchange_id}.com/"]},
+            }
+            for exchange_id in range(1, size + 1)
+        },
+    }
+
+
+def make_price_conversion(seed: int = 1) -> dict:
+    """Payload of /v1/tools/price-conversion, 1 USD converted to the other FIATS"""
+    rng = random.Random(seed)
+    return {
+        "status": _status(),
+        "data": {
+            "id": 2781,
+            "symbol": "USD",
+            "name": "United States Dollar",
+            "amount": 1,
+            "last_updated": TIMESTAMP,
+            "quote": {
+                symbol: {"price": rng.uniform(0.5, 150), "last_updated": TIMESTAMP}
+                for _, _, _, symbol in FIATS[1:]
+            },
+        },
+    }
@@ -0,0 +1,128 @@
+"""Mock CMC server over TLS and HTTP/2
+Serves the answers of mock_server.MockCmcServer with hypercorn, which negotiates HTTP/2 or HTTP/1.1 with ALPN, so
+bench_http.py can compare the HTTP/1.1 settings with http2=True against the same https server. The latency and the
+bandwidth are awaited, one connection carries many requests at once. /_stats counts the requests, the connections
+(distinct client addresses) and the body bytes sent, the headers are not counted since HTTP/2 compresses them.
+Requires hypercorn (pip install hypercorn) and a certificate, e.g. a self-signed one:
+
+        openssl req -x509 -newkey rsa:2048 -nodes -days 1 -subj /CN=localhost -keyout key.pem -out cert.pem
+
+Usage:
+        python src/benchmarks/h2_server.py --certfile cert.pem --keyfile key.pem --latency-ms 20 --coins 1000
+        python src/benchmarks/bench_http.py --url https://localhost:<port> --ca-file cert.pem --coins 1000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from urllib import parse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_server import MockCmcServer  # noqa: E402
+
+
+class H2App:
+    """ASGI application answering like MockCmcServer
+
+    Args:
+            latency (float): seconds awaited before every answer.
+            rate_429 (float): share of the requests answered 429, 0 .. 1.
+            coins (int): maximum coins of a payload.
+            bandwidth (float, optional): bytes per second of every response, None unlimited.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        rate_429: float = 0.0,
+        coins: int = 100,
+        bandwidth: float | None = None,
+    ):
+        # only its answers are used, it is never started, the latency is awaited here instead of slept there
+        self.mock = MockCmcServer(rate_429=rate_429, coins=coins)
+        self.mock.server_close()
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.clients = set()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        if scope.get("client") and tuple(scope["client"]) not in self.clients:
+            self.clients.add(tuple(scope["client"]))
+            self.mock.count(connections=1)
+        headers = {name.decode("latin-1"): value for name, value in scope["headers"]}
+        if scope["path"] == "/_stats":
+            status, body, encoding = 200, json.dumps(self.mock.stats()).encode(), ""
+        else:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            status, body, encoding = self.mock.answer(
+                scope["path"],
+                parse.parse_qs(scope["query_string"].decode("latin-1")),
+                headers.get("accept-encoding", b"").decode("latin-1"),
+            )
+            if self.bandwidth:
+                await asyncio.sleep(len(body) / self.bandwidth)
+            self.mock.count(bytes_sent=len(body))
+        response_headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+        if encoding and encoding != "identity":
+            response_headers.append((b"content-encoding", encoding.encode()))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": response_headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--certfile", required=True)
+    parser.add_argument("--keyfile", required=True)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--coins", type=int, default=100)
+    parser.add_argument("--bandwidth-mbps", type=float, default=None)
+    args = parser.parse_args()
+
+    try:
+        from hypercorn.asyncio import serve
+        from hypercorn.config import Config
+    except ImportError:
+        sys.exit(
+            "h2_server.py requires hypercorn, install it with 'pip install hypercorn'"
+        )
+
+    config = Config()
+    config.bind = [f"{args.host}:{args.port}"]
+    config.certfile = args.certfile
+    config.keyfile = args.keyfile
+    config.alpn_protocols = ["h2", "http/1.1"]
+    config.accesslog = None
+    config.errorlog = None
+    app = H2App(
+        latency=args.latency_ms / 1000,
+        rate_429=args.rate_429,
+        coins=args.coins,
+        bandwidth=args.bandwidth_mbps * 125_000 if args.bandwidth_mbps else None,
+    )
+    print(f"https://{args.host}:{args.port}", flush=True)
+    try:
+        asyncio.run(serve(app, config))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
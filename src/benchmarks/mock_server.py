@@ -0,0 +1,264 @@
+"""Mock CMC server
+Local HTTP stand-in for every endpoint of cmc_helper, it serves the synthetic payloads of fixtures with a
+configurable latency, share of 429 responses, payload size and bandwidth, gzip (or br with brotli) compressed when
+the client accepts it like the API. /_stats returns the requests, connections and bytes sent so far. Used by
+bench_load.py and bench_http.py, it can also be started alone and pointed at with Cmc(url="http://127.0.0.1:<port>").
+
+Usage:
+        python src/benchmarks/mock_server.py --port 8765 --latency-ms 20 --rate-429 0.01 --coins 5000 --bandwidth-mbps 50
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import parse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+
+
+@lru_cache(maxsize=64)
+def _body(endpoint: str, size: int) -> bytes:
+    """Body of an endpoint with size coins, built once"""
+    if endpoint == "/v1/cryptocurrency/listings/latest":
+        payload = fixtures.make_listing(size)
+    elif endpoint == "/v2/cryptocurrency/quotes/latest":
+        payload = fixtures.make_quotes(size)
+    elif endpoint == "/v1/cryptocurrency/map":
+        payload = fixtures.make_id_map(size)
+    elif endpoint == "/v2/cryptocurrency/info":
+        payload = fixtures.make_info(size)
+    elif endpoint == "/v1/cryptocurrency/categories":
+        payload = fixtures.make_categories(size)
+    elif endpoint == "/v1/cryptocurrency/category":
+        payload = fixtures.make_category(size)
+    elif endpoint == "/v1/fiat/map":
+        payload = fixtures.make_fiat_map(size)
+    elif endpoint == "/v1/exchange/map":
+        payload = fixtures.make_exchange_map(size)
+    elif endpoint == "/v1/exchange/info":
+        payload = fixtures.make_exchange_info(size)
+    elif endpoint == "/v1/tools/price-conversion":
+        # the same conversion whatever the query, 1 USD to the other fiats of fixtures.FIATS
+        payload = fixtures.make_price_conversion()
+    elif endpoint == "/v1/key/info":
+        payload = {
+            "status": fixtures._status(credit_count=0),
+            "data": {
+                "plan": {"credit_limit_monthly": 10000, "rate_limit_minute": 30},
+                "usage": {
+                    "current_minute": {"requests_made": 0, "requests_left": 30},
+                    "current_day": {"credits_used": 0, "credits_left": 333},
+                    "current_month": {"credits_used": 0, "credits_left": 10000},
+                },
+            },
+        }
+    elif endpoint == "/v1/global-metrics/quotes/latest":
+        payload = {
+            "status": fixtures._status(),
+            "data": {"active_cryptocurrencies": size, "quote": {"USD": {}}},
+        }
+    else:
+        raise KeyError(endpoint)
+    return json.dumps(payload).encode("utf-8")
+
+
+@lru_cache(maxsize=64)
+def _encoded(endpoint: str, size: int, encoding: str) -> bytes:
+    body = _body(endpoint, size)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6)
+    if encoding == "br":
+        import brotli
+
+        return brotli.compress(body, quality=5)
+    return body
+
+
+def _encoding(accept_encoding: str) -> str:
+    """Encoding of the response, br when brotli is installed, then gzip"""
+    accepted = {value.split(";")[0].strip() for value in accept_encoding.split(",")}
+    if "br" in accepted:
+        try:
+            import brotli  # noqa: F401
+
+            return "br"
+        except ImportError:
+            pass
+    return "gzip" if "gzip" in accepted else "identity"
+
+
+def _error(status: int, message: str) -> bytes:
+    return json.dumps(
+        {"status": {**fixtures._status(credit_count=0), "error_message": message}}
+    ).encode("utf-8")
+
+
+class MockCmcServer(ThreadingHTTPServer):
+    """Threaded server answering like the API
+
+    Args:
+            address (tuple): (host, port), port 0 picks a free one.
+            latency (float): seconds waited before every answer.
+            rate_429 (float): share of the requests answered with a 429, 0 .. 1.
+            coins (int): coins per response, the limit or the number of ids requested when smaller.
+            seed (int): seed of the 429 draws.
+            bandwidth (float, optional): bytes per second of every response, None unlimited.
+            compress (bool): compress the bodies when the client accepts it.
+    """
+
+    daemon_threads = True
+    # the default backlog of 5 drops the connections of a burst, they are retried a second later
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        address=("127.0.0.1", 0),
+        latency: float = 0.0,
+        rate_429: float = 0.0,
+        coins: int = 100,
+        seed: int = 1,
+        bandwidth: float | None = None,
+        compress: bool = True,
+    ):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.coins = coins
+        self.bandwidth = bandwidth
+        self.compress = compress
+        self.requests = 0
+        self.connections = 0
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections": self.connections,
+                "bytes_sent": self.bytes_sent,
+            }
+
+    def count(self, connections: int = 0, bytes_sent: int = 0) -> None:
+        with self._lock:
+            self.connections += connections
+            self.bytes_sent += bytes_sent
+
+    def answer(
+        self, path: str, query: dict, accept_encoding: str = ""
+    ) -> tuple[int, bytes, str]:
+        """Status, body and content encoding of a request"""
+        with self._lock:
+            self.requests += 1
+            limited = self.rate_429 and self._random.random() < self.rate_429
+        if self.latency:
+            time.sleep(self.latency)
+        if limited:
+            message = "You've exceeded your API Key's HTTP request rate limit."
+            return 429, _error(429, message), "identity"
+        size = self.coins
+        if "limit" in query:
+            size = min(size, int(query["limit"][0]))
+        elif "id" in query:
+            size = min(size, len(query["id"][0].split(",")))
+        encoding = _encoding(accept_encoding) if self.compress else "identity"
+        try:
+            return 200, _encoded(path, size, encoding), encoding
+        except KeyError:
+            return 404, _error(404, f"Unknown endpoint {path}"), "identity"
+
+    def start(self) -> "MockCmcServer":
+        """Serve from a daemon thread"""
+        threading.Thread(
+            target=self.serve_forever, name="mock-cmc", daemon=True
+        ).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # the headers and the body are two writes, with Nagle the body waits for the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.count(connections=1)
+
+    def do_GET(self):
+        url = parse.urlsplit(self.path)
+        if url.path == "/_stats":
+            status, body, encoding = 200, json.dumps(self.server.stats()).encode(), ""
+        else:
+            status, body, encoding = self.server.answer(
+                url.path,
+                parse.parse_qs(url.query),
+                self.headers.get("Accept-Encoding", ""),
+            )
+            if self.server.bandwidth:
+                time.sleep(len(body) / self.server.bandwidth)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if encoding and encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        if url.path != "/_stats":
+            # the status line and the headers are buffered until end_headers, which adds the blank line
+            headers = sum(len(line) for line in self._headers_buffer) + 2
+            self.server.count(bytes_sent=headers + len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--coins", type=int, default=100)
+    parser.add_argument("--bandwidth-mbps", type=float, default=None)
+    parser.add_argument("--no-compress", action="store_true")
+    args = parser.parse_args()
+
+    server = MockCmcServer(
+        (args.host, args.port),
+        latency=args.latency_ms / 1000,
+        rate_429=args.rate_429,
+        coins=args.coins,
+        bandwidth=args.bandwidth_mbps * 125_000 if args.bandwidth_mbps else None,
+        compress=not args.no_compress,
+    )
+    # the first line is read by bench_load.py and bench_http.py to find the port
+    print(server.url, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,26 @@
 
 import enum
 import logging
-from requests import Session
-from cmc_api import cmc_utils
+import threading
+import time
+from cmc_api import (
+    cmc_utils,
+    cmc_pagination,
+    cmc_batch,
+    cmc_cache,
+    cmc_ratelimit,
+    cmc_stream,
+    cmc_index,
+    cmc_snapshot,
+    cmc_singleflight,
+    cmc_retry,
+    cmc_metrics,
+    cmc_transport,
+    cmc_http,
+)
 from cmc_api.cmc_helper import (
     get_headers,
+    StartupMode,
     Cryptocurrency,
     Fiat,
     Exchange,
@@ -15,6 +31,7 @@ from cmc_api.cmc_helper import (
     Key,
 )
 from cmc_api.cmc_datahandler import (
+    select_json_backend,
     AbstractDataHandler,
     HandlerDataDict,
     HandlerDataSingleDict,
@@ -28,19 +45,89 @@ response_content_json = dict()
 
 # prepare for possible changes due to free and paid end points difference.
 class Wrapper(ABC):
-    """Abstract class"""
-
-    cmc_logger = cmc_utils.fetch_cmc_logger(log_level=logging.INFO)
-
-    def __init__(self, url: str, api_key: str, save_to_json: bool):
+    """Abstract class
+
+    Args:
+            url (str): base url of the API.
+            api_key (str): the API key.
+            save_to_json (bool): save the responses in json files.
+            cache (cmc_cache.MemoryCache, optional): opt-in response cache, identical requests are served from it
+                    until their endpoint's time to live expires.
+            disk_cache (cmc_cache.SqliteCache, optional): opt-in disk tier under the memory cache, raw bodies are
+                    shared with other processes and survive restarts.
+            rate_limiter (cmc_ratelimit.RateLimiter, optional): paces every request of the client under the plan
+                    limits, it is seeded from /v1/key/info when the config file is updated.
+            startup (str | StartupMode): "eager" (default) recreates config.ini and requests /v1/key/info at
+                    construction, "lazy" does no I/O and reads the usage from the existing config.ini when it is
+                    needed, "background" does no I/O and refreshes the usage in a thread on the first real call.
+            json_backend (str): parser of the bodies, "auto" (default) picks orjson or msgspec when installed and
+                    falls back to the stdlib json, see cmc_datahandler.select_json_backend.
+            snapshot_store (cmc_snapshot.SnapshotStore, optional): every listing and quote response is appended to
+                    it, a history that keeps intraday snapshots unlike save_to_json.
+            single_flight (bool): concurrent calls with the same prepared request share one fetch (default True).
+            retry_policy (cmc_retry.RetryPolicy, optional): timeouts adapted to the endpoint latencies, retries of
+                    the transient failures and hedging, without it every request is sent once with
+                    cmc_utils.DEFAULT_TIMEOUT.
+            metrics (cmc_metrics.Metrics, optional): phase timings, body sizes, status codes, cache hits and
+                    credits of every request, per endpoint.
+            transport (cmc_transport.Recorder | cmc_transport.Replayer, optional): records the responses of the
+                    live session to a cassette, or replays a cassette without network.
+            max_workers (int): threads expected to share the client, the connection pool keeps as many connections
+                    alive and map runs as many calls at once.
+            http_config (cmc_http.HttpConfig, optional): compression, connection pool, keep-alive, TLS context and
+                    HTTP/2 settings of the session, the defaults of requests without it.
+    """
+
+    cmc_logger = logging.getLogger(cmc_utils.__name__)
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        save_to_json: bool,
+        cache: cmc_cache.MemoryCache | None = None,
+        disk_cache: cmc_cache.SqliteCache | None = None,
+        rate_limiter: cmc_ratelimit.RateLimiter | None = None,
+        startup: str | StartupMode = StartupMode.EAGER,
+        json_backend: str = "auto",
+        snapshot_store: cmc_snapshot.SnapshotStore | None = None,
+        single_flight: bool = True,
+        retry_policy: cmc_retry.RetryPolicy | None = None,
+        metrics: cmc_metrics.Metrics | None = None,
+        transport: cmc_transport.Recorder | cmc_transport.Replayer | None = None,
+        max_workers: int = 10,
+        http_config: cmc_http.HttpConfig | None = None,
+    ):
         self._base_url = url
         self.save_to_json = save_to_json
-        self.request_session = Session()
+        self.cache = cache
+        self.disk_cache = disk_cache
+        self.rate_limiter = rate_limiter
+        self.snapshot_store = snapshot_store
+        self.retry_policy = retry_policy
+        self.metrics = metrics
+        self.in_flight = cmc_singleflight.SingleFlight() if single_flight else None
+        self.json_loads = select_json_backend(json_backend)
+        self.max_workers = max_workers
+        self.http_config = http_config or cmc_http.HttpConfig()
+        # one pooled connection per worker, the default pool of 10 drops the extra ones after each request
+        self.request_session = self.http_config.session(pool_maxsize=max_workers)
         headers = get_headers(api_key)
         self.request_session.headers.update(headers)
+        self.transport = transport
+        if transport is not None:
+            self.request_session = transport.wrap(self.request_session)
         self.data_handler = AbstractDataHandler
-        cmc_utils.create_config_file()
-        self._update_config_file()
+        self.startup = StartupMode(startup)
+        self._usage = None
+        self._refresh_started = False
+        self._refresh_thread = None
+        self._refresh_lock = threading.Lock()
+        self._usage_lock = threading.Lock()
+        if self.startup is StartupMode.EAGER:
+            cmc_utils.configure_logging()
+            cmc_utils.create_config_file()
+            self._update_config_file()
 
     @property
     def url(self):
@@ -51,20 +138,217 @@ class Wrapper(ABC):
     def url(self, value):
         self._base_url = value
 
+    def close(self) -> None:
+        """Close the session: its connection pool and, with HTTP/2, its event loop thread"""
+        if self._refresh_thread is not None:
+            self._refresh_thread.join()
+        self.request_session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    @property
+    def usage(self) -> dict:
+        """Credit usage stored in config.ini, the file is read on first access"""
+        with self._usage_lock:
+            if self._usage is None:
+                _, configurations = cmc_utils.read_configuration_file()
+                self._usage = dict(configurations)
+            return self._usage
+
     def fetch_data(
         self,
         uri_and_args: enum.Enum,
         params: dict,
         data_handler_class: cmc_utils.DataHandler,
     ) -> tuple[int, dict]:
-        """Fetch the data, it uses a fetch_data from cmc_utils"""
-        status_code, response = cmc_utils.fetch_data(
-            request_session=self.request_session,
+        """Fetch the data with the cmc_utils helpers, a cached response is used when there is one and concurrent
+        identical calls share one fetch"""
+        cmc_utils.configure_logging()
+        if self.startup is StartupMode.BACKGROUND and not self._refresh_started:
+            self._refresh_in_background()
+
+        key = cmc_cache.make_key(
+            self._base_url, uri_and_args, params, data_handler_class
+        )
+        if self.cache is not None:
+            response = self.cache.get(key)
+            if response is not None:
+                if self.metrics is not None:
+                    self.metrics.count_cache_hit(uri_and_args, "memory")
+                return 200, response
+
+        def fetch():
+            return self._fetch_uncached(key, uri_and_args, data_handler_class)
+
+        if self.in_flight is None:
+            return fetch()
+        return self.in_flight.do(key, fetch)
+
+    def _fetch_uncached(
+        self,
+        key: tuple,
+        uri_and_args: enum.Enum,
+        data_handler_class: cmc_utils.DataHandler,
+    ) -> tuple[int, dict]:
+        """Disk cache or network, then the response is built and put in the memory cache"""
+        url_endpoint, safe_param, _ = key
+        metrics = self.metrics
+        started = time.perf_counter()
+        from_network = []
+
+        def fetch_raw():
+            from_network.append(True)
+            return self._fetch_raw_data(url_endpoint, safe_param, uri_and_args)
+
+        if self.disk_cache is None:
+            status_code, raw_response = fetch_raw()
+        else:
+            status_code, raw_response = self.disk_cache.fetch(
+                key=self.disk_cache.make_key(url_endpoint, safe_param),
+                uri_and_args=uri_and_args,
+                fetch_raw=fetch_raw,
+            )
+        status_code, response = cmc_utils.build_response(
+            status_code,
+            raw_response,
+            data_handler_class,
+            self.json_loads,
+            metrics=metrics,
+            uri_and_args=uri_and_args,
+        )
+        if metrics is not None:
+            if not from_network:
+                metrics.count_cache_hit(uri_and_args, "disk")
+            metrics.observe(uri_and_args, "total", time.perf_counter() - started)
+        if self.cache is not None and status_code == 200:
+            self.cache.put(key, uri_and_args, response)
+        return status_code, response
+
+    def _store_snapshot(self, endpoint: str, response: dict) -> None:
+        """Append a successful response to the snapshot store, when there is one"""
+        if self.snapshot_store is not None and response.get("data"):
+            self.snapshot_store.append(response, endpoint=endpoint)
+
+    def _fetch_raw_data(
+        self, url_endpoint: str, safe_param: str, uri_and_args: enum.Enum
+    ):
+        """The request itself, every request sent (retries and hedges included) first waits for the rate limiter,
+        outside of its timeout, and is then accounted for by _on_response"""
+
+        def attempt(timeout):
+            return cmc_utils.fetch_raw_data(
+                request_session=self.request_session,
+                url_endpoint=url_endpoint,
+                safe_param=safe_param,
+                timeout=timeout,
+            )
+
+        def on_response(status_code, raw_response, seconds):
+            self._on_response(uri_and_args, status_code, raw_response, seconds)
+
+        admit = None if self.rate_limiter is None else self.rate_limiter.acquire
+        if self.retry_policy is None:
+            if admit is not None:
+                admit()
+            started = time.perf_counter()
+            status_code, raw_response = attempt(cmc_utils.DEFAULT_TIMEOUT)
+            on_response(status_code, raw_response, time.perf_counter() - started)
+            return status_code, raw_response
+        return self.retry_policy.run(
+            url_endpoint, attempt, admit=admit, on_response=on_response
+        )
+
+    def _on_response(
+        self, uri_and_args: enum.Enum, status_code: int, raw_response, seconds: float
+    ) -> None:
+        """Accounting of every request sent, retries and hedges included: the credits and the 429 pauses of the
+        rate limiter, the network time and the response counters"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.record(status_code, raw_response)
+        if self.metrics is not None:
+            self.metrics.observe(uri_and_args, "network", seconds)
+            self.metrics.record_response(uri_and_args, status_code, raw_response)
+
+    def fetch_in_batches(
+        self,
+        uri_and_args: enum.Enum,
+        items,
+        params: dict,
+        data_handler_class: cmc_utils.DataHandler,
+        batch_key: str = "id",
+        max_url_length: int = cmc_batch.DEFAULT_MAX_URL_LENGTH,
+        max_workers: int = 4,
+    ) -> dict:
+        """Fetch any number of ids in the fewest requests that fit the URL limit, run concurrently and merged"""
+        chunks = cmc_batch.plan_batches(
+            items=items,
             url=self._base_url,
             uri_and_args=uri_and_args,
             params=params,
-            data_handler_class=data_handler_class,
+            batch_key=batch_key,
+            max_url_length=max_url_length,
+        )
+        return cmc_batch.fetch_in_batches(
+            fetch_chunk=lambda chunk: self.fetch_data(
+                uri_and_args=uri_and_args,
+                params={**params, batch_key: chunk},
+                data_handler_class=data_handler_class,
+            ),
+            chunks=chunks,
+            max_workers=max_workers,
+        )
+
+    def map(self, calls, max_workers: int | None = None) -> list[cmc_batch.CallResult]:
+        """Run many calls of the client on a bounded thread pool
+
+        Args:
+                calls (Iterable): (method, *args) tuples or callables, a method can be given by name, e.g.
+                        [("get_category", cmc_id) for cmc_id in ids] or [lambda: cmc.get_listing(1, 100)].
+                max_workers (int, optional): calls running at once, the client's max_workers by default.
+
+        Returns:
+                (list[cmc_batch.CallResult]): results in the order of calls, result.ok is False and result.error is
+                        set for the calls that failed, the others are not affected.
+        """
+        resolved = []
+        for call in calls:
+            if isinstance(call, tuple) and isinstance(call[0], str):
+                call = (getattr(self, call[0]), *call[1:])
+            resolved.append(call)
+        return cmc_batch.map_calls(
+            resolved, max_workers=max_workers or self.max_workers
+        )
+
+    def stream_data(
+        self,
+        uri_and_args: enum.Enum,
+        params: dict,
+        chunk_size: int = cmc_stream.CHUNK_SIZE,
+    ) -> tuple[int, cmc_stream.StreamedResponse | dict]:
+        """Request the endpoint and parse the body while it is downloaded, the caches are not used"""
+        cmc_utils.configure_logging()
+        url_endpoint, safe_param = cmc_utils.prepare_request(
+            url=self._base_url, uri_and_args=uri_and_args, params=params
         )
+        on_complete = None
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+            on_complete = lambda metadata: self.rate_limiter.record(
+                200, {"metadata": metadata}
+            )
+        status_code, response = cmc_stream.open_stream(
+            request_session=self.request_session,
+            url_endpoint=url_endpoint,
+            safe_param=safe_param,
+            chunk_size=chunk_size,
+            on_complete=on_complete,
+        )
+        if self.rate_limiter is not None and status_code != 200:
+            self.rate_limiter.record(status_code, response)
         return status_code, response
 
     def get_key_info(self) -> dict:
@@ -88,15 +372,41 @@ class Wrapper(ABC):
 
     def _update_config_file(self):
         api_usage = self.get_key_info()
-        cmc_utils.update_configuration_file(value_to_add=api_usage)
+        with self._usage_lock:
+            cmc_utils.update_configuration_file(value_to_add=api_usage)
+            self._usage = None
+        if self.rate_limiter is not None:
+            self.rate_limiter.update_from_key_info(api_usage)
+
+    def _refresh_in_background(self) -> None:
+        """Refresh the usage once, in a daemon thread"""
+        with self._refresh_lock:
+            if self._refresh_started:
+                return
+            self._refresh_started = True
+
+        def refresh():
+            try:
+                self._update_config_file()
+            except (KeyError, TypeError) as error:
+                self.cmc_logger.error("The usage could not be refreshed: %s", error)
+
+        self._refresh_thread = threading.Thread(
+            target=refresh, name="cmc-key-info", daemon=True
+        )
+        self._refresh_thread.start()
 
 
 class Cmc(Wrapper):
-    def __init__(self, url: str, api_key: str, save_to_json: bool = False):
-        super().__init__(url, api_key, save_to_json)
+    def __init__(self, url: str, api_key: str, save_to_json: bool = False, **kwargs):
+        super().__init__(url, api_key, save_to_json, **kwargs)
 
     def get_cmc_id_map(
-        self, sort: str = "cmc_rank", listing_status: str = "active", **kwargs
+        self,
+        sort: str = "cmc_rank",
+        listing_status: str = "active",
+        data_handler_class=HandlerDataList,
+        **kwargs,
     ) -> dict:
         """Returns a mapping of all cryptocurrencies to unique CoinMarketCap ids.
 
@@ -107,6 +417,8 @@ class Cmc(Wrapper):
                         tracked markets available. You may pass one or more comma-separated values.
                 sort (str): default = "cmc_rank", options "cmc_rank", "id". What field to sort the list of
                     cryptocurrencies by.
+                data_handler_class (DataHandler): shape of the data, default HandlerDataList. HandlerRecords gives
+                    compact MapRecord objects (not saved to json).
                 **kwargs:
                         -> start (int, optional): >= 1 Optionally offset the start ( 1-based index) of the paginated
                             list of items to return.
@@ -131,12 +443,96 @@ class Cmc(Wrapper):
         _, response = self.fetch_data(
             uri_and_args=Cryptocurrency.CMC_ID_MAP,
             params=kwargs,
-            data_handler_class=HandlerDataList,
+            data_handler_class=data_handler_class,
         )
-        if self.save_to_json:
+        if self.save_to_json and data_handler_class is HandlerDataList:
             cmc_utils.save_to_json(file_name="cmc_ids_mapping", payload=response)
         return response
 
+    def iter_cmc_id_map(
+        self,
+        page_size: int = cmc_pagination.MAX_PAGE_SIZE,
+        max_rows: int | None = None,
+        by_page: bool = False,
+        **kwargs,
+    ):
+        """Iterate over the whole cryptocurrency id map
+
+        The next page is requested while the current one is consumed, iteration stops after the first short page.
+
+        Args:
+                page_size (int): [ 1 .. 5000 ] number of items requested per page.
+                max_rows (int, optional): stop after this many items.
+                by_page (bool): yield the response of each page instead of the single items.
+                **kwargs: same parameters as get_cmc_id_map, except start and limit.
+
+        Returns:
+                (Iterator): items of "data" (or page responses) as they arrive.
+        """
+        return cmc_pagination.paginate(
+            fetch_page=lambda start, limit: self.get_cmc_id_map(
+                start=start, limit=limit, **kwargs
+            ),
+            page_size=page_size,
+            max_rows=max_rows,
+            by_page=by_page,
+        )
+
+    def stream_cmc_id_map(
+        self,
+        sort: str = "cmc_rank",
+        listing_status: str = "active",
+        chunk_size: int = cmc_stream.CHUNK_SIZE,
+        **kwargs,
+    ):
+        """Same request as get_cmc_id_map but the items are parsed while the body is downloaded
+
+        Args:
+                sort (str): see get_cmc_id_map.
+                listing_status (str): see get_cmc_id_map.
+                chunk_size (int): bytes read from the socket at a time.
+                **kwargs: same parameters as get_cmc_id_map.
+
+        Returns:
+                (StreamedResponse | dict): iterate it to get the items of "data" one at a time, its metadata is set
+                        once the iteration ends. {"message": ""} when the request failed.
+        """
+        kwargs["sort"] = sort
+        kwargs["listing_status"] = listing_status
+
+        _, response = self.stream_data(
+            uri_and_args=Cryptocurrency.CMC_ID_MAP,
+            params=kwargs,
+            chunk_size=chunk_size,
+        )
+        return response
+
+    def get_id_index(
+        self,
+        index: cmc_index.CmcIdIndex | None = None,
+        listing_status: str = "active",
+        page_size: int = cmc_pagination.MAX_PAGE_SIZE,
+        **kwargs,
+    ) -> cmc_index.CmcIdIndex:
+        """Index of the id map with lookups by id, slug and symbol, see cmc_index.CmcIdIndex
+
+        Args:
+                index (CmcIdIndex, optional): an index to refresh, the pages are merged into it instead of building
+                        a new one.
+                listing_status (str): see get_cmc_id_map, "active,inactive" indexes both.
+                page_size (int): [ 1 .. 5000 ] number of items requested per page.
+                **kwargs: same parameters as get_cmc_id_map, except start and limit.
+
+        Returns:
+                (CmcIdIndex): the index, with the entries of every page fetched.
+        """
+        index = cmc_index.CmcIdIndex() if index is None else index
+        for page in self.iter_cmc_id_map(
+            page_size=page_size, by_page=True, listing_status=listing_status, **kwargs
+        ):
+            index.merge(page["data"])
+        return index
+
     def get_info(self, cmc_id: str, **kwargs):
         """Returns all static metadata available for one or more cryptocurrencies. This information includes details
         like logo, description, official website URL, social links, and links to a cryptocurrency's technical
@@ -173,13 +569,56 @@ class Cmc(Wrapper):
             cmc_utils.save_to_json(file_name="info", payload=response)
         return response
 
-    def get_listing(self, start: int, limit: int, **kwargs):
+    def get_info_batch(
+        self,
+        cmc_ids,
+        batch_key: str = "id",
+        max_url_length: int = cmc_batch.DEFAULT_MAX_URL_LENGTH,
+        max_workers: int = 4,
+        **kwargs,
+    ) -> dict:
+        """Returns the static metadata of any number of cryptocurrencies
+
+        The ids are split in the fewest requests that fit in max_url_length, the requests run concurrently and
+        their responses are merged: "data" dicts are combined, "credit_count" is summed and the metadata carries
+        "timestamp" (latest), "timestamp_earliest" and the number of "batches".
+
+        Args:
+                cmc_ids (str | Iterable): any number of ids, comma-separated string or iterable.
+                batch_key (str): parameter that receives the chunks: "id", "slug" or "symbol".
+                max_url_length (int): maximum length of each request URL.
+                max_workers (int): number of requests running at the same time.
+                **kwargs: same parameters as get_info.
+
+        Returns:
+                (dict): {metadata: {"timestamp": "", "timestamp_earliest": "", "credit_count": "",
+                        "error_message": "", "list_keys": "", "batches": ""}, data: "the data requested"}
+        """
+        return self.fetch_in_batches(
+            uri_and_args=Cryptocurrency.INFO,
+            items=cmc_ids,
+            params=kwargs,
+            data_handler_class=HandlerDataDict,
+            batch_key=batch_key,
+            max_url_length=max_url_length,
+            max_workers=max_workers,
+        )
+
+    def get_listing(
+        self,
+        start: int,
+        limit: int,
+        data_handler_class=HandlerDataList,
+        **kwargs,
+    ):
         """Returns a paginated list of all active cryptocurrencies with the latest market data.
 
         Args:
                 start (int): >= 1. Optionally offset the start (1-based index) of the paginated list of items to return.
                 limit (int): [ 1 .. 5000 ] Optionally specify the number of results to return. Use this parameter and
                     the "start" parameter to determine your own pagination size.
+                data_handler_class (DataHandler): shape of the data, default HandlerDataList. HandlerRecords gives
+                    compact records and cmc_columnar.HandlerColumnar NumPy columns (not saved to json).
                 **kwargs:
                     -> price_min (int): [ 0 .. 100000000000000000 ] Optionally specify a threshold of minimum USD
                             price to filter results by.
@@ -236,15 +675,74 @@ class Cmc(Wrapper):
         _, response = self.fetch_data(
             uri_and_args=Cryptocurrency.LATEST_LIST_PRICE,
             params=kwargs,
-            data_handler_class=HandlerDataList,
+            data_handler_class=data_handler_class,
         )
-        if self.save_to_json:
+        if data_handler_class is HandlerDataList:
+            self._store_snapshot("listing", response)
+        if self.save_to_json and data_handler_class is HandlerDataList:
             timestamp = cmc_utils.get_todays_timestamp()
             cmc_utils.save_to_json(
                 file_name=f"latest_listing_{timestamp} ", payload=response
             )
         return response
 
+    def iter_listing(
+        self,
+        page_size: int = cmc_pagination.MAX_PAGE_SIZE,
+        max_rows: int | None = None,
+        by_page: bool = False,
+        **kwargs,
+    ):
+        """Iterate over the whole listing of active cryptocurrencies
+
+        The next page is requested while the current one is consumed, iteration stops after the first short page.
+
+        Args:
+                page_size (int): [ 1 .. 5000 ] number of items requested per page.
+                max_rows (int, optional): stop after this many items.
+                by_page (bool): yield the response of each page instead of the single items.
+                **kwargs: same parameters as get_listing, except start and limit.
+
+        Returns:
+                (Iterator): items of "data" (or page responses) as they arrive.
+        """
+        return cmc_pagination.paginate(
+            fetch_page=lambda start, limit: self.get_listing(start, limit, **kwargs),
+            page_size=page_size,
+            max_rows=max_rows,
+            by_page=by_page,
+        )
+
+    def stream_listing(
+        self,
+        start: int = 1,
+        limit: int = cmc_pagination.MAX_PAGE_SIZE,
+        chunk_size: int = cmc_stream.CHUNK_SIZE,
+        **kwargs,
+    ):
+        """Same request as get_listing but the coins are parsed while the body is downloaded, memory stays flat
+        whatever the limit
+
+        Args:
+                start (int): see get_listing.
+                limit (int): see get_listing.
+                chunk_size (int): bytes read from the socket at a time.
+                **kwargs: same parameters as get_listing.
+
+        Returns:
+                (StreamedResponse | dict): iterate it to get the items of "data" one at a time, its metadata is set
+                        once the iteration ends. {"message": ""} when the request failed.
+        """
+        kwargs["start"] = start
+        kwargs["limit"] = limit
+
+        _, response = self.stream_data(
+            uri_and_args=Cryptocurrency.LATEST_LIST_PRICE,
+            params=kwargs,
+            chunk_size=chunk_size,
+        )
+        return response
+
     def get_categories(self, start: int, limit: int, **kwargs):
         """Get the categories
 
@@ -279,6 +777,33 @@ class Cmc(Wrapper):
             cmc_utils.save_to_json(file_name=f"categories", payload=response)
         return response
 
+    def iter_categories(
+        self,
+        page_size: int = cmc_pagination.MAX_PAGE_SIZE,
+        max_rows: int | None = None,
+        by_page: bool = False,
+        **kwargs,
+    ):
+        """Iterate over all the categories
+
+        The next page is requested while the current one is consumed, iteration stops after the first short page.
+
+        Args:
+                page_size (int): [ 1 .. 5000 ] number of items requested per page.
+                max_rows (int, optional): stop after this many items.
+                by_page (bool): yield the response of each page instead of the single items.
+                **kwargs: same parameters as get_categories, except start and limit.
+
+        Returns:
+                (Iterator): items of "data" (or page responses) as they arrive.
+        """
+        return cmc_pagination.paginate(
+            fetch_page=lambda start, limit: self.get_categories(start, limit, **kwargs),
+            page_size=page_size,
+            max_rows=max_rows,
+            by_page=by_page,
+        )
+
     def get_category(self, cmc_id: str, **kwargs):
         """Get information of a single category
 
@@ -323,7 +848,13 @@ class Cmc(Wrapper):
             )
         return response
 
-    def get_quote_latest(self, cmc_id: str, skip_invalid: bool = True, **kwargs):
+    def get_quote_latest(
+        self,
+        cmc_id: str,
+        skip_invalid: bool = True,
+        data_handler_class=HandlerDataSingleDict,
+        **kwargs,
+    ):
         """Get the latest market quote of one or more currencies, on free tear conversion is limited
 
         Args:
@@ -332,6 +863,8 @@ class Cmc(Wrapper):
                 skip_invalid (bool): Pass true to relax request validation rules. When requesting records on multiple
                 cryptocurrencies an error is returned if no match is found for 1 or more requested cryptocurrencies.
                 If set to true, invalid lookups will be skipped allowing valid cryptocurrencies to still be returned.
+                data_handler_class (DataHandler): shape of the data, default HandlerDataSingleDict. HandlerRecords gives
+                    compact records and cmc_columnar.HandlerColumnar NumPy columns (not saved to json).
                 **kwargs (Any): Can be used to pass other parameters to the endpoint.
 
                         -> slug (str): Alternatively pass a comma-separated list of cryptocurrency slugs.
@@ -364,15 +897,55 @@ class Cmc(Wrapper):
         _, response = self.fetch_data(
             uri_and_args=Cryptocurrency.QUOTE_LATEST,
             params=kwargs,
-            data_handler_class=HandlerDataSingleDict,
+            data_handler_class=data_handler_class,
         )
-        if self.save_to_json:
+        if data_handler_class is HandlerDataSingleDict:
+            self._store_snapshot("quotes", response)
+        if self.save_to_json and data_handler_class is HandlerDataSingleDict:
             timestamp = cmc_utils.get_todays_timestamp()
             cmc_utils.save_to_json(
                 file_name=f"cmc_id_{cmc_id}_quote_{timestamp}", payload=response
             )
         return response
 
+    def get_quote_latest_batch(
+        self,
+        cmc_ids,
+        skip_invalid: bool = True,
+        batch_key: str = "id",
+        max_url_length: int = cmc_batch.DEFAULT_MAX_URL_LENGTH,
+        max_workers: int = 4,
+        **kwargs,
+    ) -> dict:
+        """Get the latest market quote of any number of cryptocurrencies
+
+        The ids are split in the fewest requests that fit in max_url_length, the requests run concurrently and
+        their responses are merged: "data" dicts are combined, "credit_count" is summed and the metadata carries
+        "timestamp" (latest), "timestamp_earliest" and the number of "batches".
+
+        Args:
+                cmc_ids (str | Iterable): any number of ids, comma-separated string or iterable.
+                skip_invalid (bool): Pass true to relax request validation rules, see get_quote_latest.
+                batch_key (str): parameter that receives the chunks: "id", "slug" or "symbol".
+                max_url_length (int): maximum length of each request URL.
+                max_workers (int): number of requests running at the same time.
+                **kwargs: same parameters as get_quote_latest.
+
+        Returns:
+                (dict): {metadata: {"timestamp": "", "timestamp_earliest": "", "credit_count": "",
+                        "error_message": "", "list_keys": "", "batches": ""}, data: "the data requested"}
+        """
+        kwargs["skip_invalid"] = skip_invalid
+        return self.fetch_in_batches(
+            uri_and_args=Cryptocurrency.QUOTE_LATEST,
+            items=cmc_ids,
+            params=kwargs,
+            data_handler_class=HandlerDataSingleDict,
+            batch_key=batch_key,
+            max_url_length=max_url_length,
+            max_workers=max_workers,
+        )
+
     # Fiat endPoint
     def get_fiat(self, **kwargs) -> dict:
         """Returns a mapping of all supported fiat currencies to unique CoinMarketCap ids
@@ -404,6 +977,35 @@ class Cmc(Wrapper):
 
         return response
 
+    def iter_fiat(
+        self,
+        page_size: int = cmc_pagination.MAX_PAGE_SIZE,
+        max_rows: int | None = None,
+        by_page: bool = False,
+        **kwargs,
+    ):
+        """Iterate over all the supported fiat currencies
+
+        The next page is requested while the current one is consumed, iteration stops after the first short page.
+
+        Args:
+                page_size (int): [ 1 .. 5000 ] number of items requested per page.
+                max_rows (int, optional): stop after this many items.
+                by_page (bool): yield the response of each page instead of the single items.
+                **kwargs: same parameters as get_fiat, except start and limit.
+
+        Returns:
+                (Iterator): items of "data" (or page responses) as they arrive.
+        """
+        return cmc_pagination.paginate(
+            fetch_page=lambda start, limit: self.get_fiat(
+                start=start, limit=limit, **kwargs
+            ),
+            page_size=page_size,
+            max_rows=max_rows,
+            by_page=by_page,
+        )
+
     # Exchange endPoint
     def get_exchange_map(self, listing_status: str = "active", **kwargs) -> dict:
         """Returns a paginated list of all active cryptocurrency exchanges by CoinMarketCap ID
@@ -445,6 +1047,35 @@ class Cmc(Wrapper):
 
         return response
 
+    def iter_exchange_map(
+        self,
+        page_size: int = cmc_pagination.MAX_PAGE_SIZE,
+        max_rows: int | None = None,
+        by_page: bool = False,
+        **kwargs,
+    ):
+        """Iterate over all the exchanges
+
+        The next page is requested while the current one is consumed, iteration stops after the first short page.
+
+        Args:
+                page_size (int): [ 1 .. 5000 ] number of items requested per page.
+                max_rows (int, optional): stop after this many items.
+                by_page (bool): yield the response of each page instead of the single items.
+                **kwargs: same parameters as get_exchange_map, except start and limit.
+
+        Returns:
+                (Iterator): items of "data" (or page responses) as they arrive.
+        """
+        return cmc_pagination.paginate(
+            fetch_page=lambda start, limit: self.get_exchange_map(
+                start=start, limit=limit, **kwargs
+            ),
+            page_size=page_size,
+            max_rows=max_rows,
+            by_page=by_page,
+        )
+
     def get_exchange_info(self, cmc_ex_id: str, **kwargs) -> dict:
         """Returns metadata for one or more exchanges.
 
@@ -479,6 +1110,41 @@ class Cmc(Wrapper):
 
         return response
 
+    def get_exchange_info_batch(
+        self,
+        cmc_ex_ids,
+        batch_key: str = "id",
+        max_url_length: int = cmc_batch.DEFAULT_MAX_URL_LENGTH,
+        max_workers: int = 4,
+        **kwargs,
+    ) -> dict:
+        """Returns the metadata of any number of exchanges
+
+        The exchange ids are split in the fewest requests that fit in max_url_length, the requests run concurrently and
+        their responses are merged: "data" dicts are combined, "credit_count" is summed and the metadata carries
+        "timestamp" (latest), "timestamp_earliest" and the number of "batches".
+
+        Args:
+                cmc_ex_ids (str | Iterable): any number of exchange ids, comma-separated string or iterable.
+                batch_key (str): parameter that receives the chunks: "id" or "slug".
+                max_url_length (int): maximum length of each request URL.
+                max_workers (int): number of requests running at the same time.
+                **kwargs: same parameters as get_exchange_info.
+
+        Returns:
+                (dict): {metadata: {"timestamp": "", "timestamp_earliest": "", "credit_count": "",
+                        "error_message": "", "list_keys": "", "batches": ""}, data: "the data requested"}
+        """
+        return self.fetch_in_batches(
+            uri_and_args=Exchange.EXCHANGE_INFO,
+            items=cmc_ex_ids,
+            params=kwargs,
+            data_handler_class=HandlerDataDict,
+            batch_key=batch_key,
+            max_url_length=max_url_length,
+            max_workers=max_workers,
+        )
+
     # GlobalMetrics endPoint
     def get_latest_global_metrics(self, **kwargs) -> dict:
         """Returns the latest global cryptocurrency market metrics.
@@ -554,3 +1220,21 @@ class Cmc(Wrapper):
             )
 
         return response
+
+    def get_price_converter(self, limit: int = 5000, fiats: str = "EUR,GBP,JPY"):
+        """Local price converter built from the listing, the fiat map and one price conversion of 1 USD to fiats,
+        see cmc_conversion.PriceConverter. It converts any number of amounts without spending a credit per call,
+        refresh it to update the rates. Requires numpy.
+
+        Args:
+                limit (int): [ 1 .. 5000 ] coins of the listing, by market cap.
+                fiats (str): comma-separated fiat symbols the converter can convert to and from, besides USD.
+
+        Returns:
+                (PriceConverter): the converter, it uses this client for the historical conversions.
+        """
+        from cmc_api.cmc_conversion import PriceConverter
+
+        converter = PriceConverter(client=self)
+        converter.refresh(limit=limit, fiats=fiats)
+        return converter
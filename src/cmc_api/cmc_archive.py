@@ -0,0 +1,335 @@
+"""Columnar archive
+On-disk columnar format for listing and quote snapshots. Every column is a file of fixed-width little-endian
+values, strings are a bytes file plus an int64 offsets table. The files are opened with mmap and exposed as NumPy
+views, opening an archive only reads its small meta.json and scanning a column only touches the pages of that
+column. Requires numpy (pip install cmc_api_wrapper[columnar]).
+"""
+
+import json
+import os
+from collections.abc import Iterable
+
+import numpy as np
+
+from cmc_api import cmc_utils
+from cmc_api.cmc_columnar import (
+    QUOTE_FIELDS,
+    ColumnarQuotes,
+    HandlerColumnar,
+    StringTable,
+)
+from cmc_api.cmc_snapshot import to_epoch
+
+# Version of the layout on disk
+ARCHIVE_VERSION = 1
+STRING_FIELDS = ("symbols", "slugs", "names")
+# Row columns other than the quote fields
+ROW_COLUMNS = {"ts": "<f8", "ids": "<i8", "cmc_rank": "<i8", "last_updated": "<M8[ms]"}
+# Per snapshot columns, searched to find the rows of a time range
+SNAPSHOT_COLUMNS = {"snapshot_ts": "<f8", "snapshot_start": "<i8"}
+
+
+class StringColumn:
+    """Strings of an archive column, decoded one at a time from the mapped bytes"""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> str:
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return self.data[start:end].tobytes().decode("utf-8")
+
+    def slice(self, start: int, stop: int) -> "StringColumn":
+        """Rows [start, stop) without copying"""
+        return StringColumn(self.data, self.offsets[start : stop + 1])
+
+    def to_list(self) -> list[str]:
+        """Every string, decoded"""
+        return [self[row] for row in range(len(self))]
+
+
+class ArchiveView:
+    """Rows [start, stop) of an archive, every column is a view on the mapped files"""
+
+    def __init__(self, archive: "ColumnarArchive", start: int, stop: int):
+        self.archive = archive
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        """A numeric column: ts, ids, cmc_rank, last_updated or a quote field"""
+        return self.archive.column(field)[self.start : self.stop]
+
+    def strings(self, field: str) -> StringColumn:
+        """A string column: symbols, slugs or names"""
+        return self.archive.strings(field).slice(self.start, self.stop)
+
+    def to_quotes(self) -> ColumnarQuotes:
+        """The rows as a ColumnarQuotes (copied in memory), to use filter / sort_by / top"""
+        return ColumnarQuotes(
+            convert=self.archive.convert,
+            ids=np.array(self["ids"]),
+            cmc_rank=np.array(self["cmc_rank"]),
+            last_updated=np.array(self["last_updated"]),
+            symbols=StringTable(self.strings("symbols").to_list()),
+            slugs=StringTable(self.strings("slugs").to_list()),
+            names=StringTable(self.strings("names").to_list()),
+            columns={field: np.array(self[field]) for field in self.archive.fields},
+        )
+
+
+class ColumnarArchive:
+    """Archive directory, opened for reading and appending
+
+    The files are mapped when a column is first used. Only the rows counted in meta.json are visible, bytes left
+    by an interrupted append are ignored and overwritten by the next one.
+
+    Args:
+            directory (str): location of the archive, created on the first append.
+            fields (Iterable[str]): quote fields stored, fixed when the archive is created.
+            convert (str): currency of the quote fields, fixed when the archive is created.
+    """
+
+    def __init__(
+        self, directory: str, fields: Iterable[str] = QUOTE_FIELDS, convert: str = "USD"
+    ):
+        self.directory = directory
+        self._maps = {}
+        meta_path = os.path.join(directory, "meta.json")
+        if os.path.isfile(meta_path):
+            with open(file=meta_path, mode="r", encoding="utf-8") as file:
+                self.meta = json.load(file)
+            if self.meta["version"] != ARCHIVE_VERSION:
+                raise ValueError(f"Unknown archive version {self.meta['version']}")
+        else:
+            self.meta = {
+                "version": ARCHIVE_VERSION,
+                "convert": convert,
+                "fields": list(fields),
+                "rows": 0,
+                "snapshots": 0,
+                "string_bytes": {field: 0 for field in STRING_FIELDS},
+            }
+
+    @property
+    def fields(self) -> list[str]:
+        return self.meta["fields"]
+
+    @property
+    def convert(self) -> str:
+        return self.meta["convert"]
+
+    @property
+    def rows(self) -> int:
+        return self.meta["rows"]
+
+    def __len__(self):
+        return self.rows
+
+    def _dtypes(self) -> dict:
+        return {
+            **ROW_COLUMNS,
+            **{field: "<f8" for field in self.fields},
+            **SNAPSHOT_COLUMNS,
+        }
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def _map(self, name: str, dtype: str, length: int) -> np.ndarray:
+        """Read-only view of the first length values of a file"""
+        key = (name, length)
+        if key not in self._maps:
+            if length == 0:
+                self._maps[key] = np.empty(0, dtype=dtype)
+            else:
+                self._maps[key] = np.memmap(
+                    self._path(name), dtype=dtype, mode="r", shape=(length,)
+                )
+        return self._maps[key]
+
+    def column(self, field: str) -> np.ndarray:
+        """Numeric column of every row (or of every snapshot for snapshot_ts / snapshot_start)"""
+        dtypes = self._dtypes()
+        if field not in dtypes:
+            raise KeyError(field)
+        length = self.meta["snapshots"] if field in SNAPSHOT_COLUMNS else self.rows
+        return self._map(field, dtypes[field], length)
+
+    def strings(self, field: str) -> StringColumn:
+        """String column of every row"""
+        if field not in STRING_FIELDS:
+            raise KeyError(field)
+        return StringColumn(
+            self._map(f"{field}.data", "u1", self.meta["string_bytes"][field]),
+            self._map(f"{field}.offsets", "<i8", self.rows + 1 if self.rows else 0),
+        )
+
+    def view(self, start=None, end=None) -> ArchiveView:
+        """Rows of the snapshots taken in [start, end], found by binary search on the snapshot times
+
+        Args:
+                start (str | datetime | float, optional): first time included.
+                end (str | datetime | float, optional): last time included.
+        """
+        times = self.column("snapshot_ts")
+        starts = self.column("snapshot_start")
+        first = 0 if start is None else int(np.searchsorted(times, to_epoch(start)))
+        last = (
+            len(times)
+            if end is None
+            else int(np.searchsorted(times, to_epoch(end), side="right"))
+        )
+        if first >= last:
+            return ArchiveView(self, 0, 0)
+        stop = int(starts[last]) if last < len(starts) else self.rows
+        return ArchiveView(self, int(starts[first]), stop)
+
+    def snapshot_times(self) -> np.ndarray:
+        """Epoch seconds of every snapshot"""
+        return self.column("snapshot_ts")
+
+    def append(self, snapshot: dict | ColumnarQuotes, timestamp=None) -> None:
+        """Add a snapshot at the end, snapshots must come in time order
+
+        Args:
+                snapshot (dict | ColumnarQuotes): a get_listing / get_quote_latest response with dict data, or the
+                        data of a response built with HandlerColumnar.
+                timestamp (str | datetime | float, optional): time of the snapshot, the metadata timestamp by
+                        default.
+        """
+        if isinstance(snapshot, dict):
+            if timestamp is None:
+                timestamp = snapshot["metadata"]["timestamp"]
+            handler = HandlerColumnar.configure(
+                convert=self.convert, fields=self.fields
+            )
+            _, snapshot = handler.data_extraction(
+                {
+                    "status": {
+                        "timestamp": timestamp,
+                        "credit_count": None,
+                        "error_message": None,
+                    },
+                    "data": snapshot["data"],
+                }
+            )
+        if timestamp is None:
+            raise ValueError("The timestamp of a ColumnarQuotes snapshot is required")
+        ts = to_epoch(timestamp)
+        times = self.column("snapshot_ts")
+        if len(times) and ts < times[-1]:
+            raise ValueError("Snapshots must be appended in time order")
+
+        os.makedirs(self.directory, exist_ok=True)
+        rows = len(snapshot)
+        values = {
+            "ts": np.full(rows, ts),
+            "ids": snapshot.ids,
+            "cmc_rank": snapshot.cmc_rank,
+            "last_updated": snapshot.last_updated,
+            **{field: snapshot.columns[field] for field in self.fields},
+            "snapshot_ts": np.array([ts]),
+            "snapshot_start": np.array([self.rows]),
+        }
+        dtypes = self._dtypes()
+        for name, column in values.items():
+            length = self.meta["snapshots"] if name in SNAPSHOT_COLUMNS else self.rows
+            self._write(
+                name, length * np.dtype(dtypes[name]).itemsize, column, dtypes[name]
+            )
+
+        string_bytes = dict(self.meta["string_bytes"])
+        for field in STRING_FIELDS:
+            encoded = [
+                value.encode("utf-8") for value in getattr(snapshot, field).decode()
+            ]
+            offsets = string_bytes[field] + np.cumsum(
+                [0] + [len(value) for value in encoded], dtype=np.int64
+            )
+            # the offsets table has rows + 1 values, its first value is written with the first snapshot
+            self._write(
+                f"{field}.offsets",
+                (self.rows + 1 if self.rows else 0) * 8,
+                offsets if not self.rows else offsets[1:],
+                "<i8",
+            )
+            self._write_bytes(f"{field}.data", string_bytes[field], b"".join(encoded))
+            string_bytes[field] = int(offsets[-1])
+
+        # the rows become visible once meta.json points at them
+        self._save_meta(
+            {
+                **self.meta,
+                "rows": self.rows + rows,
+                "snapshots": self.meta["snapshots"] + 1,
+                "string_bytes": string_bytes,
+            }
+        )
+
+    def _write(self, name: str, size: int, values: np.ndarray, dtype: str) -> None:
+        self._write_bytes(
+            name, size, np.ascontiguousarray(values, dtype=dtype).tobytes()
+        )
+
+    def _write_bytes(self, name: str, size: int, data: bytes) -> None:
+        """Write data after the first size bytes of a file, what follows them is dropped"""
+        path = self._path(name)
+        with open(path, mode="r+b" if os.path.exists(path) else "wb") as file:
+            file.truncate(size)
+            file.seek(size)
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _save_meta(self, meta: dict) -> None:
+        path = os.path.join(self.directory, "meta.json")
+        temporary = cmc_utils.temporary_name(path)
+        with open(file=temporary, mode="w", encoding="utf-8") as file:
+            json.dump(meta, file)
+        os.replace(temporary, path)
+        self.meta = meta
+        self._maps.clear()
+
+
+def export_snapshots(
+    store, directory: str, endpoint: str = "listing", start=None, end=None, **kwargs
+) -> ColumnarArchive:
+    """Append the snapshots of a cmc_snapshot.SnapshotStore to an archive, the ones already archived are skipped
+
+    Args:
+            store (SnapshotStore): the source.
+            directory (str): the archive.
+            endpoint (str): series of the store to export.
+            start, end (str | datetime | float, optional): time range exported.
+            **kwargs: fields and convert of a new archive, see ColumnarArchive.
+
+    Returns:
+            (ColumnarArchive): the archive.
+    """
+    archive = ColumnarArchive(directory, **kwargs)
+    times = archive.snapshot_times()
+    last = float(times[-1]) if len(times) else None
+    for snapshot in store.snapshots(start=start, end=end, endpoint=endpoint):
+        if last is not None and to_epoch(snapshot["timestamp"]) <= last:
+            continue
+        coins = [
+            coin
+            for _, coin in store.read(
+                start=snapshot["timestamp"],
+                end=snapshot["timestamp"],
+                endpoint=endpoint,
+            )
+        ]
+        archive.append(
+            {"metadata": snapshot["metadata"], "data": coins},
+            timestamp=snapshot["timestamp"],
+        )
+    return archive
@@ -0,0 +1,794 @@
+"""Asyncio client
+Coroutine version of cmc.Cmc, every request goes through one shared keep-alive connection pool
+"""
+
+import asyncio
+import contextlib
+import enum
+import time
+from abc import ABC
+
+from cmc_api import (
+    cmc_utils,
+    cmc_pagination,
+    cmc_batch,
+    cmc_cache,
+    cmc_ratelimit,
+    cmc_stream,
+    cmc_index,
+    cmc_snapshot,
+    cmc_singleflight,
+    cmc_retry,
+    cmc_metrics,
+    cmc_transport,
+    cmc_http,
+)
+from cmc_api.cmc_helper import (
+    get_headers,
+    Cryptocurrency,
+    Fiat,
+    Exchange,
+    GlobalMetrics,
+    Tools,
+    Key,
+)
+from cmc_api.cmc_datahandler import (
+    select_json_backend,
+    HandlerOriginalStructure,
+    HandlerDataDict,
+    HandlerDataSingleDict,
+    HandlerDataList,
+)
+
+
+def _import_aiohttp():
+    """aiohttp is optional and slow to import, it is loaded when the first session is created"""
+    try:
+        import aiohttp
+    except ImportError as error:  # pragma: no cover - optional dependency
+        raise ImportError(
+            "AsyncCmc requires aiohttp, install it with 'pip install cmc_api_wrapper[async]'"
+        ) from error
+    return aiohttp
+
+
+async def fetch_raw_data(
+    session, url_endpoint: str, safe_param: str
+) -> tuple[int, bytes | dict]:
+    """Coroutine version of cmc_utils.fetch_raw_data, the request and the read of its body, nothing else
+
+    Returns:
+            (tuple[int, bytes | dict]): the http code and the raw body, or the error code and {"message": ""}
+                when the request failed
+    """
+    aiohttp = _import_aiohttp()
+    try:
+        async with session.get(url_endpoint, params=safe_param) as map_resp:
+            if map_resp.status == 414:
+                raise aiohttp.ClientResponseError(
+                    request_info=map_resp.request_info,
+                    history=map_resp.history,
+                    status=414,
+                    message=f"414 Request-URI Too Large\n{map_resp.url}",
+                )
+            raw_response = await map_resp.read()
+            status_code = map_resp.status
+    except aiohttp.ClientConnectionError as connection_error:
+        cmc_utils.logger.error(
+            msg="There is something wrong with the connection.\n %s" % connection_error
+        )
+        return 400, {"message": "Connection error"}
+    except asyncio.TimeoutError as timeout:
+        cmc_utils.logger.error(msg="Timeout \n%s" % timeout)
+        return 400, {"message": "Timeout"}
+    except aiohttp.ClientResponseError as error:
+        cmc_utils.logger.error(msg="error %s" % error)
+        return 414, {"message": "error"}
+    cmc_utils.logger.debug(msg="response => %s" % status_code)
+    return status_code, raw_response
+
+
+async def open_stream(
+    session,
+    semaphore: asyncio.Semaphore,
+    url_endpoint: str,
+    safe_param: str,
+    chunk_size: int = cmc_stream.CHUNK_SIZE,
+    rate_limiter: cmc_ratelimit.RateLimiter | None = None,
+) -> tuple[int, cmc_stream.AsyncStreamedResponse | dict]:
+    """Coroutine version of cmc_stream.open_stream, the semaphore is held until the headers are received
+
+    Returns:
+            (tuple[int, AsyncStreamedResponse | dict]): the http code and the stream, or the error code and
+                {"message": ""}
+    """
+    aiohttp = _import_aiohttp()
+    try:
+        async with semaphore:
+            if rate_limiter is not None:
+                await rate_limiter.acquire_async()
+            map_resp = await session.get(url_endpoint, params=safe_param)
+    except aiohttp.ClientConnectionError as connection_error:
+        cmc_utils.logger.error(
+            msg="There is something wrong with the connection.\n %s" % connection_error
+        )
+        return 400, {"message": "Connection error"}
+    except asyncio.TimeoutError as timeout:
+        cmc_utils.logger.error(msg="Timeout \n%s" % timeout)
+        return 400, {"message": "Timeout"}
+
+    if map_resp.status != 200:
+        # error bodies are small, they are read at once
+        raw_response = await map_resp.read()
+        map_resp.release()
+        if map_resp.status == 414:
+            cmc_utils.logger.error("414 Request-URI Too Large\n%s", map_resp.url)
+            return 414, {"message": "error"}
+        status_code, response = cmc_utils.build_response(
+            map_resp.status, raw_response, HandlerOriginalStructure
+        )
+        if rate_limiter is not None:
+            rate_limiter.record(status_code, response)
+        return status_code, response
+
+    on_complete = None
+    if rate_limiter is not None:
+        on_complete = lambda metadata: rate_limiter.record(200, {"metadata": metadata})
+    return 200, cmc_stream.AsyncStreamedResponse(
+        map_resp.content.iter_chunked(chunk_size),
+        on_complete=on_complete,
+        close=map_resp.release,
+    )
+
+
+class AsyncWrapper(ABC):
+    """Abstract class, asyncio counterpart of cmc.Wrapper
+
+    The aiohttp session is created on first use (or in ``open``) so the object can be built outside a running loop.
+    A retry_policy (cmc_retry.RetryPolicy) adds adaptive timeouts, retries and hedging like in cmc.Wrapper, hedged
+    requests that lose the race are cancelled. metrics (cmc_metrics.Metrics) are recorded like in cmc.Wrapper. A
+    transport (cmc_transport.Recorder or Replayer) records or replays the responses, a replaying client opens no
+    connection. An http_config (cmc_http.HttpConfig) sets the compression, keep-alive and TLS context of the pool,
+    or replaces aiohttp with an HTTP/2 session multiplexing the requests over one connection.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        save_to_json: bool,
+        max_in_flight: int = 10,
+        pool_size: int = 100,
+        keepalive_timeout: float = 30.0,
+        cache: cmc_cache.MemoryCache | None = None,
+        rate_limiter: cmc_ratelimit.RateLimiter | None = None,
+        json_backend: str = "auto",
+        snapshot_store: cmc_snapshot.SnapshotStore | None = None,
+        single_flight: bool = True,
+        retry_policy: cmc_retry.RetryPolicy | None = None,
+        metrics: cmc_metrics.Metrics | None = None,
+        transport: cmc_transport.Recorder | cmc_transport.Replayer | None = None,
+        http_config: cmc_http.HttpConfig | None = None,
+    ):
+        self._base_url = url
+        self.save_to_json = save_to_json
+        self.headers = get_headers(api_key)
+        self.max_in_flight = max_in_flight
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.snapshot_store = snapshot_store
+        self.retry_policy = retry_policy
+        self.metrics = metrics
+        self.transport = transport
+        self.http_config = http_config or cmc_http.HttpConfig()
+        self.in_flight = cmc_singleflight.AsyncSingleFlight() if single_flight else None
+        self.json_loads = select_json_backend(json_backend)
+        self.request_session = None
+        self._semaphore = None
+
+    @property
+    def url(self):
+        """Property url"""
+        return self._base_url
+
+    @url.setter
+    def url(self, value):
+        self._base_url = value
+
+    def _ensure_session(self):
+        cmc_utils.configure_logging()
+        if self.request_session is None or self.request_session.closed:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            if self.transport is not None and not self.transport.live:
+                self.request_session = self.transport.wrap_async()
+                return
+            if self.http_config.http2:
+                self.request_session = self.http_config.async_session(
+                    self.headers,
+                    self.pool_size,
+                    self.keepalive_timeout,
+                    cmc_utils.DEFAULT_TIMEOUT,
+                )
+            else:
+                aiohttp = _import_aiohttp()
+                connector = aiohttp.TCPConnector(
+                    **self.http_config.connector_kwargs(
+                        self.pool_size, self.keepalive_timeout
+                    )
+                )
+                connect_timeout, read_timeout = cmc_utils.DEFAULT_TIMEOUT
+                self.request_session = aiohttp.ClientSession(
+                    connector=connector,
+                    headers={**self.headers, **self.http_config.headers()},
+                    timeout=aiohttp.ClientTimeout(
+                        sock_connect=connect_timeout, sock_read=read_timeout
+                    ),
+                )
+            if self.transport is not None:
+                self.request_session = self.transport.wrap_async(self.request_session)
+
+    async def open(self) -> None:
+        """Create the connection pool and refresh the usage stored in config.ini, same as cmc.Wrapper.__init__"""
+        self._ensure_session()
+        cmc_utils.create_config_file()
+        await self._update_config_file()
+
+    async def close(self) -> None:
+        """Close the connection pool"""
+        if self.request_session is not None:
+            await self.request_session.close()
+            self.request_session = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback):
+        await self.close()
+
+    async def fetch_data(
+        self,
+        uri_and_args: enum.Enum,
+        params: dict,
+        data_handler_class: cmc_utils.DataHandler,
+    ) -> tuple[int, dict]:
+        """Fetch the data, it uses fetch_raw_data from this module, a cached response is used when there is one and
+        concurrent identical calls share one fetch"""
+        key = cmc_cache.make_key(
+            self._base_url, uri_and_args, params, data_handler_class
+        )
+        if self.cache is not None:
+            response = self.cache.get(key)
+            if response is not None:
+                if self.metrics is not None:
+                    self.metrics.count_cache_hit(uri_and_args, "memory")
+                return 200, response
+
+        url_endpoint, safe_param, _ = key
+
+        def attempt():
+            return fetch_raw_data(self.request_session, url_endpoint, safe_param)
+
+        def on_response(status_code, raw_response, seconds):
+            self._on_response(uri_and_args, status_code, raw_response, seconds)
+
+        async def fetch():
+            self._ensure_session()
+            started = time.perf_counter()
+            if self.retry_policy is None:
+                async with self._admit():
+                    sent = time.perf_counter()
+                    status_code, raw_response = await attempt()
+                    seconds = time.perf_counter() - sent
+                on_response(status_code, raw_response, seconds)
+            else:
+                status_code, raw_response = await self.retry_policy.arun(
+                    url_endpoint, attempt, admit=self._admit, on_response=on_response
+                )
+            status_code, response = cmc_utils.build_response(
+                status_code,
+                raw_response,
+                data_handler_class,
+                self.json_loads,
+                metrics=self.metrics,
+                uri_and_args=uri_and_args,
+            )
+            if self.cache is not None and status_code == 200:
+                self.cache.put(key, uri_and_args, response)
+            if self.metrics is not None:
+                self.metrics.observe(
+                    uri_and_args, "total", time.perf_counter() - started
+                )
+            return status_code, response
+
+        if self.in_flight is None:
+            return await fetch()
+        return await self.in_flight.do(key, fetch)
+
+    @contextlib.asynccontextmanager
+    async def _admit(self):
+        """Held while a request is sent: a slot of max_in_flight, then a token of the rate limiter"""
+        async with self._semaphore:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            yield
+
+    def _on_response(
+        self, uri_and_args: enum.Enum, status_code: int, raw_response, seconds: float
+    ) -> None:
+        """Accounting of every request sent, retries and hedges included: the credits and the 429 pauses of the
+        rate limiter, the network time and the response counters"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.record(status_code, raw_response)
+        if self.metrics is not None:
+            self.metrics.observe(uri_and_args, "network", seconds)
+            self.metrics.record_response(uri_and_args, status_code, raw_response)
+
+    def _store_snapshot(self, endpoint: str, response: dict) -> None:
+        """See cmc.Wrapper._store_snapshot"""
+        if self.snapshot_store is not None and response.get("data"):
+            self.snapshot_store.append(response, endpoint=endpoint)
+
+    async def fetch_in_batches(
+        self,
+        uri_and_args: enum.Enum,
+        items,
+        params: dict,
+        data_handler_class: cmc_utils.DataHandler,
+        batch_key: str = "id",
+        max_url_length: int = cmc_batch.DEFAULT_MAX_URL_LENGTH,
+    ) -> dict:
+        """Coroutine version of cmc.Wrapper.fetch_in_batches, the chunks share the max_in_flight cap"""
+        chunks = cmc_batch.plan_batches(
+            items=items,
+            url=self._base_url,
+            uri_and_args=uri_and_args,
+            params=params,
+            batch_key=batch_key,
+            max_url_length=max_url_length,
+        )
+        return await cmc_batch.afetch_in_batches(
+            fetch_chunk=lambda chunk: self.fetch_data(
+                uri_and_args=uri_and_args,
+                params={**params, batch_key: chunk},
+                data_handler_class=data_handler_class,
+            ),
+            chunks=chunks,
+        )
+
+    async def stream_data(
+        self,
+        uri_and_args: enum.Enum,
+        params: dict,
+        chunk_size: int = cmc_stream.CHUNK_SIZE,
+    ) -> tuple[int, cmc_stream.AsyncStreamedResponse | dict]:
+        """Coroutine version of cmc.Wrapper.stream_data, iterate the stream with async for"""
+        self._ensure_session()
+        url_endpoint, safe_param = cmc_utils.prepare_request(
+            url=self._base_url, uri_and_args=uri_and_args, params=params
+        )
+        return await open_stream(
+            session=self.request_session,
+            semaphore=self._semaphore,
+            url_endpoint=url_endpoint,
+            safe_param=safe_param,
+            chunk_size=chunk_size,
+            rate_limiter=self.rate_limiter,
+        )
+
+    async def get_key_info(self) -> dict:
+        """Coroutine version of cmc.Wrapper.get_key_info"""
+        _, response = await self.fetch_data(
+            uri_and_args=Key.KEY_INFO,
+            params={},
+            data_handler_class=HandlerDataSingleDict,
+        )
+
+        if self.save_to_json:
+            cmc_utils.save_to_json(file_name=f"API_info", payload=response)
+
+        return response
+
+    async def _update_config_file(self):
+        api_usage = await self.get_key_info()
+        cmc_utils.update_configuration_file(value_to_add=api_usage)
+        if self.rate_limiter is not None:
+            self.rate_limiter.update_from_key_info(api_usage)
+
+
+class AsyncCmc(AsyncWrapper):
+    """Asyncio client, each method is a coroutine that returns the same response as its cmc.Cmc counterpart
+
+    Example:
+            async with AsyncCmc(url=Urls.BASE.value, api_key="KEY", max_in_flight=20) as cmc:
+                    listing, info = await asyncio.gather(cmc.get_listing(1, 100), cmc.get_info("1,2"))
+    """
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        save_to_json: bool = False,
+        **kwargs,
+    ):
+        super().__init__(url, api_key, save_to_json, **kwargs)
+
+    async def get_cmc_id_map(
+        self,
+        sort: str = "cmc_rank",
+        listing_status: str = "active",
+        data_handler_class=HandlerDataList,
+        **kwargs,
+    ) -> dict:
+        """Coroutine version of cmc.Cmc.get_cmc_id_map"""
+        kwargs["sort"] = sort
+        kwargs["listing_status"] = listing_status
+
+        _, response = await self.fetch_data(
+            uri_and_args=Cryptocurrency.CMC_ID_MAP,
+            params=kwargs,
+            data_handler_class=data_handler_class,
+        )
+        if self.save_to_json and data_handler_class is HandlerDataList:
+            cmc_utils.save_to_json(file_name="cmc_ids_mapping", payload=response)
+        return response
+
+    def iter_cmc_id_map(
+        self,
+        page_size: int = cmc_pagination.MAX_PAGE_SIZE,
+        max_rows: int | None = None,
+        by_page: bool = False,
+        **kwargs,
+    ):
+        """Async generator version of cmc.Cmc.iter_cmc_id_map"""
+        return cmc_pagination.apaginate(
+            fetch_page=lambda start, limit: self.get_cmc_id_map(
+                start=start, limit=limit, **kwargs
+            ),
+            page_size=page_size,
+            max_rows=max_rows,
+            by_page=by_page,
+        )
+
+    async def stream_cmc_id_map(
+        self,
+        sort: str = "cmc_rank",
+        listing_status: str = "active",
+        chunk_size: int = cmc_stream.CHUNK_SIZE,
+        **kwargs,
+    ):
+        """Coroutine version of cmc.Cmc.stream_cmc_id_map, iterate the result with async for"""
+        kwargs["sort"] = sort
+        kwargs["listing_status"] = listing_status
+
+        _, response = await self.stream_data(
+            uri_and_args=Cryptocurrency.CMC_ID_MAP,
+            params=kwargs,
+            chunk_size=chunk_size,
+        )
+        return response
+
+    async def get_id_index(
+        self,
+        index: cmc_index.CmcIdIndex | None = None,
+        listing_status: str = "active",
+        page_size: int = cmc_pagination.MAX_PAGE_SIZE,
+        **kwargs,
+    ) -> cmc_index.CmcIdIndex:
+        """Coroutine version of cmc.Cmc.get_id_index"""
+        index = cmc_index.CmcIdIndex() if index is None else index
+        async for page in self.iter_cmc_id_map(
+            page_size=page_size, by_page=True, listing_status=listing_status, **kwargs
+        ):
+            index.merge(page["data"])
+        return index
+
+    async def get_info(self, cmc_id: str, **kwargs):
+        """Coroutine version of cmc.Cmc.get_info"""
+        kwargs["id"] = cmc_id
+
+        _, response = await self.fetch_data(
+            uri_and_args=Cryptocurrency.INFO,
+            params=kwargs,
+            data_handler_class=HandlerDataDict,
+        )
+        if self.save_to_json:
+            cmc_utils.save_to_json(file_name="info", payload=response)
+        return response
+
+    async def get_info_batch(
+        self,
+        cmc_ids,
+        batch_key: str = "id",
+        max_url_length: int = cmc_batch.DEFAULT_MAX_URL_LENGTH,
+        **kwargs,
+    ) -> dict:
+        """Coroutine version of cmc.Cmc.get_info_batch"""
+        return await self.fetch_in_batches(
+            uri_and_args=Cryptocurrency.INFO,
+            items=cmc_ids,
+            params=kwargs,
+            data_handler_class=HandlerDataDict,
+            batch_key=batch_key,
+            max_url_length=max_url_length,
+        )
+
+    async def get_listing(
+        self,
+        start: int,
+        limit: int,
+        data_handler_class=HandlerDataList,
+        **kwargs,
+    ):
+        """Coroutine version of cmc.Cmc.get_listing"""
+        kwargs["start"] = start
+        kwargs["limit"] = limit
+
+        _, response = await self.fetch_data(
+            uri_and_args=Cryptocurrency.LATEST_LIST_PRICE,
+            params=kwargs,
+            data_handler_class=data_handler_class,
+        )
+        if data_handler_class is HandlerDataList:
+            self._store_snapshot("listing", response)
+        if self.save_to_json and data_handler_class is HandlerDataList:
+            timestamp = cmc_utils.get_todays_timestamp()
+            cmc_utils.save_to_json(
+                file_name=f"latest_listing_{timestamp} ", payload=response
+            )
+        return response
+
+    def iter_listing(
+        self,
+        page_size: int = cmc_pagination.MAX_PAGE_SIZE,
+        max_rows: int | None = None,
+        by_page: bool = False,
+        **kwargs,
+    ):
+        """Async generator version of cmc.Cmc.iter_listing"""
+        return cmc_pagination.apaginate(
+            fetch_page=lambda start, limit: self.get_listing(start, limit, **kwargs),
+            page_size=page_size,
+            max_rows=max_rows,
+            by_page=by_page,
+        )
+
+    async def stream_listing(
+        self,
+        start: int = 1,
+        limit: int = cmc_pagination.MAX_PAGE_SIZE,
+        chunk_size: int = cmc_stream.CHUNK_SIZE,
+        **kwargs,
+    ):
+        """Coroutine version of cmc.Cmc.stream_listing, iterate the result with async for"""
+        kwargs["start"] = start
+        kwargs["limit"] = limit
+
+        _, response = await self.stream_data(
+            uri_and_args=Cryptocurrency.LATEST_LIST_PRICE,
+            params=kwargs,
+            chunk_size=chunk_size,
+        )
+        return response
+
+    async def get_categories(self, start: int, limit: int, **kwargs):
+        """Coroutine version of cmc.Cmc.get_categories"""
+        kwargs["start"] = start
+        kwargs["limit"] = limit
+
+        _, response = await self.fetch_data(
+            uri_and_args=Cryptocurrency.CATEGORIES,
+            params=kwargs,
+            data_handler_class=HandlerDataList,
+        )
+        if self.save_to_json:
+            cmc_utils.save_to_json(file_name=f"categories", payload=response)
+        return response
+
+    def iter_categories(
+        self,
+        page_size: int = cmc_pagination.MAX_PAGE_SIZE,
+        max_rows: int | None = None,
+        by_page: bool = False,
+        **kwargs,
+    ):
+        """Async generator version of cmc.Cmc.iter_categories"""
+        return cmc_pagination.apaginate(
+            fetch_page=lambda start, limit: self.get_categories(start, limit, **kwargs),
+            page_size=page_size,
+            max_rows=max_rows,
+            by_page=by_page,
+        )
+
+    async def get_category(self, cmc_id: str, **kwargs):
+        """Coroutine version of cmc.Cmc.get_category"""
+        kwargs["id"] = cmc_id
+
+        _, response = await self.fetch_data(
+            uri_and_args=Cryptocurrency.CATEGORY,
+            params=kwargs,
+            data_handler_class=HandlerDataSingleDict,
+        )
+        if self.save_to_json:
+            cmc_utils.save_to_json(
+                file_name=f"category_{response['data']['title']}", payload=response
+            )
+        return response
+
+    async def get_quote_latest(
+        self,
+        cmc_id: str,
+        skip_invalid: bool = True,
+        data_handler_class=HandlerDataSingleDict,
+        **kwargs,
+    ):
+        """Coroutine version of cmc.Cmc.get_quote_latest"""
+        kwargs["id"] = cmc_id
+        kwargs["skip_invalid"] = skip_invalid
+
+        _, response = await self.fetch_data(
+            uri_and_args=Cryptocurrency.QUOTE_LATEST,
+            params=kwargs,
+            data_handler_class=data_handler_class,
+        )
+        if data_handler_class is HandlerDataSingleDict:
+            self._store_snapshot("quotes", response)
+        if self.save_to_json and data_handler_class is HandlerDataSingleDict:
+            timestamp = cmc_utils.get_todays_timestamp()
+            cmc_utils.save_to_json(
+                file_name=f"cmc_id_{cmc_id}_quote_{timestamp}", payload=response
+            )
+        return response
+
+    async def get_quote_latest_batch(
+        self,
+        cmc_ids,
+        skip_invalid: bool = True,
+        batch_key: str = "id",
+        max_url_length: int = cmc_batch.DEFAULT_MAX_URL_LENGTH,
+        **kwargs,
+    ) -> dict:
+        """Coroutine version of cmc.Cmc.get_quote_latest_batch"""
+        kwargs["skip_invalid"] = skip_invalid
+        return await self.fetch_in_batches(
+            uri_and_args=Cryptocurrency.QUOTE_LATEST,
+            items=cmc_ids,
+            params=kwargs,
+            data_handler_class=HandlerDataSingleDict,
+            batch_key=batch_key,
+            max_url_length=max_url_length,
+        )
+
+    # Fiat endPoint
+    async def get_fiat(self, **kwargs) -> dict:
+        """Coroutine version of cmc.Cmc.get_fiat"""
+        kwargs["include_metals"] = True
+        _, response = await self.fetch_data(
+            uri_and_args=Fiat.FIAT,
+            params=kwargs,
+            data_handler_class=HandlerDataList,
+        )
+
+        if self.save_to_json:
+            cmc_utils.save_to_json(file_name=f"fiat_ids.json", payload=response)
+
+        return response
+
+    def iter_fiat(
+        self,
+        page_size: int = cmc_pagination.MAX_PAGE_SIZE,
+        max_rows: int | None = None,
+        by_page: bool = False,
+        **kwargs,
+    ):
+        """Async generator version of cmc.Cmc.iter_fiat"""
+        return cmc_pagination.apaginate(
+            fetch_page=lambda start, limit: self.get_fiat(
+                start=start, limit=limit, **kwargs
+            ),
+            page_size=page_size,
+            max_rows=max_rows,
+            by_page=by_page,
+        )
+
+    # Exchange endPoint
+    async def get_exchange_map(self, listing_status: str = "active", **kwargs) -> dict:
+        """Coroutine version of cmc.Cmc.get_exchange_map"""
+        kwargs["listing_status"] = listing_status
+        _, response = await self.fetch_data(
+            uri_and_args=Exchange.EXCHANGE_MAP,
+            params=kwargs,
+            data_handler_class=HandlerDataList,
+        )
+
+        if self.save_to_json:
+            cmc_utils.save_to_json(file_name=f"Exchange_cmc_id.json", payload=response)
+
+        return response
+
+    def iter_exchange_map(
+        self,
+        page_size: int = cmc_pagination.MAX_PAGE_SIZE,
+        max_rows: int | None = None,
+        by_page: bool = False,
+        **kwargs,
+    ):
+        """Async generator version of cmc.Cmc.iter_exchange_map"""
+        return cmc_pagination.apaginate(
+            fetch_page=lambda start, limit: self.get_exchange_map(
+                start=start, limit=limit, **kwargs
+            ),
+            page_size=page_size,
+            max_rows=max_rows,
+            by_page=by_page,
+        )
+
+    async def get_exchange_info(self, cmc_ex_id: str, **kwargs) -> dict:
+        """Coroutine version of cmc.Cmc.get_exchange_info"""
+        kwargs["id"] = cmc_ex_id
+        _, response = await self.fetch_data(
+            uri_and_args=Exchange.EXCHANGE_INFO,
+            params=kwargs,
+            data_handler_class=HandlerDataDict,
+        )
+
+        if self.save_to_json:
+            cmc_utils.save_to_json(
+                file_name=f"Exchange_{cmc_ex_id}.json", payload=response
+            )
+
+        return response
+
+    async def get_exchange_info_batch(
+        self,
+        cmc_ex_ids,
+        batch_key: str = "id",
+        max_url_length: int = cmc_batch.DEFAULT_MAX_URL_LENGTH,
+        **kwargs,
+    ) -> dict:
+        """Coroutine version of cmc.Cmc.get_exchange_info_batch"""
+        return await self.fetch_in_batches(
+            uri_and_args=Exchange.EXCHANGE_INFO,
+            items=cmc_ex_ids,
+            params=kwargs,
+            data_handler_class=HandlerDataDict,
+            batch_key=batch_key,
+            max_url_length=max_url_length,
+        )
+
+    # GlobalMetrics endPoint
+    async def get_latest_global_metrics(self, **kwargs) -> dict:
+        """Coroutine version of cmc.Cmc.get_latest_global_metrics"""
+        _, response = await self.fetch_data(
+            uri_and_args=GlobalMetrics.LATEST_GLOBAL_METRICS,
+            params=kwargs,
+            data_handler_class=HandlerDataSingleDict,
+        )
+        if self.save_to_json:
+            timestamp = cmc_utils.get_todays_timestamp()
+            cmc_utils.save_to_json(
+                file_name=f"Global_metrics_{timestamp}.json", payload=response
+            )
+
+        return response
+
+    # Tools endPoint
+    async def get_price_conversion(self, amount: float, cmc_id: str, **kwargs):
+        """Coroutine version of cmc.Cmc.get_price_conversion"""
+        kwargs["amount"] = amount
+        kwargs["id"] = cmc_id
+        _, response = await self.fetch_data(
+            uri_and_args=Tools.PRICE_CONVERSION,
+            params=kwargs,
+            data_handler_class=HandlerDataSingleDict,
+        )
+        if self.save_to_json:
+            timestamp = cmc_utils.get_todays_timestamp()
+            cmc_utils.save_to_json(
+                file_name=f"Price_conversion_{cmc_id}_{timestamp}.json",
+                payload=response,
+            )
+
+        return response
@@ -0,0 +1,200 @@
+"""Batch helpers
+Split a long list of ids/slugs/symbols into the fewest requests whose URL fits the server limit (avoids the 414),
+run them concurrently and merge the responses back into one. Fan out independent calls on a bounded thread pool.
+"""
+
+import enum
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+from urllib import parse
+
+from cmc_api import cmc_utils
+
+# Conservative limit for the full URL (endpoint + query string)
+DEFAULT_MAX_URL_LENGTH = 4096
+
+
+def split_items(items: str | int | Iterable[str | int]) -> list[str]:
+    """Normalise ids given as a comma-separated string or an iterable, duplicates are dropped keeping the order"""
+    if isinstance(items, (str, int)):
+        items = str(items).split(",")
+    cleaned = (str(item).strip() for item in items)
+    return list(dict.fromkeys(item for item in cleaned if item))
+
+
+def plan_batches(
+    items: str | Iterable[str | int],
+    url: str,
+    uri_and_args: enum.Enum,
+    params: dict,
+    batch_key: str = "id",
+    max_url_length: int = DEFAULT_MAX_URL_LENGTH,
+) -> list[str]:
+    """Group the items in comma-separated chunks, each chunk fits in one request URL
+
+    Args:
+            items (str | Iterable): ids, slugs or symbols to request.
+            url (str): base url of the API.
+            uri_and_args (enum.Enum): endpoint that will be requested.
+            params (dict): the other parameters of the request, they take room in the URL too.
+            batch_key (str): name of the parameter that receives the chunk ("id", "slug" or "symbol").
+            max_url_length (int): maximum length of the full URL.
+
+    Returns:
+            (list[str]): the chunks, ready to be used as the value of batch_key.
+    """
+    other_params = {k: v for k, v in params.items() if k != batch_key}
+    url_endpoint, safe_param = cmc_utils.prepare_request(
+        url=url, uri_and_args=uri_and_args, params=other_params
+    )
+    # url?other_params&key=
+    fixed_length = len(url_endpoint) + 1 + len(safe_param) + len(batch_key) + 1
+    if safe_param:
+        fixed_length += 1
+    room = max_url_length - fixed_length
+
+    chunks, current, current_length = [], [], 0
+    for item in split_items(items):
+        item_length = len(parse.quote(item, safe=',"'))
+        if item_length > room:
+            raise ValueError(f"'{item}' does not fit in a URL of {max_url_length}")
+        # one comma between items
+        needed = item_length + (1 if current else 0)
+        if current and current_length + needed > room:
+            chunks.append(",".join(current))
+            current, current_length = [], 0
+            needed = item_length
+        current.append(item)
+        current_length += needed
+    if current:
+        chunks.append(",".join(current))
+    return chunks
+
+
+def merge_responses(responses: list[tuple[int, dict]]) -> dict:
+    """Merge the responses of the chunks in one response
+
+    "data" dicts are merged, "credit_count" is summed, "timestamp" is the latest and "timestamp_earliest" the
+    earliest of the chunks, errors of the failed chunks are joined in "error_message".
+
+    Args:
+            responses (list[tuple[int, dict]]): (http code, response) of every chunk.
+
+    Returns:
+            (dict): {metadata: {"timestamp": "", "timestamp_earliest": "", "credit_count": "", "error_message": "",
+                    "list_keys": "", "batches": ""}, data: "the merged data"}
+    """
+    data = {}
+    list_keys = {}
+    timestamps = []
+    credit_count = 0
+    errors = []
+    for status_code, response in responses:
+        if status_code != 200 or "data" not in response:
+            errors.append(f"{status_code}: {response.get('message', response)}")
+            continue
+        metadata = response["metadata"]
+        data.update(response["data"])
+        list_keys.update(dict.fromkeys(metadata.get("list_keys") or []))
+        timestamps.append(metadata["timestamp"])
+        credit_count += metadata["credit_count"] or 0
+        if metadata["error_message"]:
+            errors.append(metadata["error_message"])
+
+    metadata = {
+        "timestamp": max(timestamps) if timestamps else None,
+        "timestamp_earliest": min(timestamps) if timestamps else None,
+        "credit_count": credit_count,
+        "error_message": "; ".join(errors) if errors else None,
+        "list_keys": list(list_keys),
+        "batches": len(responses),
+    }
+    return {"metadata": metadata, "data": data}
+
+
+def fetch_in_batches(
+    fetch_chunk: Callable[[str], tuple[int, dict]],
+    chunks: list[str],
+    max_workers: int = 4,
+) -> dict:
+    """Run fetch_chunk for every chunk on a thread pool and merge the results"""
+    if len(chunks) <= 1 or max_workers <= 1:
+        return merge_responses([fetch_chunk(chunk) for chunk in chunks])
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        return merge_responses(list(executor.map(fetch_chunk, chunks)))
+
+
+async def afetch_in_batches(
+    fetch_chunk: Callable[[str], Awaitable[tuple[int, dict]]], chunks: list[str]
+) -> dict:
+    """Coroutine version of fetch_in_batches, the concurrency is bounded by the client's max_in_flight"""
+    import asyncio
+
+    responses = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+    return merge_responses(list(responses))
+
+
+class CallResult:
+    """Outcome of one call of map_calls
+
+    Attributes:
+            value (Any): what the call returned, None when it raised.
+            error (BaseException | None): the exception raised by the call.
+    """
+
+    __slots__ = ("value", "error")
+
+    def __init__(self, value: Any = None, error: BaseException | None = None):
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """False when the call raised or returned an error response ({"message": ""} without data)"""
+        if self.error is not None:
+            return False
+        return not (
+            isinstance(self.value, dict)
+            and "data" not in self.value
+            and "message" in self.value
+        )
+
+    def result(self) -> Any:
+        """The value, or raise the error of the call"""
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def __repr__(self):
+        if self.error is not None:
+            return f"CallResult(error={self.error!r})"
+        return f"CallResult(ok={self.ok})"
+
+
+def _run_call(call) -> CallResult:
+    function, *args = call if isinstance(call, tuple) else (call,)
+    try:
+        return CallResult(value=function(*args))
+    except Exception as error:
+        return CallResult(error=error)
+
+
+def map_calls(calls: Iterable, max_workers: int = 4) -> list[CallResult]:
+    """Run independent calls on a bounded thread pool
+
+    Args:
+            calls (Iterable): callables, or (callable, *args) tuples, e.g. (cmc.get_category, cmc_id).
+            max_workers (int): calls running at once.
+
+    Returns:
+            (list[CallResult]): one result per call, in the order of calls, a failing call does not stop the others.
+    """
+    calls = list(calls)
+    if len(calls) <= 1 or max_workers <= 1:
+        return [_run_call(call) for call in calls]
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as executor:
+        return list(executor.map(_run_call, calls))
@@ -0,0 +1,295 @@
+"""Response caches
+Opt-in caches used by Wrapper.fetch_data, the entries are keyed on the prepared request.
+MemoryCache keeps the built responses of one process, SqliteCache keeps the raw bodies on disk and is shared
+between processes and restarts.
+"""
+
+import enum
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from cmc_api import cmc_utils
+from cmc_api.cmc_helper import (
+    Cryptocurrency,
+    Fiat,
+    Exchange,
+    GlobalMetrics,
+    Tools,
+    Key,
+)
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# Time to live in seconds, static data can live long while market data refreshes every minute on the API side.
+DEFAULT_TTLS = {
+    Cryptocurrency.CMC_ID_MAP: DAY,
+    Cryptocurrency.INFO: DAY,
+    Cryptocurrency.CATEGORIES: HOUR,
+    Cryptocurrency.CATEGORY: 5 * MINUTE,
+    Cryptocurrency.QUOTE_LATEST: MINUTE,
+    Cryptocurrency.LATEST_LIST_PRICE: MINUTE,
+    Fiat.FIAT: DAY,
+    Exchange.EXCHANGE_MAP: DAY,
+    Exchange.EXCHANGE_INFO: DAY,
+    GlobalMetrics.LATEST_GLOBAL_METRICS: MINUTE,
+    Tools.PRICE_CONVERSION: MINUTE,
+    # the usage of the key must always be fresh
+    Key.KEY_INFO: 0,
+}
+
+
+def make_key(
+    url: str,
+    uri_and_args: enum.Enum,
+    params: dict,
+    data_handler_class: cmc_utils.DataHandler,
+) -> tuple[str, str, str]:
+    """Cache key: the (url_endpoint, safe_param) built by prepare_request plus the handler that shapes the data"""
+    url_endpoint, safe_param = cmc_utils.prepare_request(
+        url=url, uri_and_args=uri_and_args, params=params
+    )
+    return url_endpoint, safe_param, data_handler_class.__name__
+
+
+class MemoryCache:
+    """In-process LRU cache with a time to live per endpoint
+
+    Responses are stored as built by the data handler and returned as they are, callers must not mutate them.
+
+    Args:
+            max_entries (int): maximum number of responses kept, the least recently used is evicted first.
+            ttls (dict, optional): {endpoint enum: seconds}, overrides DEFAULT_TTLS for the given endpoints.
+            default_ttl (float): seconds for the endpoints not in ttls, 0 disables the cache for them.
+    """
+
+    def __init__(
+        self, max_entries: int = 1024, ttls: dict | None = None, default_ttl=MINUTE
+    ):
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ttl_for(self, uri_and_args: enum.Enum) -> float:
+        """Time to live of the endpoint in seconds"""
+        return self.ttls.get(uri_and_args, self.default_ttl)
+
+    def get(self, key: tuple) -> dict | None:
+        """Get a fresh response or None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, uri_and_args: enum.Enum, response: dict) -> None:
+        """Store a response, nothing is stored for endpoints with a ttl of 0"""
+        ttl = self.ttl_for(uri_and_args)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry, counters are kept"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self) -> dict:
+        """Hit/miss counters"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+        }
+
+
+class SqliteCache:
+    """Disk cache of raw response bodies in a SQLite database (WAL mode), shared by several processes
+
+    Each row keeps the body, the endpoint and the fetch time. When an entry is stale only one process gets the
+    refresh lease and calls the API, meanwhile the others use the stale body or, when there is none, wait for it.
+
+    Args:
+            path (str): location of the database file.
+            ttls (dict, optional): {endpoint enum: seconds}, overrides DEFAULT_TTLS for the given endpoints.
+            default_ttl (float): seconds for the endpoints not in ttls, 0 disables the cache for them.
+            lease_timeout (float): seconds a refresh lease is valid, a crashed process can't block the others longer.
+    """
+
+    def __init__(
+        self,
+        path: str = "cmc_cache.sqlite",
+        ttls: dict | None = None,
+        default_ttl=MINUTE,
+        lease_timeout: float = 30.0,
+    ):
+        import uuid
+
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.lease_timeout = lease_timeout
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex}"
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, fetched_at REAL NOT NULL, body BLOB NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                "key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def _connection(self):
+        """One connection per thread, sqlite3 connections can't be shared between threads"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            import sqlite3
+
+            connection = sqlite3.connect(self.path, timeout=self.lease_timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def make_key(url_endpoint: str, safe_param: str) -> str:
+        """Raw bodies don't depend on the data handler, the prepared request is enough"""
+        return f"{url_endpoint}?{safe_param}"
+
+    def ttl_for(self, uri_and_args: enum.Enum) -> float:
+        """Time to live of the endpoint in seconds"""
+        return self.ttls.get(uri_and_args, self.default_ttl)
+
+    def get(
+        self, key: str, uri_and_args: enum.Enum, stale: bool = False
+    ) -> bytes | None:
+        """Get the body stored for the key, None if there is none or it is older than the endpoint ttl"""
+        row = (
+            self._connection()
+            .execute("SELECT fetched_at, body FROM responses WHERE key = ?", (key,))
+            .fetchone()
+        )
+        if row is None:
+            return None
+        fetched_at, body = row
+        if not stale and time.time() - fetched_at >= self.ttl_for(uri_and_args):
+            return None
+        return body
+
+    def put(self, key: str, uri_and_args: enum.Enum, body: bytes) -> None:
+        """Store a body, nothing is stored for endpoints with a ttl of 0"""
+        if self.ttl_for(uri_and_args) <= 0:
+            return
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, fetched_at, body) VALUES (?, ?, ?, ?)",
+                (key, uri_and_args.name, time.time(), body),
+            )
+
+    def acquire_lease(self, key: str) -> bool:
+        """Try to become the process that refreshes the key"""
+        now = time.time()
+        with self._connection() as connection:
+            connection.execute(
+                "DELETE FROM leases WHERE key = ? AND expires < ?", (key, now)
+            )
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO leases (key, owner, expires) VALUES (?, ?, ?)",
+                (key, self.owner, now + self.lease_timeout),
+            )
+            return cursor.rowcount == 1
+
+    def release_lease(self, key: str) -> None:
+        """Give back a lease taken with acquire_lease"""
+        with self._connection() as connection:
+            connection.execute(
+                "DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner)
+            )
+
+    def fetch(
+        self,
+        key: str,
+        uri_and_args: enum.Enum,
+        fetch_raw: Callable[[], tuple[int, bytes | dict]],
+        poll_interval: float = 0.05,
+    ) -> tuple[int, bytes | dict]:
+        """Get the body from the disk or from fetch_raw, only one process refreshes a stale entry
+
+        Args:
+                key (str): key built with make_key.
+                uri_and_args (enum.Enum): endpoint, it selects the ttl.
+                fetch_raw (Callable[[], tuple[int, bytes | dict]]): does the request, see cmc_utils.fetch_raw_data.
+                poll_interval (float): seconds between checks while another process refreshes the entry.
+
+        Returns:
+                (tuple[int, bytes | dict]): the http code and the raw body, or the error from fetch_raw.
+        """
+        body = self.get(key, uri_and_args)
+        if body is not None:
+            self.hits += 1
+            return 200, body
+        self.misses += 1
+
+        deadline = time.monotonic() + self.lease_timeout
+        while not self.acquire_lease(key):
+            # another process is refreshing it, meanwhile the stale body is good enough
+            body = self.get(key, uri_and_args, stale=True)
+            if body is not None:
+                return 200, body
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(poll_interval)
+
+        try:
+            # the previous lease owner may have stored a fresh body while this process waited
+            body = self.get(key, uri_and_args)
+            if body is not None:
+                return 200, body
+            status_code, raw_response = fetch_raw()
+            if status_code == 200 and isinstance(raw_response, (bytes, str)):
+                self.put(key, uri_and_args, raw_response)
+        finally:
+            self.release_lease(key)
+        return status_code, raw_response
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._connection() as connection:
+            connection.execute("DELETE FROM responses")
+
+    @property
+    def stats(self) -> dict:
+        """Hit/miss counters of this process"""
+        (entries,) = (
+            self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()
+        )
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
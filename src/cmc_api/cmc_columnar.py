@@ -0,0 +1,217 @@
+"""Columnar result mode
+Data handler that flattens listing and quote responses into NumPy arrays, so screening the whole universe
+(filter, sort, aggregate) is done with vectorized operations instead of loops over nested dicts.
+Requires numpy (pip install cmc_api_wrapper[columnar]).
+"""
+
+from typing import Any
+
+import numpy as np
+
+from cmc_api.cmc_datahandler import AbstractDataHandler, coins_of
+
+# Numeric fields read from quote -> <convert>
+QUOTE_FIELDS = (
+    "price",
+    "market_cap",
+    "volume_24h",
+    "percent_change_1h",
+    "percent_change_24h",
+    "percent_change_7d",
+    "percent_change_30d",
+)
+
+
+class StringTable:
+    """Strings stored once, each row points to its string with an int32 code"""
+
+    def __init__(self, values: list[str]):
+        uniques = {}
+        codes = [uniques.setdefault(value, len(uniques)) for value in values]
+        self.strings = np.array(list(uniques), dtype=str)
+        self.codes = np.array(codes, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def code_of(self, value: str) -> int:
+        """Code of a string, -1 when it is not in the table"""
+        found = np.flatnonzero(self.strings == value)
+        return int(found[0]) if len(found) else -1
+
+    def equals(self, value: str) -> np.ndarray:
+        """Boolean mask of the rows holding value"""
+        return self.codes == self.code_of(value)
+
+    def take(self, rows: np.ndarray) -> "StringTable":
+        """Table restricted to rows (a mask or indices), the strings are shared"""
+        table = StringTable.__new__(StringTable)
+        table.strings = self.strings
+        table.codes = self.codes[rows]
+        return table
+
+    def decode(self) -> np.ndarray:
+        """The strings of every row"""
+        return self.strings[self.codes]
+
+
+class ColumnarQuotes:
+    """Columns of a listing or quotes response, row i of every array is the same coin
+
+    Attributes:
+            convert (str): currency of the quote fields.
+            ids (np.ndarray[int64]): CoinMarketCap ids.
+            cmc_rank (np.ndarray[int64]): rank, -1 when the response has none.
+            last_updated (np.ndarray[datetime64[ms]]): last update of the quote.
+            symbols, slugs, names (StringTable): string columns.
+            columns (dict[str, np.ndarray[float64]]): quote fields, NaN when missing.
+    """
+
+    def __init__(
+        self, convert, ids, cmc_rank, last_updated, symbols, slugs, names, columns
+    ):
+        self.convert = convert
+        self.ids = ids
+        self.cmc_rank = cmc_rank
+        self.last_updated = last_updated
+        self.symbols = symbols
+        self.slugs = slugs
+        self.names = names
+        self.columns = columns
+
+    @classmethod
+    def from_records(
+        cls, records: list[dict], convert: str | None = None, fields=QUOTE_FIELDS
+    ) -> "ColumnarQuotes":
+        """Build the columns from the coin dicts of a response"""
+        if convert is None:
+            convert = next(iter(records[0]["quote"]), "USD") if records else "USD"
+        quotes = [(record.get("quote") or {}).get(convert) or {} for record in records]
+        nan = float("nan")
+        columns = {
+            field: np.fromiter(
+                (nan if quote.get(field) is None else quote[field] for quote in quotes),
+                dtype=np.float64,
+                count=len(quotes),
+            )
+            for field in fields
+        }
+        return cls(
+            convert=convert,
+            ids=np.fromiter(
+                (record["id"] for record in records), dtype=np.int64, count=len(records)
+            ),
+            cmc_rank=np.fromiter(
+                (record.get("cmc_rank") or -1 for record in records),
+                dtype=np.int64,
+                count=len(records),
+            ),
+            last_updated=np.array(
+                [(quote.get("last_updated") or "NaT").rstrip("Z") for quote in quotes],
+                dtype="datetime64[ms]",
+            ),
+            symbols=StringTable([record.get("symbol", "") for record in records]),
+            slugs=StringTable([record.get("slug", "") for record in records]),
+            names=StringTable([record.get("name", "") for record in records]),
+            columns=columns,
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        """Quote column, or ids / cmc_rank / last_updated"""
+        if field in self.columns:
+            return self.columns[field]
+        if field in ("ids", "id", "cmc_rank", "last_updated"):
+            return self.ids if field == "id" else getattr(self, field)
+        raise KeyError(field)
+
+    def take(self, rows: np.ndarray) -> "ColumnarQuotes":
+        """New ColumnarQuotes with the given rows, a boolean mask or indices"""
+        return ColumnarQuotes(
+            convert=self.convert,
+            ids=self.ids[rows],
+            cmc_rank=self.cmc_rank[rows],
+            last_updated=self.last_updated[rows],
+            symbols=self.symbols.take(rows),
+            slugs=self.slugs.take(rows),
+            names=self.names.take(rows),
+            columns={field: column[rows] for field, column in self.columns.items()},
+        )
+
+    def filter(self, mask: np.ndarray) -> "ColumnarQuotes":
+        """Rows where mask is True, e.g. quotes.filter(quotes["market_cap"] > 1e9)"""
+        return self.take(np.asarray(mask, dtype=bool))
+
+    def sort_by(self, field: str, descending: bool = True) -> "ColumnarQuotes":
+        """Rows sorted by a column, NaN always last"""
+        column = self[field]
+        order = np.argsort(-column if descending else column, kind="stable")
+        return self.take(order)
+
+    def top(self, n: int, field: str = "market_cap") -> "ColumnarQuotes":
+        """The n rows with the highest value of field"""
+        column = self[field]
+        if n >= len(self):
+            return self.sort_by(field)
+        # argpartition is O(n), only the n selected rows are sorted
+        keys = np.where(np.isnan(column), -np.inf, column)
+        selected = np.argpartition(-keys, n)[:n]
+        return self.take(selected[np.argsort(-keys[selected], kind="stable")])
+
+    def row(self, index: int) -> dict[str, Any]:
+        """One coin as a flat dict"""
+        return {
+            "id": int(self.ids[index]),
+            "symbol": str(self.symbols.strings[self.symbols.codes[index]]),
+            "slug": str(self.slugs.strings[self.slugs.codes[index]]),
+            "name": str(self.names.strings[self.names.codes[index]]),
+            "cmc_rank": int(self.cmc_rank[index]),
+            "last_updated": self.last_updated[index],
+            **{field: float(column[index]) for field, column in self.columns.items()},
+        }
+
+
+class HandlerColumnar(AbstractDataHandler):
+    """Data value of listings and quotes turned into a ColumnarQuotes
+
+    Use it as data_handler_class of get_listing / get_quote_latest, HandlerColumnar.configure gives a handler for
+    another currency or another set of quote fields.
+    """
+
+    convert = None
+    fields = QUOTE_FIELDS
+
+    @classmethod
+    def configure(cls, convert: str | None = None, fields=QUOTE_FIELDS) -> type:
+        """Handler reading the quote in convert (the first currency of the quote when None) and the given fields"""
+        # the name is part of the cache key, handlers with other settings must not share it
+        return type(
+            f"{cls.__name__}[{convert or ''}:{','.join(fields)}]",
+            (cls,),
+            {"convert": convert, "fields": tuple(fields)},
+        )
+
+    @classmethod
+    def data_extraction(cls, payload: dict) -> (dict, ColumnarQuotes):
+        """
+        The coins of the response as columns.
+
+        Args:
+                payload (dict): The response from the endpoint in json form.
+
+        Return:
+                (dict, ColumnarQuotes): Returns a tuple where first parameter is metadata and the second is data.
+
+        """
+        data = ColumnarQuotes.from_records(
+            coins_of(payload["data"]), convert=cls.convert, fields=cls.fields
+        )
+        metadata = {
+            "timestamp": payload["status"]["timestamp"],
+            "credit_count": payload["status"]["credit_count"],
+            "error_message": payload["status"]["error_message"],
+            "list_keys": ["ids", "cmc_rank", "last_updated", *data.columns],
+        }
+        return metadata, data
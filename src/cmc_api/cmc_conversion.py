@@ -0,0 +1,336 @@
+"""Local price conversion
+Cross rates between cryptocurrencies and fiats computed from the USD quotes a client already fetched (listings and
+quotes) and from fiat rates, so converting an amount spends no credit and no round trip. Every currency is held as
+its USD price, the rate of a pair is the ratio of two prices and batches of (amount, from, to) are converted with
+array gathers. Only the conversions at a historical time go to /v1/tools/price-conversion.
+Requires numpy (pip install cmc_api_wrapper[columnar]).
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+import numpy as np
+
+from cmc_api.cmc_datahandler import coins_of
+from cmc_api.cmc_snapshot import to_epoch
+
+# CoinMarketCap id of the US dollar, every rate is kept against it
+USD_ID = 2781
+# Rows added at once when the arrays are full
+GROW = 256
+
+
+class PriceConverter:
+    """Cross rates of every currency of the merged responses
+
+    Currencies are given by CoinMarketCap id (int) or by symbol (str). Symbols are not unique among the
+    cryptocurrencies, a symbol points to the coin with the best cmc_rank, and a fiat symbol always points to the fiat.
+    A currency seen only as a convert option of a quote is known by its symbol until merge_fiat_map gives its id.
+
+    Args:
+            client (cmc.Cmc, optional): used by refresh and by convert for the historical conversions.
+            clock (Callable[[], float]): current time in seconds since the epoch, the ages are measured with it.
+    """
+
+    def __init__(self, client=None, clock: Callable[[], float] = time.time):
+        self.client = client
+        self.clock = clock
+        self._usd = np.full(GROW, np.nan)
+        self._updated = np.full(GROW, np.nan)
+        # currency key (id, or symbol while the id is unknown): row of the arrays
+        self._rows: dict[int | str, int] = {}
+        # symbol: (key, rank)
+        self._symbols: dict[str, tuple[int | str, float]] = {}
+        self._fiats: set[int | str] = set()
+        self._lock = threading.Lock()
+        # the dollar is always worth one dollar, an infinite update time gives it an age of 0
+        self._set(USD_ID, 1.0, np.inf)
+        self._link(USD_ID, "USD", fiat=True)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, currency) -> bool:
+        return self._row(currency) is not None
+
+    def _key(self, currency: int | str) -> int | str | None:
+        if isinstance(currency, str):
+            if currency.isdigit():
+                return int(currency)
+            linked = self._symbols.get(currency.upper())
+            return None if linked is None else linked[0]
+        return int(currency)
+
+    def _row(self, currency: int | str) -> int | None:
+        return self._rows.get(self._key(currency))
+
+    def _set(self, key: int | str, usd_price: float, updated: float) -> None:
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._rows)
+            if row == len(self._usd):
+                self._usd = np.concatenate([self._usd, np.full(GROW, np.nan)])
+                self._updated = np.concatenate([self._updated, np.full(GROW, np.nan)])
+            self._rows[key] = row
+        # an older quote does not replace a newer one
+        if not self._updated[row] > updated:
+            self._usd[row] = usd_price
+            self._updated[row] = updated
+
+    def _link(
+        self, key: int | str, symbol: str | None, rank: float = np.inf, fiat=False
+    ) -> None:
+        """Point symbol to key, unless it points to a fiat or to a coin of better rank"""
+        if not symbol:
+            return
+        symbol = symbol.upper()
+        if fiat:
+            self._fiats.add(key)
+            if isinstance(key, int) and symbol in self._rows:
+                # the rate known by symbol moves to the id
+                self._rows[key] = self._rows.pop(symbol)
+                self._fiats.discard(symbol)
+        linked = self._symbols.get(symbol)
+        if linked is not None and linked[0] != key:
+            if linked[0] in self._fiats and not fiat:
+                return
+            if not fiat and linked[1] <= rank:
+                return
+        self._symbols[symbol] = (key, rank)
+
+    def merge_quotes(self, response: dict) -> int:
+        """Add the USD prices of a listing or quotes response, and the rates of its other convert currencies
+
+        Args:
+                response (dict | list): a get_listing, get_quote_latest or get_quote_latest_batch response, error
+                        responses are skipped.
+
+        Returns:
+                (int): number of currencies added or updated.
+        """
+        data = response.get("data") if isinstance(response, dict) else response
+        if not data:
+            return 0
+        merged = 0
+        with self._lock:
+            converts: dict[str, tuple[float, float]] = {}
+            for coin in coins_of(data):
+                quote = coin.get("quote") or {}
+                usd = quote.get("USD") or {}
+                price = usd.get("price")
+                if not price:
+                    continue
+                updated = to_epoch(
+                    usd.get("last_updated") or coin.get("last_updated") or self.clock()
+                )
+                self._set(coin["id"], price, updated)
+                self._link(
+                    coin["id"], coin.get("symbol"), coin.get("cmc_rank") or np.inf
+                )
+                merged += 1
+                # a coin priced in USD and in another currency gives the rate of that currency
+                for symbol, other in quote.items():
+                    if symbol != "USD" and other.get("price"):
+                        converts[symbol] = (
+                            price / other["price"],
+                            to_epoch(other.get("last_updated") or updated),
+                        )
+            for symbol, (usd_price, updated) in converts.items():
+                key = self._key(symbol)
+                self._set(symbol if key is None else key, usd_price, updated)
+                if key is None:
+                    self._link(symbol, symbol)
+                merged += 1
+        return merged
+
+    def merge_fiat_map(self, response: dict | Iterable) -> int:
+        """Register the ids and symbols of a get_fiat response, a fiat symbol then always means the fiat
+
+        Returns:
+                (int): number of fiats registered.
+        """
+        items = (response.get("data") or []) if isinstance(response, dict) else response
+        items = list(items)
+        with self._lock:
+            for item in items:
+                self._link(item["id"], item["symbol"], fiat=True)
+        return len(items)
+
+    def merge_conversion(self, response: dict) -> int:
+        """Add the rates of a get_price_conversion response, e.g. 1 USD converted to the fiats of interest
+
+        The source is priced from its USD quote, or must already be known, the targets are priced from it.
+
+        Returns:
+                (int): number of currencies added or updated.
+        """
+        data = response.get("data")
+        if not data:
+            return 0
+        merged = 0
+        with self._lock:
+            for conversion in data if isinstance(data, list) else [data]:
+                amount = conversion.get("amount") or 1
+                quote = conversion.get("quote") or {}
+                key = conversion["id"]
+                if "USD" in quote and quote["USD"].get("price"):
+                    updated = to_epoch(quote["USD"].get("last_updated") or self.clock())
+                    self._set(key, quote["USD"]["price"] / amount, updated)
+                    self._link(key, conversion.get("symbol"))
+                    merged += 1
+                row = self._rows.get(key)
+                if row is None:
+                    continue
+                value = self._usd[row] * amount
+                for symbol, target in quote.items():
+                    if symbol == "USD" or not target.get("price"):
+                        continue
+                    updated = to_epoch(target.get("last_updated") or self.clock())
+                    target_key = self._key(symbol)
+                    if target_key is None:
+                        target_key = int(symbol) if symbol.isdigit() else symbol
+                        self._link(target_key, symbol)
+                    self._set(target_key, value / target["price"], updated)
+                    merged += 1
+        return merged
+
+    def set_rate(
+        self, currency: int | str, usd_price: float, updated: float | str | None = None
+    ) -> None:
+        """Set the USD price of a currency by hand, updated defaults to now"""
+        with self._lock:
+            key = self._key(currency)
+            if key is None:
+                key = currency.upper()
+                self._link(key, key)
+            self._set(
+                key, usd_price, self.clock() if updated is None else to_epoch(updated)
+            )
+
+    def refresh(self, limit: int = 5000, fiats: str = "EUR,GBP,JPY") -> int:
+        """Fetch the fiat map, the USD rate of fiats and the listing with the client, and merge them
+
+        The client's cache serves them while their time to live lasts, a refresh then costs no credit.
+
+        Args:
+                limit (int): coins of the listing, by market cap.
+                fiats (str): comma-separated fiat symbols priced with one price-conversion of 1 USD.
+
+        Returns:
+                (int): number of currencies added or updated.
+        """
+        self.merge_fiat_map(self.client.get_fiat())
+        merged = self.merge_conversion(
+            self.client.get_price_conversion(1, str(USD_ID), convert=fiats)
+        )
+        return merged + self.merge_quotes(self.client.get_listing(1, limit))
+
+    def rate(self, source: int | str, target: int | str) -> float | None:
+        """Units of target worth one unit of source, None when one of them has no rate"""
+        source_row, target_row = self._row(source), self._row(target)
+        if source_row is None or target_row is None:
+            return None
+        return float(self._usd[source_row] / self._usd[target_row])
+
+    def age(self, currency: int | str) -> float | None:
+        """Seconds since the rate of currency was last updated, None when it has no rate"""
+        row = self._row(currency)
+        if row is None:
+            return None
+        return float(max(self.clock() - self._updated[row], 0.0))
+
+    def convert(
+        self, amount: float, source: int | str, target: int | str, at=None
+    ) -> float | None:
+        """Value of amount source in target
+
+        Args:
+                amount (float): amount of source.
+                source (int | str): id or symbol converted from.
+                target (int | str): id or symbol converted to.
+                at (str | int, optional): timestamp of a historical conversion, it is requested from
+                        /v1/tools/price-conversion (one credit), the local rates are the latest ones.
+
+        Returns:
+                (float | None): the converted amount, None when a rate is missing or the request failed.
+        """
+        if at is None:
+            rate = self.rate(source, target)
+            return None if rate is None else amount * rate
+        source_key = self._key(source)
+        params = {"time": at}
+        if isinstance(source_key, int):
+            cmc_id = str(source_key)
+        else:
+            cmc_id, params["symbol"] = None, str(source)
+        if isinstance(target, int):
+            params["convert_id"] = str(target)
+        else:
+            params["convert"] = target
+        response = self.client.get_price_conversion(amount, cmc_id, **params)
+        data = response.get("data")
+        if isinstance(data, list):
+            data = data[0] if data else None
+        if not data:
+            return None
+        quote = data.get("quote") or {}
+        converted = quote.get(str(target)) or quote.get(str(target).upper()) or {}
+        return converted.get("price")
+
+    def _rows_of(self, currencies, count: int) -> np.ndarray:
+        """Rows of the currencies, -1 for the unknown ones, a single currency is repeated count times"""
+        if isinstance(currencies, (str, int, np.integer)):
+            row = self._row(currencies)
+            return np.full(count, -1 if row is None else row, dtype=np.intp)
+        found = {}
+        rows = np.empty(count, dtype=np.intp)
+        for position, currency in enumerate(currencies):
+            row = found.get(currency)
+            if row is None:
+                row = found[currency] = self._row(currency)
+                if row is None:
+                    row = found[currency] = -1
+            rows[position] = row
+        return rows
+
+    def convert_batch(
+        self, amounts, sources, targets, max_age: float | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Convert many amounts at once
+
+        Args:
+                amounts (Iterable[float] | np.ndarray): the amounts.
+                sources (Iterable | int | str): currency of each amount, or one currency for all of them.
+                targets (Iterable | int | str): currency each amount is converted to, or one for all of them.
+                max_age (float, optional): seconds, a conversion using an older rate gives nan.
+
+        Returns:
+                (tuple[np.ndarray, np.ndarray]): the converted amounts, nan when a rate is missing or too old, and
+                        the age in seconds of the oldest rate of each conversion, inf when a rate is missing.
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        count = len(amounts)
+        source_rows = self._rows_of(sources, count)
+        target_rows = self._rows_of(targets, count)
+        usd, updated = self._usd, self._updated
+        missing = (source_rows < 0) | (target_rows < 0)
+        # the unknown currencies read row 0 (the dollar) and are masked afterwards
+        source_rows = np.where(missing, 0, source_rows)
+        target_rows = np.where(missing, 0, target_rows)
+        values = amounts * usd[source_rows] / usd[target_rows]
+        oldest = np.fmin(updated[source_rows], updated[target_rows])
+        ages = np.maximum(self.clock() - oldest, 0.0)
+        ages[missing] = np.inf
+        values[missing] = np.nan
+        if max_age is not None:
+            values[ages > max_age] = np.nan
+        return values, ages
+
+    def matrix(self, currencies: Iterable) -> np.ndarray:
+        """Cross-rate matrix, [i, j] is the units of currencies[j] worth one unit of currencies[i], nan when a
+        currency has no rate"""
+        currencies = list(currencies)
+        rows = self._rows_of(currencies, len(currencies))
+        prices = np.where(rows < 0, np.nan, self._usd[np.maximum(rows, 0)])
+        return prices[:, None] / prices[None, :]
@@ -1,8 +1,50 @@
 import json
+import sys
 from abc import ABC, abstractmethod
 from typing import Any
 from collections.abc import Callable
 
+JSON_BACKENDS = ("orjson", "msgspec", "json")
+
+
+def select_json_backend(name: str = "auto") -> Callable[[bytes | str], Any]:
+    """Pick the function used to parse the bodies, it is chosen once when the client is built
+
+    Args:
+            name (str): "orjson", "msgspec", "json" (stdlib) or "auto", the fastest one installed.
+
+    Return:
+            (Callable[[bytes | str], Any]): a loads function that parses bytes without decoding them first.
+
+    """
+    if name not in JSON_BACKENDS + ("auto",):
+        raise ValueError(f"Unknown json backend {name}, options: auto, {JSON_BACKENDS}")
+    candidates = JSON_BACKENDS if name == "auto" else (name,)
+    for candidate in candidates:
+        try:
+            if candidate == "orjson":
+                import orjson
+
+                return orjson.loads
+            if candidate == "msgspec":
+                import msgspec
+
+                return msgspec.json.decode
+        except ImportError:
+            if name != "auto":
+                raise
+    return json.loads
+
+
+def coins_of(data: list | dict) -> list[dict]:
+    """Coins of the data of a listing (list) or of quotes/latest (dict by id, or by symbol with lists)"""
+    if isinstance(data, list):
+        return data
+    coins = []
+    for value in data.values():
+        coins.extend(value if isinstance(value, list) else [value])
+    return coins
+
 
 class AbstractDataHandler(ABC):
     @staticmethod
@@ -12,21 +54,24 @@ class AbstractDataHandler(ABC):
 
     @staticmethod
     def response_builder(
-        raw_resp: str, ext_method: Callable[[dict], (dict, Any)]
+        raw_resp: bytes | str,
+        ext_method: Callable[[dict], (dict, Any)],
+        loads: Callable[[bytes | str], Any] = json.loads,
     ) -> dict:
         """Create the response to the request
 
         Reformation of the response provided by the endpoint, adding some usefully keys and removing others.
 
         Args:
-                raw_resp (str): The response from the endpoint.
+                raw_resp (bytes | str): The response from the endpoint, the body bytes are parsed without decoding.
                 ext_method (Callable[[dict], (dict, Any)]): The method use to extract the information.
+                loads (Callable[[bytes | str], Any]): json parser, see select_json_backend.
 
         Return:
                 (dict): Returns a response in dict format
 
         """
-        json_raw_response = json.loads(raw_resp)
+        json_raw_response = loads(raw_resp)
 
         metadata, data = ext_method(json_raw_response)
         response = {"metadata": metadata, "data": data}
@@ -53,7 +98,9 @@ class HandlerDataList(AbstractDataHandler):
             "timestamp": payload["status"]["timestamp"],
             "credit_count": payload["status"]["credit_count"],
             "error_message": payload["status"]["error_message"],
-            "list_keys": [k for k in payload["data"][0].keys()],
+            "list_keys": (
+                [k for k in payload["data"][0].keys()] if payload["data"] else []
+            ),
         }
         data = payload["data"]
         return metadata, data
@@ -156,3 +203,162 @@ class HandlerOriginalStructure(AbstractDataHandler):
         metadata = payload["status"]
         data = payload["data"]
         return metadata, data
+
+
+class MapRecord:
+    """Compact entry of /v1/cryptocurrency/map, symbol and slug are interned"""
+
+    __slots__ = (
+        "id",
+        "rank",
+        "name",
+        "symbol",
+        "slug",
+        "is_active",
+        "first_historical_data",
+        "last_historical_data",
+        "platform_id",
+        "token_address",
+    )
+
+    def __init__(self, item: dict):
+        platform = item.get("platform") or {}
+        self.id = item["id"]
+        self.rank = item.get("rank")
+        self.name = item.get("name")
+        self.symbol = sys.intern(item.get("symbol") or "")
+        self.slug = sys.intern(item.get("slug") or "")
+        self.is_active = item.get("is_active")
+        self.first_historical_data = item.get("first_historical_data")
+        # most coins share the same timestamps
+        self.last_historical_data = _intern(item.get("last_historical_data"))
+        self.platform_id = platform.get("id")
+        self.token_address = platform.get("token_address")
+
+    def to_dict(self) -> dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={self.id}, symbol={self.symbol!r})"
+
+
+class QuoteRecord:
+    """Compact entry of a listing or of quotes/latest, the quote of one currency is kept as float attributes"""
+
+    __slots__ = (
+        "id",
+        "cmc_rank",
+        "name",
+        "symbol",
+        "slug",
+        "num_market_pairs",
+        "circulating_supply",
+        "total_supply",
+        "max_supply",
+        "convert",
+        "price",
+        "volume_24h",
+        "market_cap",
+        "percent_change_1h",
+        "percent_change_24h",
+        "percent_change_7d",
+        "percent_change_30d",
+        "last_updated",
+    )
+
+    def __init__(self, item: dict, convert: str | None = None):
+        quotes = item.get("quote") or {}
+        if convert is None:
+            convert = next(iter(quotes), "USD")
+        quote = quotes.get(convert) or {}
+        self.id = item["id"]
+        self.cmc_rank = item.get("cmc_rank")
+        self.name = item.get("name")
+        self.symbol = sys.intern(item.get("symbol") or "")
+        self.slug = sys.intern(item.get("slug") or "")
+        self.num_market_pairs = item.get("num_market_pairs")
+        self.circulating_supply = _float(item.get("circulating_supply"))
+        self.total_supply = _float(item.get("total_supply"))
+        self.max_supply = _float(item.get("max_supply"))
+        self.convert = sys.intern(convert)
+        self.price = _float(quote.get("price"))
+        self.volume_24h = _float(quote.get("volume_24h"))
+        self.market_cap = _float(quote.get("market_cap"))
+        self.percent_change_1h = _float(quote.get("percent_change_1h"))
+        self.percent_change_24h = _float(quote.get("percent_change_24h"))
+        self.percent_change_7d = _float(quote.get("percent_change_7d"))
+        self.percent_change_30d = _float(quote.get("percent_change_30d"))
+        self.last_updated = _intern(quote.get("last_updated"))
+
+    def to_dict(self) -> dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={self.id}, symbol={self.symbol!r}, price={self.price})"
+
+
+def _float(value) -> float | None:
+    return None if value is None else float(value)
+
+
+def _intern(value: str | None) -> str | None:
+    return None if value is None else sys.intern(value)
+
+
+class HandlerRecords(AbstractDataHandler):
+    """Data value of the map, listings and quotes turned into MapRecord / QuoteRecord objects
+
+    The shape of data is kept (a list stays a list, a dict keeps its keys) but every coin is a __slots__ record,
+    the parsed dicts are dropped. HandlerRecords.configure selects the currency of the quote.
+    """
+
+    convert = None
+
+    @classmethod
+    def configure(cls, convert: str | None = None) -> type:
+        """Handler keeping the quote in convert, the first currency of the quote when None"""
+        # the name is part of the cache key, handlers with other settings must not share it
+        return type(f"{cls.__name__}[{convert or ''}]", (cls,), {"convert": convert})
+
+    @classmethod
+    def record(cls, item: dict) -> MapRecord | QuoteRecord:
+        """Coins with a quote become QuoteRecord, the others MapRecord"""
+        if "quote" in item:
+            return QuoteRecord(item, cls.convert)
+        return MapRecord(item)
+
+    @classmethod
+    def data_extraction(cls, payload: dict) -> (dict, list | dict):
+        """
+        The coins of the response as records.
+
+        Args:
+                payload (dict): The response from the endpoint in json form.
+
+        Return:
+                (dict, list | dict): Returns a tuple where first parameter is metadata and the second is data.
+
+        """
+        data = payload["data"]
+        if isinstance(data, list):
+            data = [cls.record(item) for item in data]
+        else:
+            # quotes/latest: {id: coin}, or {symbol: [coins]} when requested by symbol
+            data = {
+                key: (
+                    [cls.record(item) for item in value]
+                    if isinstance(value, list)
+                    else cls.record(value)
+                )
+                for key, value in data.items()
+            }
+        first = next(iter(data if isinstance(data, list) else data.values()), None)
+        if isinstance(first, list):
+            first = first[0] if first else None
+        metadata = {
+            "timestamp": payload["status"]["timestamp"],
+            "credit_count": payload["status"]["credit_count"],
+            "error_message": payload["status"]["error_message"],
+            "list_keys": list(first.__slots__) if first is not None else [],
+        }
+        return metadata, data
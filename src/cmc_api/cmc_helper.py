@@ -7,7 +7,7 @@ import enum
 def get_headers(api_key):
     """Create the headers"""
     cmc_headers = {
-        "Accepts": "application/json",
+        "Accept": "application/json",
         "X-CMC_PRO_API_KEY": api_key,
     }
     return cmc_headers
@@ -20,6 +20,17 @@ class Urls(enum.Enum):
     SANDBOX = "https://sandbox-api.coinmarketcap.com"
 
 
+class StartupMode(enum.Enum):
+    """What the client does when it is constructed"""
+
+    # create config.ini and refresh the usage from /v1/key/info (blocking request)
+    EAGER = "eager"
+    # no I/O, the usage is read from the existing config.ini when it is first needed
+    LAZY = "lazy"
+    # no I/O, the usage is refreshed in a background thread on the first real call
+    BACKGROUND = "background"
+
+
 class CryptocurrencyEndPointsArgs(enum.Enum):
     """Cryptocurrency EndPoint Arguments"""
 
@@ -0,0 +1,402 @@
+"""HTTP settings
+How a client talks to the API: the compression it negotiates, the size and blocking of its connection pool,
+keep-alive, the TLS context shared by its connections and an optional HTTP/2 session (httpx) that multiplexes
+concurrent requests over one connection. See benchmarks/bench_http.py for the bytes on the wire and the latency of
+each setting.
+
+A TLS connection kept alive in the pool is reused with its session, the handshake is paid once per pooled
+connection, so keep_alive and a pool as large as the concurrency are what avoid new handshakes.
+"""
+
+import importlib.util
+import threading
+
+# compression: Accept-Encoding sent, None keeps the one of the http library (every encoding it can decode)
+COMPRESSIONS = {
+    "auto": None,
+    "gzip": "gzip",
+    "br": "br, gzip",
+    "identity": "identity",
+}
+
+
+def _installed(*modules: str) -> bool:
+    return all(importlib.util.find_spec(module) is not None for module in modules)
+
+
+def _import_httpx():
+    """httpx is optional, it is loaded when the first HTTP/2 session is created"""
+    try:
+        import httpx
+    except ImportError as error:  # pragma: no cover - optional dependency
+        raise ImportError(
+            "http2 requires httpx and h2, install them with 'pip install cmc_api_wrapper[http2]'"
+        ) from error
+    return httpx
+
+
+class HttpConfig:
+    """Transport settings of a client, the defaults are the ones of requests and aiohttp
+
+    Args:
+            compression (str): "auto" (default) accepts every encoding the http library decodes (gzip and deflate,
+                    br when brotli is installed), "gzip", "br" (needs brotli) or "identity", no compression, which
+                    saves the CPU of decompressing on a fast local link but sends listings ~6 times larger.
+            pool_connections (int): hosts the sync client keeps a pool for.
+            pool_maxsize (int, optional): connections kept alive per host, default the max_workers of Cmc or the
+                    pool_size of AsyncCmc.
+            pool_block (bool): a request waits for a free pooled connection instead of opening one more that is
+                    closed after the response, it caps the connections at pool_maxsize.
+            keep_alive (bool): reuse the connections (default True), False closes them after every response and
+                    pays a TCP and TLS handshake per request.
+            ssl_context (ssl.SSLContext, optional): TLS settings shared by every connection, e.g. a context built
+                    once with certifi's bundle or a minimum version.
+            http2 (bool): send the requests with an httpx HTTP/2 client, concurrent requests are multiplexed over
+                    one connection. Needs httpx and h2 ("pip install cmc_api_wrapper[http2]").
+    """
+
+    def __init__(
+        self,
+        compression: str = "auto",
+        pool_connections: int = 10,
+        pool_maxsize: int | None = None,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        ssl_context=None,
+        http2: bool = False,
+    ):
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unknown compression {compression}, options: {tuple(COMPRESSIONS)}"
+            )
+        if compression == "br" and not (
+            _installed("brotli") or _installed("brotlicffi")
+        ):
+            raise ImportError(
+                "br compression requires brotli, install it with 'pip install brotli'"
+            )
+        if http2 and not _installed("httpx", "h2"):
+            raise ImportError(
+                "http2 requires httpx and h2, install them with 'pip install cmc_api_wrapper[http2]'"
+            )
+        self.compression = compression
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.ssl_context = ssl_context
+        self.http2 = http2
+
+    def headers(self) -> dict:
+        """Headers sent on top of the client's ones"""
+        headers = {}
+        if COMPRESSIONS[self.compression] is not None:
+            headers["Accept-Encoding"] = COMPRESSIONS[self.compression]
+        if not self.keep_alive:
+            headers["Connection"] = "close"
+        return headers
+
+    def session(self, pool_maxsize: int):
+        """Session of cmc.Wrapper, a requests.Session or an Http2Session
+
+        Args:
+                pool_maxsize (int): connections kept alive when the config does not set pool_maxsize.
+        """
+        pool_maxsize = self.pool_maxsize or pool_maxsize
+        if self.http2:
+            session = Http2Session(self, pool_maxsize)
+        else:
+            from requests import Session
+
+            session = Session()
+            adapter = _adapter(
+                pool_connections=self.pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=self.pool_block,
+                ssl_context=self.ssl_context,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        session.headers.update(self.headers())
+        return session
+
+    def connector_kwargs(self, pool_size: int, keepalive_timeout: float) -> dict:
+        """Keyword arguments of the aiohttp.TCPConnector of cmc_async.AsyncWrapper"""
+        kwargs = {"limit": self.pool_maxsize or pool_size}
+        if self.keep_alive:
+            kwargs["keepalive_timeout"] = keepalive_timeout
+        else:
+            kwargs["force_close"] = True
+        if self.ssl_context is not None:
+            kwargs["ssl"] = self.ssl_context
+        return kwargs
+
+    def async_session(
+        self,
+        headers: dict,
+        pool_size: int,
+        keepalive_timeout: float,
+        timeout: tuple[float, float],
+    ) -> "AsyncHttp2Session":
+        """HTTP/2 session of cmc_async.AsyncWrapper"""
+        return AsyncHttp2Session(
+            self, {**headers, **self.headers()}, pool_size, keepalive_timeout, timeout
+        )
+
+    def _httpx_kwargs(self, pool_maxsize: int, keepalive_timeout: float) -> dict:
+        httpx = _import_httpx()
+        return {
+            "http2": True,
+            "verify": self.ssl_context if self.ssl_context is not None else True,
+            "limits": httpx.Limits(
+                max_connections=pool_maxsize if self.pool_block else None,
+                max_keepalive_connections=pool_maxsize if self.keep_alive else 0,
+                keepalive_expiry=keepalive_timeout,
+            ),
+        }
+
+
+def _adapter(ssl_context=None, **kwargs):
+    """requests HTTPAdapter, its connections use ssl_context when one is given"""
+    from requests.adapters import HTTPAdapter
+
+    if ssl_context is None:
+        return HTTPAdapter(**kwargs)
+
+    class SslContextAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **pool_kwargs):
+            pool_kwargs["ssl_context"] = ssl_context
+            return super().init_poolmanager(*args, **pool_kwargs)
+
+    return SslContextAdapter(**kwargs)
+
+
+def _httpx_timeout(httpx, timeout):
+    if isinstance(timeout, tuple):
+        return httpx.Timeout(timeout[1], connect=timeout[0])
+    return httpx.Timeout(timeout)
+
+
+class _EventLoopThread:
+    """Event loop running in a daemon thread, the sync HTTP/2 session sends the requests of every thread on it
+
+    httpx's sync client is not safe for concurrent HTTP/2 requests from several threads (the streams of the shared
+    connection are opened out of order), the async client on one loop multiplexes them safely.
+    """
+
+    def __init__(self):
+        import asyncio
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="cmc-http2", daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coroutine):
+        """Run coroutine on the loop and wait for its result in the calling thread"""
+        import asyncio
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class Http2Response:
+    """The parts of a requests.Response used by the client, read from an httpx.Response"""
+
+    def __init__(self, response, loop: _EventLoopThread):
+        self._response = response
+        self._loop = loop
+        self.status_code = response.status_code
+        self.url = str(response.url)
+
+    @property
+    def content(self) -> bytes:
+        return self._loop.run(self._response.aread())
+
+    def iter_content(self, chunk_size: int = 1):
+        from requests import exceptions
+
+        httpx = _import_httpx()
+        chunks = self._response.aiter_bytes(chunk_size)
+        try:
+            while True:
+                try:
+                    yield self._loop.run(chunks.__anext__())
+                except StopAsyncIteration:
+                    return
+        except httpx.TimeoutException as error:
+            raise exceptions.ReadTimeout(str(error)) from error
+        except httpx.TransportError as error:
+            raise exceptions.ConnectionError(str(error)) from error
+
+    def close(self) -> None:
+        self._loop.run(self._response.aclose())
+
+
+class Http2Session:
+    """requests.Session look-alike sending the requests with an httpx HTTP/2 client, the httpx errors are raised
+    as the requests ones handled by cmc_utils.fetch_raw_data
+
+    The requests of every thread are multiplexed by one httpx.AsyncClient running on an event loop thread.
+    """
+
+    def __init__(self, config: HttpConfig, pool_maxsize: int, keepalive_timeout=30.0):
+        httpx = _import_httpx()
+        self.headers = {}
+        self._loop = _EventLoopThread()
+        self.client = httpx.AsyncClient(
+            **config._httpx_kwargs(pool_maxsize, keepalive_timeout)
+        )
+
+    def mount(self, prefix: str, adapter) -> None:
+        pass
+
+    async def _send(self, request, stream: bool):
+        response = await self.client.send(request, stream=True)
+        if not stream:
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+        return response
+
+    def get(self, url: str, params=None, timeout=None, stream=False, **kwargs):
+        from requests import exceptions
+
+        httpx = _import_httpx()
+        if isinstance(params, str):
+            url, params = f"{url}?{params}" if params else url, None
+        request = self.client.build_request(
+            "GET",
+            url,
+            params=params,
+            headers=self.headers,
+            timeout=_httpx_timeout(httpx, timeout),
+        )
+        try:
+            response = self._loop.run(self._send(request, stream))
+        except httpx.TimeoutException as error:
+            raise exceptions.ReadTimeout(str(error)) from error
+        except httpx.TransportError as error:
+            raise exceptions.ConnectionError(str(error)) from error
+        return Http2Response(response, self._loop)
+
+    def close(self) -> None:
+        """Close the client and stop the loop thread, later calls do nothing"""
+        if self._loop.loop.is_closed():
+            return
+        self._loop.run(self.client.aclose())
+        self._loop.stop()
+
+
+class _AsyncContent:
+    def __init__(self, response):
+        self._response = response
+
+    async def iter_chunked(self, chunk_size: int):
+        async for chunk in self._response.aiter_bytes(chunk_size):
+            yield chunk
+
+
+class AsyncHttp2Response:
+    """The parts of an aiohttp.ClientResponse used by the client, read from an httpx.Response"""
+
+    def __init__(self, response, session: "AsyncHttp2Session"):
+        self._response = response
+        self._session = session
+        self.status = response.status_code
+        self.url = str(response.url)
+        self.request_info = None
+        self.history = ()
+        self.content = _AsyncContent(response)
+
+    async def read(self) -> bytes:
+        return await self._response.aread()
+
+    def release(self) -> None:
+        """Close the response in a task, the session keeps it until it is done and awaits it in close"""
+        import asyncio
+
+        task = asyncio.ensure_future(self._response.aclose())
+        self._session._closing.add(task)
+        task.add_done_callback(self._session._closing.discard)
+
+
+class _AsyncHttp2Request:
+    """Result of session.get, awaited or used as an async context manager like aiohttp's"""
+
+    def __init__(self, session: "AsyncHttp2Session", url: str, params):
+        self._session = session
+        self._url = url
+        self._params = params
+        self._response = None
+
+    async def _send(self) -> AsyncHttp2Response:
+        import asyncio
+
+        import aiohttp
+
+        httpx = _import_httpx()
+        url, params = self._url, self._params
+        if isinstance(params, str):
+            url, params = f"{url}?{params}" if params else url, None
+        request = self._session.client.build_request("GET", url, params=params)
+        try:
+            response = await self._session.client.send(request, stream=True)
+        except httpx.TimeoutException as error:
+            raise asyncio.TimeoutError(str(error)) from error
+        except httpx.TransportError as error:
+            raise aiohttp.ClientConnectionError(str(error)) from error
+        self._response = AsyncHttp2Response(response, self._session)
+        return self._response
+
+    def __await__(self):
+        return self._send().__await__()
+
+    async def __aenter__(self):
+        return await self._send()
+
+    async def __aexit__(self, *exc):
+        if self._response is not None:
+            await self._response._response.aclose()
+        return False
+
+
+class AsyncHttp2Session:
+    """aiohttp.ClientSession look-alike sending the requests with an httpx HTTP/2 client"""
+
+    def __init__(
+        self,
+        config: HttpConfig,
+        headers: dict,
+        pool_size: int,
+        keepalive_timeout: float,
+        timeout: tuple[float, float],
+    ):
+        httpx = _import_httpx()
+        self.client = httpx.AsyncClient(
+            headers=headers,
+            timeout=_httpx_timeout(httpx, timeout),
+            **config._httpx_kwargs(pool_size, keepalive_timeout),
+        )
+        # responses being closed by AsyncHttp2Response.release
+        self._closing: set = set()
+
+    @property
+    def closed(self) -> bool:
+        return self.client.is_closed
+
+    async def close(self) -> None:
+        import asyncio
+
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+        await self.client.aclose()
+
+    def get(self, url: str, params=None, **kwargs) -> _AsyncHttp2Request:
+        return _AsyncHttp2Request(self, url, params)
@@ -0,0 +1,180 @@
+"""CoinMarketCap id index
+In-memory index of the /v1/cryptocurrency/map entries with constant time lookups by id, slug and symbol. Pages of
+the map are merged into it as they arrive, and it is persisted as compact json columns that load quickly.
+"""
+
+import json
+import os
+import sys
+from collections.abc import Iterable
+
+from cmc_api import cmc_utils
+from cmc_api.cmc_datahandler import MapRecord
+
+# Version of the persisted layout
+INDEX_VERSION = 1
+
+
+def _record_from_row(fields: list[str], row: Iterable) -> MapRecord:
+    record = MapRecord.__new__(MapRecord)
+    for field, value in zip(fields, row):
+        setattr(record, field, value)
+    record.symbol = sys.intern(record.symbol or "")
+    record.slug = sys.intern(record.slug or "")
+    return record
+
+
+class CmcIdIndex:
+    """Index of the cryptocurrency map
+
+    Symbols are not unique, several ids can share one, slugs are. Records without is_active (when the aux field
+    was not requested) count as active.
+
+    Args:
+            items (Iterable, optional): first entries, see merge.
+    """
+
+    def __init__(self, items: Iterable | dict | None = None):
+        self._records: dict[int, MapRecord] = {}
+        self._by_slug: dict[str, int] = {}
+        self._by_symbol: dict[str, list[int]] = {}
+        if items is not None:
+            self.merge(items)
+
+    def merge(self, items: Iterable | dict) -> int:
+        """Add or update entries, the old slug/symbol of an updated id are unlinked
+
+        Args:
+                items (Iterable | dict): a get_cmc_id_map response, or its data: map dicts or MapRecord objects.
+
+        Returns:
+                (int): number of entries added or updated.
+        """
+        if isinstance(items, dict):
+            items = items.get("data") or []
+        changed = 0
+        for item in items:
+            record = item if isinstance(item, MapRecord) else MapRecord(item)
+            previous = self._records.get(record.id)
+            if previous is not None:
+                if previous.to_dict() == record.to_dict():
+                    continue
+                self._unlink(previous)
+            self._records[record.id] = record
+            if record.slug:
+                self._by_slug[record.slug.lower()] = record.id
+            if record.symbol:
+                self._by_symbol.setdefault(record.symbol.upper(), []).append(record.id)
+            changed += 1
+        return changed
+
+    def _unlink(self, record: MapRecord) -> None:
+        if self._by_slug.get(record.slug.lower()) == record.id:
+            del self._by_slug[record.slug.lower()]
+        ids = self._by_symbol.get(record.symbol.upper())
+        if ids and record.id in ids:
+            ids.remove(record.id)
+            if not ids:
+                del self._by_symbol[record.symbol.upper()]
+
+    def remove(self, cmc_id: int) -> bool:
+        """Drop an id, False when it is not in the index"""
+        record = self._records.pop(int(cmc_id), None)
+        if record is None:
+            return False
+        self._unlink(record)
+        return True
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, cmc_id) -> bool:
+        return int(cmc_id) in self._records
+
+    def __iter__(self):
+        return iter(self._records.values())
+
+    def get(self, cmc_id: int | str) -> MapRecord | None:
+        """Record of an id"""
+        return self._records.get(int(cmc_id))
+
+    def id_for_slug(self, slug: str) -> int | None:
+        """Id of a slug, e.g. "bitcoin" -> 1"""
+        return self._by_slug.get(slug.lower())
+
+    def ids_for_symbol(self, symbol: str, active: bool | None = None) -> list[int]:
+        """Ids sharing a symbol, best ranked first
+
+        Args:
+                symbol (str): e.g. "BTC", case insensitive.
+                active (bool, optional): True only the active ids, False only the inactive ones, None all of them.
+        """
+        ids = [
+            cmc_id
+            for cmc_id in self._by_symbol.get(symbol.upper(), ())
+            if active is None or self._is_active(self._records[cmc_id]) == active
+        ]
+        return sorted(ids, key=self._rank_key)
+
+    def ids(self, active: bool | None = None) -> list[int]:
+        """Every id in rank order, filtered like ids_for_symbol"""
+        ids = [
+            record.id
+            for record in self._records.values()
+            if active is None or self._is_active(record) == active
+        ]
+        return sorted(ids, key=self._rank_key)
+
+    def ids_string(self, active: bool | None = None) -> str:
+        """Comma-separated ids, the format of cmc_utils.get_cmc_ids"""
+        return ",".join(str(cmc_id) for cmc_id in self.ids(active))
+
+    @staticmethod
+    def _is_active(record: MapRecord) -> bool:
+        return record.is_active is None or bool(record.is_active)
+
+    def _rank_key(self, cmc_id: int) -> tuple:
+        rank = self._records[cmc_id].rank
+        return (rank is None, rank or 0, cmc_id)
+
+    def to_columns(self) -> dict:
+        """Compact form, one list per field instead of one dict per coin"""
+        fields = list(MapRecord.__slots__)
+        records = list(self._records.values())
+        return {
+            "version": INDEX_VERSION,
+            "fields": fields,
+            "columns": {
+                field: [getattr(record, field) for record in records]
+                for field in fields
+            },
+        }
+
+    @classmethod
+    def from_columns(cls, payload: dict) -> "CmcIdIndex":
+        """Rebuild an index from to_columns"""
+        if payload.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unknown index version {payload.get('version')}")
+        fields = payload["fields"]
+        index = cls()
+        index.merge(
+            _record_from_row(fields, row)
+            for row in zip(*(payload["columns"][field] for field in fields))
+        )
+        return index
+
+    def save(self, path: str = "json_files/cmc_id_index.json") -> None:
+        """Write the compact form, the file is replaced atomically"""
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        temporary = cmc_utils.temporary_name(path)
+        with open(file=temporary, mode="w", encoding="utf-8") as file:
+            json.dump(self.to_columns(), file, separators=(",", ":"))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str = "json_files/cmc_id_index.json") -> "CmcIdIndex":
+        """Read a file written by save"""
+        with open(file=path, mode="r", encoding="utf-8") as file:
+            return cls.from_columns(json.load(file))
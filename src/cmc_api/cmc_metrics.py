@@ -0,0 +1,341 @@
+"""Request metrics
+Histograms of the time spent in each phase of a request (network, parse, extract, total) and of the body sizes,
+counters of the status codes, cache hits and credits, all per endpoint enum. They are read as a dict with snapshot
+or as Prometheus text with to_prometheus, which serve exposes on a local /metrics endpoint.
+"""
+
+import bisect
+import enum
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from cmc_api.cmc_ratelimit import credit_count
+
+# Upper bounds of the buckets, in seconds and in bytes
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+SIZE_BUCKETS = tuple(2**power for power in range(10, 27, 2))
+
+# name: (type, help) of every exported metric
+METRICS = {
+    "cmc_phase_seconds": ("histogram", "Time spent in each phase of a request"),
+    "cmc_response_bytes": ("histogram", "Size of the response bodies"),
+    "cmc_responses_total": ("counter", "Responses by status code"),
+    "cmc_cache_hits_total": ("counter", "Responses served from a cache, by tier"),
+    "cmc_credits_total": ("counter", "Credits charged, from the credit_count"),
+}
+
+
+def endpoint_label(uri_and_args: enum.Enum | str) -> str:
+    """Label of an endpoint enum, e.g. "Cryptocurrency.LISTING" """
+    if isinstance(uri_and_args, enum.Enum):
+        return f"{type(uri_and_args).__name__}.{uri_and_args.name}"
+    return str(uri_and_args)
+
+
+class Histogram:
+    """Fixed buckets histogram, the counts are kept per bucket and exported cumulated"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Iterable[float]):
+        self.bounds = tuple(bounds)
+        # the last bucket is +Inf
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """(upper bound, observations <= bound) pairs, the last bound is inf"""
+        total, pairs = 0, []
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th quantile (0..1), an estimate"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: tuple) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels)
+
+
+class Metrics:
+    """Registry of the metrics of one or more clients, safe to use from threads
+
+    Args:
+            latency_buckets (Iterable[float]): bucket bounds of cmc_phase_seconds.
+            size_buckets (Iterable[int]): bucket bounds of cmc_response_bytes.
+    """
+
+    def __init__(
+        self,
+        latency_buckets: Iterable[float] = LATENCY_BUCKETS,
+        size_buckets: Iterable[int] = SIZE_BUCKETS,
+    ):
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self._histograms: dict[tuple, Histogram] = {}
+        self._counters: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def _observe(self, name: str, labels: tuple, value: float, bounds) -> None:
+        with self._lock:
+            histogram = self._histograms.get((name, labels))
+            if histogram is None:
+                histogram = self._histograms[(name, labels)] = Histogram(bounds)
+            histogram.observe(value)
+
+    def _increment(self, name: str, labels: tuple, value: float = 1) -> None:
+        with self._lock:
+            self._counters[(name, labels)] = (
+                self._counters.get((name, labels), 0) + value
+            )
+
+    def observe(self, endpoint, phase: str, seconds: float) -> None:
+        """Time spent in a phase: "network", "parse", "extract" or "total" """
+        self._observe(
+            "cmc_phase_seconds",
+            (("endpoint", endpoint_label(endpoint)), ("phase", phase)),
+            seconds,
+            self.latency_buckets,
+        )
+
+    def observe_size(self, endpoint, size: int) -> None:
+        """Size of a response body, in bytes"""
+        self._observe(
+            "cmc_response_bytes",
+            (("endpoint", endpoint_label(endpoint)),),
+            size,
+            self.size_buckets,
+        )
+
+    def count_status(self, endpoint, status_code: int) -> None:
+        self._increment(
+            "cmc_responses_total",
+            (("endpoint", endpoint_label(endpoint)), ("status", str(status_code))),
+        )
+
+    def count_cache_hit(self, endpoint, tier: str) -> None:
+        """A response that did not go to the network, tier is "memory" or "disk" """
+        self._increment(
+            "cmc_cache_hits_total",
+            (("endpoint", endpoint_label(endpoint)), ("tier", tier)),
+        )
+
+    def count_credits(self, endpoint, credits: float | None) -> None:
+        if credits:
+            self._increment(
+                "cmc_credits_total", (("endpoint", endpoint_label(endpoint)),), credits
+            )
+
+    def record_response(
+        self,
+        endpoint,
+        status_code: int,
+        raw_response: Any,
+        response: dict | None = None,
+    ) -> None:
+        """Status, body size and credits of a response received from the network, the credits are read from the
+        raw body when the built response is not given"""
+        self.count_status(endpoint, status_code)
+        if isinstance(raw_response, (bytes, str)):
+            self.observe_size(endpoint, len(raw_response))
+        if status_code == 200:
+            self.count_credits(
+                endpoint, credit_count(raw_response if response is None else response)
+            )
+
+    def timer(self, endpoint, phase: str) -> "_Timer":
+        """Context manager observing the time spent in its block"""
+        return _Timer(self, endpoint, phase)
+
+    def timed(self, function: Callable, endpoint, phase: str) -> Callable:
+        """function, observing the time of every call"""
+
+        def wrapper(*args, **kwargs):
+            with self.timer(endpoint, phase):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict:
+        """Current values as nested dicts
+
+        Returns:
+                (dict): {"phase_seconds": {endpoint: {phase: {"count", "sum", "mean", "p50", "p95", "p99"}}},
+                        "response_bytes": {endpoint: {...}}, "responses": {endpoint: {status: n}},
+                        "cache_hits": {endpoint: {tier: n}}, "credits": {endpoint: n}}
+        """
+        result = {
+            "phase_seconds": {},
+            "response_bytes": {},
+            "responses": {},
+            "cache_hits": {},
+            "credits": {},
+        }
+        with self._lock:
+            histograms = {key: h.to_dict() for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+        for (name, labels), values in histograms.items():
+            labels = dict(labels)
+            if name == "cmc_phase_seconds":
+                result["phase_seconds"].setdefault(labels["endpoint"], {})[
+                    labels["phase"]
+                ] = values
+            else:
+                result["response_bytes"][labels["endpoint"]] = values
+        for (name, labels), value in counters.items():
+            labels = dict(labels)
+            if name == "cmc_responses_total":
+                result["responses"].setdefault(labels["endpoint"], {})[
+                    int(labels["status"])
+                ] = value
+            elif name == "cmc_cache_hits_total":
+                result["cache_hits"].setdefault(labels["endpoint"], {})[
+                    labels["tier"]
+                ] = value
+            else:
+                result["credits"][labels["endpoint"]] = value
+        return result
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            histograms = {
+                key: (h.cumulative(), h.sum, h.count)
+                for key, h in self._histograms.items()
+            }
+            counters = dict(self._counters)
+        lines = []
+        for name, (kind, description) in METRICS.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "histogram":
+                for (metric, labels), (buckets, total, count) in sorted(
+                    histograms.items()
+                ):
+                    if metric != name:
+                        continue
+                    for bound, cumulated in buckets:
+                        bucket_labels = _labels(
+                            labels + (("le", _format_value(bound)),)
+                        )
+                        lines.append(f"{name}_bucket{{{bucket_labels}}} {cumulated}")
+                    lines.append(
+                        f"{name}_sum{{{_labels(labels)}}} {_format_value(total)}"
+                    )
+                    lines.append(f"{name}_count{{{_labels(labels)}}} {count}")
+            else:
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(
+                            f"{name}{{{_labels(labels)}}} {_format_value(value)}"
+                        )
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 9108, host: str = "127.0.0.1"):
+        """Serve to_prometheus on http://host:port/metrics from a daemon thread
+
+        Returns:
+                (http.server.ThreadingHTTPServer): call shutdown() and server_close() on it to stop serving.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(
+            target=server.serve_forever, name="cmc-metrics", daemon=True
+        ).start()
+        return server
+
+
+class _Timer:
+    __slots__ = ("metrics", "endpoint", "phase", "started")
+
+    def __init__(self, metrics: Metrics, endpoint, phase: str):
+        self.metrics = metrics
+        self.endpoint = endpoint
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(
+            self.endpoint, self.phase, time.perf_counter() - self.started
+        )
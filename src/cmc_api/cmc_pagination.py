@@ -0,0 +1,113 @@
+"""Pagination helpers
+Walk the paginated endpoints (listing, id map, exchange map, fiat, categories) page by page,
+the next page is requested while the current one is being consumed.
+"""
+
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from typing import Any
+
+logger = logging.getLogger("pagination")
+
+MAX_PAGE_SIZE = 5000
+
+
+def _page_limits(start: int, page_size: int, max_rows: int | None):
+    """Yield the (start, limit) of every page until max_rows is covered"""
+    if not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ValueError(f"page_size must be in [1 .. {MAX_PAGE_SIZE}]")
+    fetched = 0
+    while max_rows is None or fetched < max_rows:
+        limit = page_size if max_rows is None else min(page_size, max_rows - fetched)
+        yield start, limit
+        start += limit
+        fetched += limit
+
+
+def _page_rows(response: dict) -> list | None:
+    """Rows of a page, None when the response is an error"""
+    rows = response.get("data") if isinstance(response, dict) else None
+    if not isinstance(rows, list):
+        logger.error("Stopping pagination, unexpected page: %s", response)
+        return None
+    return rows
+
+
+def paginate(
+    fetch_page: Callable[[int, int], dict],
+    page_size: int = MAX_PAGE_SIZE,
+    max_rows: int | None = None,
+    start: int = 1,
+    by_page: bool = False,
+) -> Iterator[Any]:
+    """Iterate over every row of a paginated endpoint
+
+    Args:
+            fetch_page (Callable[[int, int], dict]): called with (start, limit), returns the response of one page.
+            page_size (int): [ 1 .. 5000 ] number of rows requested per page.
+            max_rows (int, optional): stop after this many rows.
+            start (int): >= 1, 1-based index of the first row.
+            by_page (bool): yield the whole response of each page instead of single rows.
+
+    Returns:
+            (Iterator): rows (or page responses) as they arrive, it stops after the first short page.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    limits = _page_limits(start, page_size, max_rows)
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cmc-prefetch")
+    try:
+        page_start, limit = next(limits)
+        pending = executor.submit(fetch_page, page_start, limit)
+        while pending is not None:
+            response = pending.result()
+            rows = _page_rows(response)
+            if rows is None:
+                return
+            pending = None
+            if len(rows) >= limit:
+                next_limits = next(limits, None)
+                if next_limits is not None:
+                    pending = executor.submit(fetch_page, *next_limits)
+                    limit = next_limits[1]
+            if by_page:
+                yield response
+            else:
+                yield from rows
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def apaginate(
+    fetch_page: Callable[[int, int], Awaitable[dict]],
+    page_size: int = MAX_PAGE_SIZE,
+    max_rows: int | None = None,
+    start: int = 1,
+    by_page: bool = False,
+) -> AsyncIterator[Any]:
+    """Async generator version of paginate, fetch_page is a coroutine function"""
+    import asyncio
+
+    limits = _page_limits(start, page_size, max_rows)
+    page_start, limit = next(limits)
+    pending = asyncio.ensure_future(fetch_page(page_start, limit))
+    try:
+        while pending is not None:
+            response = await pending
+            rows = _page_rows(response)
+            if rows is None:
+                return
+            pending = None
+            if len(rows) >= limit:
+                next_limits = next(limits, None)
+                if next_limits is not None:
+                    pending = asyncio.ensure_future(fetch_page(*next_limits))
+                    limit = next_limits[1]
+            if by_page:
+                yield response
+            else:
+                for row in rows:
+                    yield row
+    finally:
+        if pending is not None:
+            pending.cancel()
@@ -0,0 +1,181 @@
+"""Background poller
+Refresh a watch list (quotes of some ids, or a listing page) on a schedule in one thread, compare every coin with
+the previous poll and publish only the coins that changed to any number of subscribers, callbacks or queues.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from cmc_api.cmc_datahandler import coins_of
+
+logger = logging.getLogger("poller")
+
+# Quote values compared between two polls, with last_updated
+DELTA_FIELDS = (
+    "price",
+    "volume_24h",
+    "market_cap",
+    "percent_change_1h",
+    "percent_change_24h",
+    "percent_change_7d",
+)
+
+
+def signature(coin: dict, fields=DELTA_FIELDS) -> tuple:
+    """Values of a coin that make a change: last_updated and the quote fields, in every currency"""
+    return tuple(
+        (currency, quote.get("last_updated"), *(quote.get(field) for field in fields))
+        for currency, quote in sorted((coin.get("quote") or {}).items())
+    )
+
+
+class Poller:
+    """Poll a fetch function and publish the deltas
+
+    A delta is {"timestamp": "", "changed": [coins], "removed": [ids], "poll": n}, it is only published when
+    something changed. The first poll publishes every coin.
+
+    Args:
+            fetch (Callable[[], dict]): returns a response, e.g. lambda: cmc.get_quote_latest("1,1027").
+            interval (float): seconds between the start of two polls.
+            fields (tuple): quote fields compared, with last_updated.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], dict],
+        interval: float = 60.0,
+        fields: tuple = DELTA_FIELDS,
+    ):
+        self.fetch = fetch
+        self.interval = interval
+        self.fields = fields
+        self.state: dict[int, dict] = {}
+        self.polls = 0
+        self._signatures: dict[int, tuple] = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def for_quotes(cls, client, cmc_ids: str, interval: float = 60.0, **kwargs):
+        """Poller of client.get_quote_latest(cmc_ids, **kwargs)"""
+        return cls(lambda: client.get_quote_latest(cmc_ids, **kwargs), interval)
+
+    @classmethod
+    def for_listing(
+        cls, client, start: int = 1, limit: int = 100, interval: float = 60.0, **kwargs
+    ):
+        """Poller of client.get_listing(start, limit, **kwargs)"""
+        return cls(lambda: client.get_listing(start, limit, **kwargs), interval)
+
+    def subscribe(self, target, loop=None) -> Callable[[], None]:
+        """Add a subscriber, it receives every delta
+
+        Args:
+                target (Callable[[dict], None] | Queue): a callback, or a queue (anything with put_nowait).
+                loop (asyncio.AbstractEventLoop, optional): the loop owning target, e.g. an asyncio.Queue, the
+                        delta is handed over with call_soon_threadsafe.
+
+        Returns:
+                (Callable[[], None]): removes the subscriber.
+        """
+        deliver = target.put_nowait if hasattr(target, "put_nowait") else target
+        if loop is not None:
+            callback = deliver
+
+            def deliver(delta):
+                loop.call_soon_threadsafe(callback, delta)
+
+        with self._lock:
+            self._subscribers.append(deliver)
+
+        def unsubscribe():
+            with self._lock:
+                if deliver in self._subscribers:
+                    self._subscribers.remove(deliver)
+
+        return unsubscribe
+
+    def diff(self, response: dict) -> dict:
+        """Compare a response with the previous one and update the state, nothing is published"""
+        changed = []
+        seen = set()
+        for coin in coins_of(response["data"]):
+            cmc_id = coin["id"]
+            seen.add(cmc_id)
+            coin_signature = signature(coin, self.fields)
+            if self._signatures.get(cmc_id) != coin_signature:
+                self._signatures[cmc_id] = coin_signature
+                self.state[cmc_id] = coin
+                changed.append(coin)
+        removed = [cmc_id for cmc_id in self._signatures if cmc_id not in seen]
+        for cmc_id in removed:
+            del self._signatures[cmc_id]
+            del self.state[cmc_id]
+        self.polls += 1
+        return {
+            "timestamp": (response.get("metadata") or {}).get("timestamp"),
+            "changed": changed,
+            "removed": removed,
+            "poll": self.polls,
+        }
+
+    def poll_once(self) -> dict | None:
+        """Fetch, diff and publish, returns the delta (None when the fetch failed)"""
+        response = self.fetch()
+        if not isinstance(response, dict) or "data" not in response:
+            logger.error("Poll failed: %s", response)
+            return None
+        delta = self.diff(response)
+        if delta["changed"] or delta["removed"]:
+            self.publish(delta)
+        return delta
+
+    def publish(self, delta: dict) -> None:
+        """Hand a delta to every subscriber, a failing subscriber does not stop the others"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for deliver in subscribers:
+            try:
+                deliver(delta)
+            except Exception:
+                logger.exception("Subscriber %s failed", deliver)
+
+    def _run(self) -> None:
+        next_poll = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("Poll failed")
+            # fixed rate, a slow poll does not shift the schedule, the slots missed during a stall are skipped
+            now = time.monotonic()
+            next_poll = max(next_poll + self.interval, now)
+            self._stop.wait(next_poll - now)
+
+    def start(self) -> "Poller":
+        """Poll in a daemon thread until stop"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="cmc-poller", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop polling, the current poll is finished first"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc: Any):
+        self.stop()
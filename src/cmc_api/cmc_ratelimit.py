@@ -0,0 +1,248 @@
+"""Client side rate limiter
+A token bucket paces the requests under the plan's per minute limit and a credit budget accounts for the
+credit_count of every response, both can be seeded from the /v1/key/info response.
+"""
+
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+# "credit_count" of the "status" object of a raw body
+_CREDIT_COUNT = re.compile(rb'"credit_count"\s*:\s*(\d+)')
+
+
+def credit_count(response: Any) -> int | None:
+    """Credits charged for a response, built (its metadata) or raw (its "status", found without parsing the body)
+
+    Raw bodies are read so the requests whose body is never built, like the retried ones and the hedges that lost,
+    are charged too.
+    """
+    if isinstance(response, dict):
+        return (response.get("metadata") or {}).get("credit_count")
+    if isinstance(response, str):
+        response = response.encode()
+    if isinstance(response, (bytes, bytearray, memoryview)):
+        found = _CREDIT_COUNT.search(response)
+        return int(found.group(1)) if found else None
+    return None
+
+
+class CreditBudgetExceeded(Exception):
+    """The daily or monthly credit budget is spent"""
+
+
+class TokenBucket:
+    """Thread safe token bucket
+
+    Callers reserve tokens, when the bucket is empty the reservation goes into debt and the caller is told how
+    long to wait, so a burst is queued and released at the refill rate instead of failing.
+
+    Args:
+            rate_per_minute (float): tokens added per minute.
+            capacity (float): maximum tokens kept, that is the largest burst allowed.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float):
+        if rate_per_minute <= 0 or capacity <= 0:
+            raise ValueError("rate_per_minute and capacity must be positive")
+        self.rate_per_second = rate_per_minute / 60
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate_per_second
+        )
+        self._updated = now
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Take tokens and return the seconds the caller must wait before using them"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_second
+
+    def penalize(self, seconds: float) -> None:
+        """Stop handing out tokens for the next seconds, used after the API answered 429"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate_per_second
+
+    @property
+    def tokens(self) -> float:
+        """Tokens currently available, negative when callers are queued"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+def _next_day(now: datetime) -> datetime:
+    return datetime(now.year, now.month, now.day, tzinfo=timezone.utc) + timedelta(
+        days=1
+    )
+
+
+def _next_month(now: datetime) -> datetime:
+    if now.month == 12:
+        return datetime(now.year + 1, 1, 1, tzinfo=timezone.utc)
+    return datetime(now.year, now.month + 1, 1, tzinfo=timezone.utc)
+
+
+class CreditBudget:
+    """Daily and monthly credit accounting, the periods reset at UTC midnight and on the first of the month
+
+    Args:
+            daily (int, optional): credits allowed per day, None means unlimited.
+            monthly (int, optional): credits allowed per month, None means unlimited.
+            used_today (int): credits already spent today.
+            used_this_month (int): credits already spent this month.
+    """
+
+    def __init__(
+        self,
+        daily: int | None = None,
+        monthly: int | None = None,
+        used_today: int = 0,
+        used_this_month: int = 0,
+    ):
+        self.daily = daily
+        self.monthly = monthly
+        self.used_today = used_today
+        self.used_this_month = used_this_month
+        self._lock = threading.Lock()
+        self._set_periods(datetime.now(timezone.utc))
+
+    def _set_periods(self, now: datetime) -> None:
+        self._day_reset = _next_day(now)
+        self._month_reset = _next_month(now)
+
+    def _roll(self, now: datetime) -> None:
+        if now >= self._month_reset:
+            self.used_this_month = 0
+        if now >= self._day_reset:
+            self.used_today = 0
+            self._set_periods(now)
+
+    def record(self, credits: int) -> None:
+        """Account for the credit_count of a response"""
+        with self._lock:
+            self._roll(datetime.now(timezone.utc))
+            self.used_today += credits
+            self.used_this_month += credits
+
+    def remaining(self) -> tuple[float, float]:
+        """Credits left (today, this month)"""
+        with self._lock:
+            self._roll(datetime.now(timezone.utc))
+            daily = float("inf") if self.daily is None else self.daily - self.used_today
+            monthly = (
+                float("inf")
+                if self.monthly is None
+                else self.monthly - self.used_this_month
+            )
+            return daily, monthly
+
+    def seconds_until_available(self) -> float:
+        """0 while there are credits left, otherwise the seconds until the spent period resets"""
+        daily, monthly = self.remaining()
+        now = datetime.now(timezone.utc)
+        if monthly <= 0:
+            return (self._month_reset - now).total_seconds()
+        if daily <= 0:
+            return (self._day_reset - now).total_seconds()
+        return 0.0
+
+
+class RateLimiter:
+    """Rate limiter shared by every request of a client (sync, threads and asyncio)
+
+    A part of the per minute limit is kept as burst and the rest refills steadily, so in any 60 seconds window no
+    more than requests_per_minute requests are sent.
+
+    Args:
+            requests_per_minute (int): plan limit, "rate_limit_minute" in /v1/key/info.
+            burst (int, optional): requests that can go out at once, default 10% of requests_per_minute.
+            budget (CreditBudget, optional): credit accounting, unlimited by default.
+            wait_for_credits (bool): when the budget is spent, wait for the next period instead of raising
+                    CreditBudgetExceeded.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 30,
+        burst: int | None = None,
+        budget: CreditBudget | None = None,
+        wait_for_credits: bool = False,
+    ):
+        self.wait_for_credits = wait_for_credits
+        self.budget = budget or CreditBudget()
+        self._configure(requests_per_minute, burst)
+
+    def _configure(self, requests_per_minute: int, burst: int | None) -> None:
+        if burst is None:
+            burst = max(1, int(requests_per_minute * 0.1))
+        burst = min(burst, requests_per_minute - 1) if requests_per_minute > 1 else 1
+        self.requests_per_minute = requests_per_minute
+        self.bucket = TokenBucket(
+            rate_per_minute=max(requests_per_minute - burst, 1), capacity=burst
+        )
+
+    @classmethod
+    def from_key_info(cls, key_info: dict, **kwargs) -> "RateLimiter":
+        """Build a limiter from the response of get_key_info"""
+        limiter = cls(**kwargs)
+        limiter.update_from_key_info(key_info)
+        return limiter
+
+    def update_from_key_info(self, key_info: dict) -> None:
+        """Seed the limits and the used credits from the response of get_key_info"""
+        plan = key_info["data"]["plan"]
+        usage = key_info["data"]["usage"]
+        if plan.get("rate_limit_minute"):
+            self._configure(plan["rate_limit_minute"], None)
+        self.budget.daily = plan.get("credit_limit_daily")
+        self.budget.monthly = plan.get("credit_limit_monthly")
+        self.budget.used_today = usage["current_day"]["credits_used"]
+        self.budget.used_this_month = usage["current_month"]["credits_used"]
+
+    def _credit_delay(self) -> float:
+        delay = self.budget.seconds_until_available()
+        if delay and not self.wait_for_credits:
+            raise CreditBudgetExceeded(
+                f"credit budget spent, it resets in {delay:.0f} seconds"
+            )
+        return delay
+
+    def acquire(self) -> None:
+        """Block until the request can be sent"""
+        delay = self._credit_delay()
+        if delay:
+            time.sleep(delay)
+        delay = self.bucket.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Coroutine version of acquire"""
+        import asyncio
+
+        delay = self._credit_delay()
+        if delay:
+            await asyncio.sleep(delay)
+        delay = self.bucket.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def record(self, status_code: int, response: dict | bytes | str) -> None:
+        """Account for the credits of a response, built or raw, a 429 pauses the bucket for a full refill"""
+        if status_code == 429:
+            self.bucket.penalize(self.bucket.capacity / self.bucket.rate_per_second)
+        credits = credit_count(response)
+        if credits:
+            self.budget.record(credits)
@@ -0,0 +1,443 @@
+"""Deadlines, retries and hedging
+Every request gets a timeout derived from the latencies observed on its endpoint, transient failures are retried
+with jittered exponential backoff while a retry budget and the deadline of the call allow it, and a slow request
+can be hedged with a second one once it has taken longer than the endpoint's p95.
+"""
+
+import contextlib
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any, AsyncContextManager
+
+# Statuses worth another try: rate limited and server side errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Errors returned by cmc_utils.fetch_raw_data when no response was received
+TRANSIENT_MESSAGES = frozenset({"Connection error", "Timeout"})
+# Only these methods are retried or hedged, sending them twice has no side effect
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Absolute time.monotonic() after which the calls of the current context give up
+_deadline_at: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "cmc_deadline_at", default=None
+)
+
+
+@contextlib.contextmanager
+def deadline(seconds: float):
+    """Calls of the clients made in the block give up after seconds in total, retries and hedges included
+
+    Nested deadlines keep the earliest one. The deadline follows the context (thread or asyncio task) that opened
+    the block.
+    """
+    at = time.monotonic() + seconds
+    current = _deadline_at.get()
+    token = _deadline_at.set(at if current is None else min(at, current))
+    try:
+        yield
+    finally:
+        _deadline_at.reset(token)
+
+
+def is_transient(status_code: int, raw_response: Any) -> bool:
+    """True for the failures that may succeed when tried again"""
+    if status_code in RETRY_STATUSES:
+        return True
+    return (
+        isinstance(raw_response, dict)
+        and raw_response.get("message") in TRANSIENT_MESSAGES
+    )
+
+
+class LatencyTracker:
+    """Latencies of the last requests of every endpoint, and the timeouts derived from them
+
+    Args:
+            window (int): samples kept per endpoint.
+            min_samples (int): below this the default timeout is used and no request is hedged.
+            multiplier (float): timeout = p99 * multiplier.
+            min_timeout (float): lower bound of the timeout, in seconds.
+            max_timeout (float): upper bound of the timeout, and the timeout until there are enough samples.
+    """
+
+    def __init__(
+        self,
+        window: int = 200,
+        min_samples: int = 20,
+        multiplier: float = 3.0,
+        min_timeout: float = 1.0,
+        max_timeout: float = 30.0,
+    ):
+        self.window = window
+        self.min_samples = min_samples
+        self.multiplier = multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self._samples: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        """Add the latency of a request that got a response"""
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, endpoint: str, q: float) -> float | None:
+        """q-th percentile (0..100) of the endpoint latencies, None when there are too few samples"""
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if len(samples) < self.min_samples:
+            return None
+        # nearest rank
+        rank = max(0, min(len(samples) - 1, int(round(q / 100 * len(samples))) - 1))
+        return samples[rank]
+
+    def timeout_for(self, endpoint: str) -> float:
+        """Timeout of the next request to the endpoint"""
+        p99 = self.percentile(endpoint, 99)
+        if p99 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, p99 * self.multiplier))
+
+    def hedge_delay(self, endpoint: str) -> float | None:
+        """Time after which a request is hedged: the endpoint's p95"""
+        return self.percentile(endpoint, 95)
+
+
+class RetryBudget:
+    """Caps the retries and hedges to a share of the requests, a failing API is not hammered with retries
+
+    Every request deposits ratio token, every retry or hedge withdraws one.
+
+    Args:
+            ratio (float): retries allowed per request, 0.1 is one extra request for ten.
+            min_tokens (float): tokens available from the start, so the first requests can be retried.
+            max_tokens (float): tokens saved at most.
+    """
+
+    def __init__(
+        self, ratio: float = 0.1, min_tokens: float = 10.0, max_tokens: float = 100.0
+    ):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take a token, False when the budget is spent"""
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class RetryPolicy:
+    """Timeouts, retries and hedging of the requests of a client
+
+    A hedged request is a second request for the same data, it costs credits like any other, that is why hedging
+    is off by default and shares the retry budget.
+
+    Args:
+            max_attempts (int): requests per call at most, the first one included.
+            base_delay (float): backoff before the first retry, doubled after each retry.
+            max_delay (float): longest backoff.
+            deadline (float, optional): seconds a call may take in total, see also the deadline context manager.
+            hedge (bool): send a second request once a request has been running longer than its endpoint's p95.
+            budget (RetryBudget, optional): shared by the retries and the hedges.
+            latency (LatencyTracker, optional): source of the timeouts and of the hedge delays.
+
+    Attributes:
+            retries (int): retries sent.
+            hedges (int): hedged requests sent.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 8.0,
+        deadline: float | None = None,
+        hedge: bool = False,
+        budget: RetryBudget | None = None,
+        latency: LatencyTracker | None = None,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.hedge = hedge
+        self.budget = budget or RetryBudget()
+        self.latency = latency or LatencyTracker()
+        self.retries = 0
+        self.hedges = 0
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def backoff(self, retry: int) -> float:
+        """Full jitter: uniform between 0 and the exponential delay, concurrent clients don't retry in step"""
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (retry - 1))
+        )
+
+    def _deadline_at(self) -> float | None:
+        at = _deadline_at.get()
+        if self.deadline is not None:
+            own = time.monotonic() + self.deadline
+            at = own if at is None else min(at, own)
+        return at
+
+    def _timeout(self, endpoint: str, deadline_at: float | None) -> float | None:
+        """Timeout of the next attempt, None when the deadline has passed"""
+        timeout = self.latency.timeout_for(endpoint)
+        if deadline_at is None:
+            return timeout
+        left = deadline_at - time.monotonic()
+        return min(timeout, left) if left > 0 else None
+
+    def _should_retry(
+        self, retry: int, status_code: int, raw_response, deadline_at
+    ) -> float | None:
+        """Backoff before the next attempt, None when the call must stop"""
+        if retry >= self.max_attempts or not is_transient(status_code, raw_response):
+            return None
+        delay = self.backoff(retry)
+        if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+            return None
+        if not self.budget.withdraw():
+            return None
+        self.retries += 1
+        return delay
+
+    def run(
+        self,
+        endpoint: str,
+        attempt: Callable[[float], tuple[int, Any]],
+        method: str = "GET",
+        admit: Callable[[], None] | None = None,
+        on_response: Callable[[int, Any, float], None] | None = None,
+    ) -> tuple[int, Any]:
+        """Run a request with timeouts, retries and hedging
+
+        Args:
+                endpoint (str): key of the latency statistics, the url of the endpoint.
+                attempt (Callable[[float], tuple[int, Any]]): sends the request with the given timeout, returns
+                        the http code and the raw body like cmc_utils.fetch_raw_data.
+                method (str): http method, the others than IDEMPOTENT_METHODS are sent once.
+                admit (Callable[[], None], optional): waits until a request may be sent, e.g. RateLimiter.acquire.
+                        It runs before every request, retries and hedges included, outside of its timeout and of
+                        its latency.
+                on_response (Callable[[int, Any, float], None], optional): called with the http code, the raw body
+                        and the seconds of every request sent, the retried ones and the hedges that lost included.
+
+        Returns:
+                (tuple[int, Any]): the last response, or 400 and {"message": "Deadline exceeded"}.
+        """
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        deadline_at = self._deadline_at()
+        self.budget.deposit()
+        retry = 0
+        while True:
+            timeout = self._timeout(endpoint, deadline_at)
+            if timeout is None:
+                return 400, {"message": "Deadline exceeded"}
+            if self.hedge and idempotent:
+                status_code, raw_response = self._hedged(
+                    endpoint, attempt, timeout, admit, on_response
+                )
+            else:
+                status_code, raw_response = self._timed(
+                    endpoint, attempt, timeout, admit, on_response
+                )
+            retry += 1
+            delay = (
+                self._should_retry(retry, status_code, raw_response, deadline_at)
+                if idempotent
+                else None
+            )
+            if delay is None:
+                return status_code, raw_response
+            time.sleep(delay)
+
+    def _timed(
+        self, endpoint: str, attempt, timeout: float, admit=None, on_response=None
+    ) -> tuple[int, Any]:
+        if admit is not None:
+            admit()
+        started = time.monotonic()
+        status_code, raw_response = attempt(timeout)
+        seconds = time.monotonic() - started
+        if not is_transient(status_code, raw_response):
+            self.latency.record(endpoint, seconds)
+        if on_response is not None:
+            on_response(status_code, raw_response, seconds)
+        return status_code, raw_response
+
+    def _pool(self):
+        with self._executor_lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._executor = ThreadPoolExecutor(thread_name_prefix="cmc-hedge")
+            return self._executor
+
+    def _hedged(
+        self, endpoint: str, attempt, timeout: float, admit=None, on_response=None
+    ) -> tuple[int, Any]:
+        """First good response of the request and, once it is slower than p95, of a second one"""
+        from concurrent import futures
+
+        delay = self.latency.hedge_delay(endpoint)
+        if delay is None or delay >= timeout:
+            return self._timed(endpoint, attempt, timeout, admit, on_response)
+        pool = self._pool()
+        # the hedge delay runs from the moment the first request is sent, not while it waits for admit
+        if admit is not None:
+            admit()
+        started = time.monotonic()
+        pending = {
+            pool.submit(self._timed, endpoint, attempt, timeout, None, on_response)
+        }
+        done, pending = futures.wait(pending, timeout=delay)
+        if not done and self.budget.withdraw():
+            self.hedges += 1
+            left = timeout - (time.monotonic() - started)
+            pending.add(
+                pool.submit(
+                    self._timed, endpoint, attempt, max(left, 0.001), admit, on_response
+                )
+            )
+        while True:
+            for future in done:
+                status_code, raw_response = future.result()
+                # the slower request keeps running, its response is dropped
+                if not pending or not is_transient(status_code, raw_response):
+                    return status_code, raw_response
+            done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+
+    async def arun(
+        self,
+        endpoint: str,
+        attempt: Callable[[], Awaitable[tuple[int, Any]]],
+        method: str = "GET",
+        admit: Callable[[], AsyncContextManager] | None = None,
+        on_response: Callable[[int, Any, float], None] | None = None,
+    ) -> tuple[int, Any]:
+        """Coroutine version of run, the timeout is enforced by cancelling the attempt
+
+        Args:
+                endpoint (str): key of the latency statistics.
+                attempt (Callable[[], Awaitable[tuple[int, Any]]]): sends the request.
+                method (str): http method.
+                admit (Callable[[], AsyncContextManager], optional): entered before every request and held while it
+                        runs, e.g. the max_in_flight semaphore and the rate limiter, the wait to enter it is not
+                        part of the timeout nor of the latency.
+                on_response (Callable[[int, Any, float], None], optional): see run.
+        """
+        import asyncio
+
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        deadline_at = self._deadline_at()
+        self.budget.deposit()
+        retry = 0
+        while True:
+            timeout = self._timeout(endpoint, deadline_at)
+            if timeout is None:
+                return 400, {"message": "Deadline exceeded"}
+            if self.hedge and idempotent:
+                status_code, response = await self._ahedged(
+                    endpoint, attempt, timeout, admit, on_response
+                )
+            else:
+                status_code, response = await self._atimed(
+                    endpoint, attempt, timeout, admit, on_response
+                )
+            retry += 1
+            delay = (
+                self._should_retry(retry, status_code, response, deadline_at)
+                if idempotent
+                else None
+            )
+            if delay is None:
+                return status_code, response
+            await asyncio.sleep(delay)
+
+    async def _atimed(
+        self,
+        endpoint: str,
+        attempt,
+        timeout: float,
+        admit=None,
+        on_response=None,
+        sent=None,
+    ) -> tuple[int, Any]:
+        """Timed attempt, sent (asyncio.Event) is set once admitted, or when admit failed"""
+        import asyncio
+
+        try:
+            async with contextlib.nullcontext() if admit is None else admit():
+                if sent is not None:
+                    sent.set()
+                started = time.monotonic()
+                try:
+                    status_code, response = await asyncio.wait_for(attempt(), timeout)
+                except asyncio.TimeoutError:
+                    status_code, response = 400, {"message": "Timeout"}
+                seconds = time.monotonic() - started
+        finally:
+            if sent is not None:
+                sent.set()
+        if not is_transient(status_code, response):
+            self.latency.record(endpoint, seconds)
+        if on_response is not None:
+            on_response(status_code, response, seconds)
+        return status_code, response
+
+    async def _ahedged(
+        self, endpoint: str, attempt, timeout: float, admit=None, on_response=None
+    ) -> tuple[int, Any]:
+        import asyncio
+
+        delay = self.latency.hedge_delay(endpoint)
+        if delay is None or delay >= timeout:
+            return await self._atimed(endpoint, attempt, timeout, admit, on_response)
+        sent = asyncio.Event()
+        pending = {
+            asyncio.ensure_future(
+                self._atimed(endpoint, attempt, timeout, admit, on_response, sent)
+            )
+        }
+        try:
+            # the hedge delay runs from the moment the first request is sent, not while it waits for admit
+            await sent.wait()
+            started = time.monotonic()
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done and self.budget.withdraw():
+                self.hedges += 1
+                left = max(timeout - (time.monotonic() - started), 0.001)
+                pending.add(
+                    asyncio.ensure_future(
+                        self._atimed(endpoint, attempt, left, admit, on_response)
+                    )
+                )
+            while True:
+                for task in done:
+                    status_code, response = task.result()
+                    if not pending or not is_transient(status_code, response):
+                        return status_code, response
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+        finally:
+            # unlike threads, the slower request can be cancelled
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,95 @@
+"""Request coalescing
+Concurrent callers asking for the same prepared request wait on one in-flight fetch and all get its result, so a
+burst of identical calls (e.g. when a cache entry expires) costs one request and one credit charge.
+"""
+
+import threading
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls by key, for threads
+
+    The result is shared by every caller of the flight, like a cached response it must not be mutated.
+
+    Attributes:
+            shared (int): calls served by another caller's flight.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls: dict[Any, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fetch: Callable[[], Any]) -> Any:
+        """Run fetch, or wait for the flight of key started by another thread and return its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fetch()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def __len__(self):
+        """Flights in progress"""
+        return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """Coroutine version of SingleFlight, for one event loop
+
+    The flight runs in its own task, a caller that is cancelled does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._flights = {}
+
+    async def do(self, key, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fetch(), or the flight of key started by another task"""
+        import asyncio
+
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = asyncio.ensure_future(fetch())
+
+            def forget(_):
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+            flight.add_done_callback(forget)
+        else:
+            self.shared += 1
+        return await asyncio.shield(flight)
+
+    def __len__(self):
+        """Flights in progress"""
+        return len(self._flights)
@@ -0,0 +1,248 @@
+"""Snapshot store
+Append-only history of listing and quote responses. Every fetch is added as a timestamped snapshot, the coins are
+written as compressed blocks (gzip members) at the end of chunk files and a SQLite index on time and coin id
+locates them, so a time range for a few coins is read back without decompressing whole days.
+"""
+
+import json
+import os
+import re
+import threading
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timezone
+
+from cmc_api.cmc_datahandler import coins_of
+
+# Default limits of the files and blocks
+CHUNK_MAX_BYTES = 64 * 2**20
+BLOCK_SIZE = 256
+
+
+def to_epoch(value: str | datetime | float | int) -> float:
+    """Seconds since the epoch of an API timestamp ("2022-06-04T04:26:55.117Z"), a datetime or a number"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class SnapshotStore:
+    """Append-only store of snapshots
+
+    Layout of the directory: <endpoint>-<n>.jsonl.gz chunk files, each a series of gzip members of block_size
+    coins (one json per line), and index.sqlite with the snapshots and the (coin id, chunk, offset, length, line)
+    of every coin. A chunk file is a valid gzip file, it can also be read with gzip.open.
+
+    Args:
+            directory (str): where the chunk files and the index are kept.
+            chunk_max_bytes (int): a new chunk file is started past this size.
+            block_size (int): coins per compressed block, smaller blocks make reads of few coins cheaper.
+            compresslevel (int): gzip level, 1 (fast) .. 9 (small).
+    """
+
+    def __init__(
+        self,
+        directory: str = "snapshots",
+        chunk_max_bytes: int = CHUNK_MAX_BYTES,
+        block_size: int = BLOCK_SIZE,
+        compresslevel: int = 6,
+    ):
+        import sqlite3
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self.chunk_max_bytes = chunk_max_bytes
+        self.block_size = block_size
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            os.path.join(directory, "index.sqlite"), check_same_thread=False
+        )
+        with self._connection as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "id INTEGER PRIMARY KEY, ts REAL NOT NULL, timestamp TEXT NOT NULL, endpoint TEXT NOT NULL, "
+                "metadata TEXT NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS coins ("
+                "snapshot_id INTEGER NOT NULL, coin_id INTEGER NOT NULL, chunk TEXT NOT NULL, "
+                "offset INTEGER NOT NULL, length INTEGER NOT NULL, line INTEGER NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS snapshots_ts ON snapshots (endpoint, ts)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS coins_coin ON coins (coin_id, snapshot_id)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS coins_snapshot ON coins (snapshot_id)"
+            )
+
+    def _chunk_for(self, endpoint: str) -> str:
+        """Current chunk file of the endpoint, a new one when it is full"""
+        pattern = re.compile(rf"{re.escape(endpoint)}-(\d+)\.jsonl\.gz")
+        numbers = [
+            int(found.group(1))
+            for found in map(pattern.fullmatch, os.listdir(self.directory))
+            if found
+        ]
+        number = max(numbers, default=0)
+        path = os.path.join(self.directory, f"{endpoint}-{number:05d}.jsonl.gz")
+        if os.path.exists(path) and os.path.getsize(path) >= self.chunk_max_bytes:
+            number += 1
+        return f"{endpoint}-{number:05d}.jsonl.gz"
+
+    def append(self, response: dict, endpoint: str = "listing", timestamp=None) -> int:
+        """Add a snapshot
+
+        Args:
+                response (dict): a get_listing or get_quote_latest response, {"metadata": ..., "data": ...}.
+                endpoint (str): name of the series, e.g. "listing" or "quotes".
+                timestamp (str | datetime | float, optional): time of the snapshot, the metadata timestamp by
+                        default.
+
+        Returns:
+                (int): id of the snapshot, the existing one when the endpoint already has a snapshot at that time.
+        """
+        import gzip
+
+        metadata = response.get("metadata") or {}
+        timestamp = timestamp or metadata.get("timestamp")
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc)
+        ts = to_epoch(timestamp)
+        if not isinstance(timestamp, str):
+            timestamp = datetime.fromtimestamp(ts, timezone.utc).isoformat()
+        coins = list(coins_of(response["data"]))
+
+        with self._lock:
+            # a response served again from a cache is the same snapshot
+            found = self._connection.execute(
+                "SELECT id FROM snapshots WHERE endpoint = ? AND timestamp = ?",
+                (endpoint, timestamp),
+            ).fetchone()
+            if found is not None:
+                return found[0]
+            chunk = self._chunk_for(endpoint)
+            rows = []
+            with open(os.path.join(self.directory, chunk), mode="ab") as file:
+                offset = file.tell()
+                for start in range(0, len(coins), self.block_size):
+                    block = coins[start : start + self.block_size]
+                    lines = "\n".join(
+                        json.dumps(coin, separators=(",", ":")) for coin in block
+                    )
+                    member = gzip.compress(
+                        lines.encode("utf-8"), compresslevel=self.compresslevel
+                    )
+                    file.write(member)
+                    rows.extend(
+                        (coin["id"], chunk, offset, len(member), line)
+                        for line, coin in enumerate(block)
+                    )
+                    offset += len(member)
+                file.flush()
+                os.fsync(file.fileno())
+            # the blocks are on disk before the index points at them
+            with self._connection as connection:
+                cursor = connection.execute(
+                    "INSERT INTO snapshots (ts, timestamp, endpoint, metadata) VALUES (?, ?, ?, ?)",
+                    (ts, timestamp, endpoint, json.dumps(metadata, default=str)),
+                )
+                snapshot_id = cursor.lastrowid
+                connection.executemany(
+                    "INSERT INTO coins (snapshot_id, coin_id, chunk, offset, length, line) VALUES (?, ?, ?, ?, ?, ?)",
+                    ((snapshot_id, *row) for row in rows),
+                )
+        return snapshot_id
+
+    def snapshots(
+        self, start=None, end=None, endpoint: str | None = None
+    ) -> list[dict]:
+        """Snapshots taken in [start, end], oldest first: {"id", "timestamp", "endpoint", "metadata"}"""
+        where, params = self._where(start, end, endpoint)
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT id, timestamp, endpoint, metadata FROM snapshots {where} ORDER BY ts, id",
+                params,
+            ).fetchall()
+        return [
+            {
+                "id": snapshot_id,
+                "timestamp": timestamp,
+                "endpoint": name,
+                "metadata": json.loads(metadata),
+            }
+            for snapshot_id, timestamp, name, metadata in rows
+        ]
+
+    @staticmethod
+    def _where(start, end, endpoint) -> tuple[str, list]:
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(to_epoch(start))
+        if end is not None:
+            clauses.append("ts <= ?")
+            params.append(to_epoch(end))
+        if endpoint is not None:
+            clauses.append("endpoint = ?")
+            params.append(endpoint)
+        return ("WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def read(
+        self,
+        start=None,
+        end=None,
+        coin_ids: Iterable[int] | None = None,
+        endpoint: str | None = None,
+    ) -> Iterator[tuple[str, dict]]:
+        """Coins of the snapshots taken in [start, end], oldest first
+
+        Only the blocks holding the requested coins are read and decompressed, each of them once.
+
+        Args:
+                start (str | datetime | float, optional): first time included.
+                end (str | datetime | float, optional): last time included.
+                coin_ids (Iterable[int], optional): only these coins, all of them by default.
+                endpoint (str, optional): only this series.
+
+        Returns:
+                (Iterator[tuple[str, dict]]): (timestamp of the snapshot, coin) pairs.
+        """
+        import gzip
+
+        where, params = self._where(start, end, endpoint)
+        query = (
+            "SELECT snapshots.timestamp, coins.chunk, coins.offset, coins.length, coins.line "
+            f"FROM snapshots JOIN coins ON coins.snapshot_id = snapshots.id {where}"
+        )
+        if coin_ids is not None:
+            query += (" AND " if where else " WHERE ") + (
+                "coins.coin_id IN (SELECT value FROM json_each(?))"
+            )
+            params.append(json.dumps([int(coin_id) for coin_id in coin_ids]))
+        query += " ORDER BY snapshots.ts, snapshots.id, coins.offset, coins.line"
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+
+        block_key, lines = None, []
+        for timestamp, chunk, offset, length, line in rows:
+            if (chunk, offset) != block_key:
+                with open(os.path.join(self.directory, chunk), mode="rb") as file:
+                    file.seek(offset)
+                    member = file.read(length)
+                lines = gzip.decompress(member).split(b"\n")
+                block_key = (chunk, offset)
+            yield timestamp, json.loads(lines[line])
+
+    def close(self) -> None:
+        """Close the index"""
+        with self._lock:
+            self._connection.close()
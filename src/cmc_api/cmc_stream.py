@@ -0,0 +1,296 @@
+"""Streaming responses
+Parse the body of large responses (listings, ID map) while it is downloaded. The items of "data" are handed out
+one at a time as soon as they are complete, so memory stays flat whatever the page size and the caller can start
+working before the download ends. The other keys, "status" included, are available once the body is consumed.
+"""
+
+import codecs
+import json
+import re
+from collections.abc import AsyncIterable, Callable, Iterable, Iterator
+from typing import Any
+
+from cmc_api import cmc_utils
+from cmc_api.cmc_datahandler import HandlerOriginalStructure
+
+# Bytes read from the socket at a time
+CHUNK_SIZE = 64 * 1024
+
+_BLANK = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+# Sentinel yielded by the parser when it needs the next chunk
+_NEED_MORE = object()
+
+
+class StreamParser:
+    """Push parser of a response body, chunks go in with feed and the completed items of "data" come out
+
+    Each item is decoded with json.JSONDecoder.raw_decode once all its bytes are in the buffer, the consumed part
+    of the buffer is dropped on the next chunk. When "data" is a dict the items are (key, value) tuples.
+
+    Attributes:
+            payload (dict): the top level keys other than "data", e.g. "status".
+            count (int): items handed out so far.
+            done (bool): the whole document was parsed.
+    """
+
+    def __init__(self):
+        self.payload = {}
+        self.count = 0
+        self.done = False
+        self._list_keys = None
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._steps = self._parse()
+
+    def feed(self, chunk: bytes) -> list:
+        """Add a chunk of the body, returns the items completed by it"""
+        self._append(self._decoder.decode(chunk))
+        return self._run()
+
+    def close(self) -> list:
+        """Signal the end of the body, returns the last items"""
+        self._append(self._decoder.decode(b"", final=True))
+        self._eof = True
+        items = self._run()
+        if not self.done:
+            raise ValueError("The body ended before the end of the json document")
+        return items
+
+    @property
+    def metadata(self) -> dict | None:
+        """Same metadata as HandlerDataList plus the number of items, None until the body is consumed"""
+        if not self.done:
+            return None
+        status = self.payload.get("status") or {}
+        return {
+            "timestamp": status.get("timestamp"),
+            "credit_count": status.get("credit_count"),
+            "error_message": status.get("error_message"),
+            "list_keys": self._list_keys or [],
+            "items": self.count,
+        }
+
+    def _append(self, text: str) -> None:
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+
+    def _run(self) -> list:
+        items = []
+        for step in self._steps:
+            if step is _NEED_MORE:
+                break
+            items.append(step)
+        return items
+
+    def _more(self):
+        if self._eof:
+            raise ValueError("The body ended before the end of the json document")
+        yield _NEED_MORE
+
+    def _peek(self):
+        """Next character that is not blank, it is not consumed"""
+        while True:
+            self._pos = _BLANK.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            yield from self._more()
+
+    def _expect(self, char: str):
+        found = yield from self._peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found!r}")
+        self._pos += 1
+
+    def _value(self):
+        """A complete json value"""
+        yield from self._peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                yield from self._more()
+                continue
+            # a number at the end of the buffer may go on in the next chunk
+            if end < len(self._buffer) or self._eof:
+                self._pos = end
+                return value
+            yield from self._more()
+
+    def _parse(self):
+        yield from self._expect("{")
+        char = yield from self._peek()
+        if char == "}":
+            self._pos += 1
+        else:
+            while True:
+                key = yield from self._value()
+                yield from self._expect(":")
+                char = yield from self._peek()
+                if key == "data" and char in "[{":
+                    yield from self._items(char)
+                else:
+                    self.payload[key] = yield from self._value()
+                char = yield from self._peek()
+                self._pos += 1
+                if char == "}":
+                    break
+                if char != ",":
+                    raise ValueError(f"Expected ',' or '}}' but found {char!r}")
+        self.done = True
+
+    def _items(self, opening: str):
+        closing = "]" if opening == "[" else "}"
+        self._pos += 1
+        char = yield from self._peek()
+        if char == closing:
+            self._pos += 1
+            return
+        while True:
+            if opening == "{":
+                key = yield from self._value()
+                yield from self._expect(":")
+                value = yield from self._value()
+                item = (key, value)
+            else:
+                value = item = yield from self._value()
+            if self._list_keys is None and isinstance(value, dict):
+                self._list_keys = list(value)
+            self.count += 1
+            yield item
+            char = yield from self._peek()
+            self._pos += 1
+            if char == closing:
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or {closing!r} but found {char!r}")
+
+
+class StreamedResponse:
+    """Iterable over the items of "data" of a body read in chunks, it can be iterated once
+
+    Args:
+            chunks (Iterable[bytes]): the body, e.g. requests.Response.iter_content(CHUNK_SIZE).
+            on_complete (Callable[[dict], None], optional): called with the metadata once the body is consumed.
+            close (Callable[[], None], optional): releases the connection, called at the end or when the iteration
+                    is abandoned.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+        on_complete: Callable[[dict], None] | None = None,
+        close: Callable[[], None] | None = None,
+    ):
+        self.parser = StreamParser()
+        self._chunks = chunks
+        self._on_complete = on_complete
+        self._close = close
+
+    def __iter__(self) -> Iterator[Any]:
+        try:
+            for chunk in self._chunks:
+                yield from self.parser.feed(chunk)
+            yield from self.parser.close()
+        finally:
+            if self._close is not None:
+                self._close()
+        if self._on_complete is not None:
+            self._on_complete(self.metadata)
+
+    @property
+    def metadata(self) -> dict | None:
+        """See StreamParser.metadata"""
+        return self.parser.metadata
+
+    @property
+    def status(self) -> dict | None:
+        """The "status" of the response, None until the body is consumed"""
+        return self.parser.payload.get("status") if self.parser.done else None
+
+
+class AsyncStreamedResponse(StreamedResponse):
+    """StreamedResponse over an async iterable of chunks, e.g. aiohttp's content.iter_chunked, use async for"""
+
+    def __init__(
+        self,
+        chunks: AsyncIterable[bytes],
+        on_complete: Callable[[dict], None] | None = None,
+        close: Callable[[], None] | None = None,
+    ):
+        super().__init__(chunks, on_complete, close)
+
+    def __iter__(self):
+        raise TypeError("Use async for with an AsyncStreamedResponse")
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._chunks:
+                for item in self.parser.feed(chunk):
+                    yield item
+            for item in self.parser.close():
+                yield item
+        finally:
+            if self._close is not None:
+                self._close()
+        if self._on_complete is not None:
+            self._on_complete(self.metadata)
+
+
+def open_stream(
+    request_session,
+    url_endpoint: str,
+    safe_param: str,
+    chunk_size: int = CHUNK_SIZE,
+    on_complete: Callable[[dict], None] | None = None,
+    timeout: float | tuple[float, float] = cmc_utils.DEFAULT_TIMEOUT,
+) -> tuple[int, StreamedResponse | dict]:
+    """Send the request and return the body as a StreamedResponse, the body is read while it is iterated
+
+    Args:
+            request_session (request):
+            url_endpoint (str): full url of the endpoint, see cmc_utils.prepare_request.
+            safe_param (str): encoded query string, see cmc_utils.prepare_request.
+            chunk_size (int): bytes read from the socket at a time.
+            on_complete (Callable[[dict], None], optional): see StreamedResponse.
+            timeout (float | tuple[float, float]): like cmc_utils.fetch_raw_data, the read timeout applies between
+                    two chunks.
+
+    Returns:
+            (tuple[int, StreamedResponse | dict]): the http code and the stream, or the error code and
+                {"message": ""} like cmc_utils.fetch_raw_data.
+    """
+    from requests import exceptions
+
+    try:
+        map_resp = request_session.get(
+            url=url_endpoint, params=safe_param, stream=True, timeout=timeout
+        )
+    except exceptions.ConnectionError as connection_error:
+        cmc_utils.logger.error(
+            "There is something wrong with the connection.\n %s", connection_error
+        )
+        return 400, {"message": "Connection error"}
+    except exceptions.Timeout as timeout:
+        cmc_utils.logger.error("Timeout \n%s", timeout)
+        return 400, {"message": "Timeout"}
+
+    if map_resp.status_code != 200:
+        # error bodies are small, they are read at once
+        status_code, raw_response = map_resp.status_code, map_resp.content
+        map_resp.close()
+        if status_code == 414:
+            cmc_utils.logger.error("414 Request-URI Too Large\n%s", map_resp.url)
+            return 414, {"message": "error"}
+        return cmc_utils.build_response(
+            status_code, raw_response, HandlerOriginalStructure
+        )
+    return 200, StreamedResponse(
+        map_resp.iter_content(chunk_size=chunk_size),
+        on_complete=on_complete,
+        close=map_resp.close,
+    )
@@ -0,0 +1,410 @@
+"""Record/replay transport
+A transport sits under cmc_utils.fetch_raw_data (and the streams) in place of the live session. Recorder captures
+every request -> response pair of a client into a cassette, a gzip-compressed json file. Replayer serves them back
+from memory without any network, optionally with simulated latency and injected errors, so tests, backtests and
+load tests run offline and spend no credits.
+
+Only the url, the encoded query string, the status, the body and the latency are kept, the headers (and the API
+key) are never written to a cassette.
+"""
+
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+from urllib import parse
+
+from cmc_api.cmc_utils import temporary_name
+
+# Version of the cassette layout
+CASSETTE_VERSION = 1
+# Errors injected by default: a dropped connection, a timeout and the statuses of an overloaded API
+DEFAULT_ERRORS = ("connection", "timeout", 429, 503)
+
+
+def _params_key(params) -> str:
+    """The encoded query string, requests are matched on it"""
+    if params is None:
+        return ""
+    if isinstance(params, str):
+        return params
+    return parse.urlencode(params, safe=',"')
+
+
+class Cassette:
+    """Recorded interactions, grouped by request in the order they were received
+
+    Args:
+            path (str, optional): file read when it exists and written by save.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.interactions: dict[tuple[str, str], list[dict]] = {}
+        self._lock = threading.Lock()
+        # one save at a time, recording goes on while the file is written
+        self._save_lock = threading.Lock()
+        if path is not None and os.path.isfile(path):
+            self.load(path)
+
+    def __len__(self):
+        return sum(len(responses) for responses in self.interactions.values())
+
+    def add(
+        self, url: str, params, status: int, body: bytes, latency: float = 0.0
+    ) -> None:
+        """Record a response of url?params"""
+        interaction = {
+            "status": status,
+            "body": body.decode("utf-8") if isinstance(body, bytes) else body,
+            "latency": round(latency, 4),
+        }
+        with self._lock:
+            self.interactions.setdefault((url, _params_key(params)), []).append(
+                interaction
+            )
+
+    def responses(self, url: str, params) -> list[dict]:
+        """Responses recorded for url?params, oldest first"""
+        return self.interactions.get((url, _params_key(params)), [])
+
+    def save(self, path: str | None = None) -> None:
+        """Write the cassette, the file is replaced atomically and concurrent saves are serialized"""
+        path = path or self.path
+        with self._save_lock:
+            with self._lock:
+                payload = {
+                    "version": CASSETTE_VERSION,
+                    "interactions": [
+                        {"url": url, "params": params, "responses": list(responses)}
+                        for (url, params), responses in self.interactions.items()
+                    ],
+                }
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporary = temporary_name(path)
+            with gzip.open(temporary, mode="wt", encoding="utf-8") as file:
+                json.dump(payload, file, separators=(",", ":"))
+            os.replace(temporary, path)
+
+    def load(self, path: str) -> None:
+        """Add the interactions of a saved cassette"""
+        with gzip.open(path, mode="rt", encoding="utf-8") as file:
+            payload = json.load(file)
+        if payload.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unknown cassette version {payload.get('version')}")
+        with self._lock:
+            for interaction in payload["interactions"]:
+                self.interactions.setdefault(
+                    (interaction["url"], interaction["params"]), []
+                ).extend(interaction["responses"])
+
+
+class ReplayResponse:
+    """The parts of a requests.Response used by the client"""
+
+    def __init__(self, status_code: int, content: bytes, url: str):
+        self.status_code = status_code
+        self.content = content
+        self.url = url
+
+    def iter_content(self, chunk_size: int = 1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+    def close(self) -> None:
+        pass
+
+
+class _AsyncContent:
+    def __init__(self, content: bytes):
+        self._content = content
+
+    async def iter_chunked(self, chunk_size: int):
+        for start in range(0, len(self._content), chunk_size):
+            yield self._content[start : start + chunk_size]
+
+
+class AsyncReplayResponse:
+    """The parts of an aiohttp.ClientResponse used by the client"""
+
+    def __init__(self, status: int, body: bytes, url: str):
+        self.status = status
+        self.url = url
+        self.request_info = None
+        self.history = ()
+        self.content = _AsyncContent(body)
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    def release(self) -> None:
+        pass
+
+
+class _AsyncRequest:
+    """Result of session.get, awaited or used as an async context manager like aiohttp's"""
+
+    def __init__(self, coroutine):
+        self._coroutine = coroutine
+
+    def __await__(self):
+        return self._coroutine.__await__()
+
+    async def __aenter__(self):
+        return await self._coroutine
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class Recorder:
+    """Transport that sends the requests with the live session and records the responses
+
+    Args:
+            path (str): cassette file, the interactions of an existing file are kept.
+            autosave (bool): save the cassette autosave_interval seconds after a response is recorded, the responses
+                    recorded meanwhile are written by the same save, otherwise call save.
+            autosave_interval (float): seconds between two autosaves, each one rewrites the whole file.
+    """
+
+    live = True
+
+    def __init__(
+        self, path: str, autosave: bool = False, autosave_interval: float = 1.0
+    ):
+        self.cassette = Cassette(path)
+        self.autosave = autosave
+        self.autosave_interval = autosave_interval
+        self._timer = None
+        self._timer_lock = threading.Lock()
+
+    def _add(self, url, params, status, body, latency) -> None:
+        self.cassette.add(url, params, status, body, latency)
+        if self.autosave:
+            with self._timer_lock:
+                if self._timer is None:
+                    # not a daemon, a pending save is written before the interpreter exits
+                    self._timer = threading.Timer(self.autosave_interval, self.save)
+                    self._timer.start()
+
+    def save(self) -> None:
+        """Write the cassette now, a pending autosave is then not needed"""
+        with self._timer_lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self.cassette.save()
+
+    def wrap(self, session) -> "RecordingSession":
+        """Session used by cmc.Wrapper"""
+        return RecordingSession(session, self)
+
+    def wrap_async(self, session) -> "AsyncRecordingSession":
+        """Session used by cmc_async.AsyncWrapper"""
+        return AsyncRecordingSession(session, self)
+
+
+class RecordingSession:
+    """requests.Session recording every response, the other attributes are the session's"""
+
+    def __init__(self, session, recorder: Recorder):
+        self.session = session
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    def get(self, url: str, params=None, **kwargs):
+        started = time.perf_counter()
+        response = self.session.get(url=url, params=params, **kwargs)
+        # a streamed body is read here, it is served again from memory by iter_content
+        content = response.content
+        self.recorder._add(
+            url, params, response.status_code, content, time.perf_counter() - started
+        )
+        return response
+
+
+class AsyncRecordingSession:
+    """aiohttp.ClientSession recording every response"""
+
+    def __init__(self, session, recorder: Recorder):
+        self.session = session
+        self.recorder = recorder
+
+    @property
+    def closed(self) -> bool:
+        return self.session.closed
+
+    async def close(self) -> None:
+        await self.session.close()
+
+    def get(self, url: str, params=None, **kwargs) -> _AsyncRequest:
+        async def request():
+            started = time.perf_counter()
+            async with self.session.get(url, params=params, **kwargs) as response:
+                body = await response.read()
+                status = response.status
+            self.recorder._add(url, params, status, body, time.perf_counter() - started)
+            return AsyncReplayResponse(status, body, url)
+
+        return _AsyncRequest(request())
+
+
+class Replayer:
+    """Transport that serves the responses of a cassette, no request leaves the process
+
+    Responses recorded several times for one request are served in order, the last one is then repeated. A
+    request that was never recorded gets a 404 with an error message.
+
+    Args:
+            cassette (str | Cassette): the cassette or its file.
+            latency (None | str | float | Callable[[], float]): None answers at once, "recorded" waits the latency
+                    measured when recording, a number waits that many seconds, a callable returns the seconds.
+            error_rate (float): share of the requests that fail, 0 .. 1.
+            errors (tuple): failures picked from when a request fails: "connection", "timeout" or a status code.
+            seed (int, optional): seed of the error injection, for reproducible runs.
+
+    Attributes:
+            requests (int): requests served.
+            injected (int): errors injected.
+    """
+
+    live = False
+
+    def __init__(
+        self,
+        cassette: "str | Cassette",
+        latency: None | str | float | Callable[[], float] = None,
+        error_rate: float = 0.0,
+        errors: tuple = DEFAULT_ERRORS,
+        seed: int | None = None,
+    ):
+        self.cassette = (
+            cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+        )
+        self.latency = latency
+        self.error_rate = error_rate
+        self.errors = errors
+        self.requests = 0
+        self.injected = 0
+        self._random = random.Random(seed)
+        self._cursors: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, session=None) -> "ReplaySession":
+        """Session used by cmc.Wrapper, the live session is not used"""
+        return ReplaySession(self)
+
+    def wrap_async(self, session=None) -> "AsyncReplaySession":
+        """Session used by cmc_async.AsyncWrapper"""
+        return AsyncReplaySession(self)
+
+    def next_response(self, url: str, params) -> tuple[int, bytes, float, object]:
+        """Status, body and delay of the next response of url?params, and the error to raise if any"""
+        key = (url, _params_key(params))
+        with self._lock:
+            self.requests += 1
+            responses = self.cassette.interactions.get(key)
+            if responses:
+                cursor = self._cursors.get(key, 0)
+                self._cursors[key] = cursor + 1
+                recorded = responses[min(cursor, len(responses) - 1)]
+            else:
+                recorded = None
+            error = None
+            if self.error_rate and self._random.random() < self.error_rate:
+                error = self._random.choice(self.errors)
+                self.injected += 1
+        if recorded is None:
+            message = f"No recorded response for {url}?{key[1]}"
+            body = json.dumps({"status": {"error_message": message}})
+            recorded = {"status": 404, "body": body, "latency": 0.0}
+        if isinstance(error, int):
+            body = json.dumps({"status": {"error_message": f"Injected {error}"}})
+            recorded = {**recorded, "status": error, "body": body}
+        return (
+            recorded["status"],
+            recorded["body"].encode("utf-8"),
+            self._delay(recorded),
+            error if isinstance(error, str) else None,
+        )
+
+    def _delay(self, recorded: dict) -> float:
+        if self.latency is None:
+            return 0.0
+        if self.latency == "recorded":
+            return recorded["latency"]
+        if callable(self.latency):
+            return self.latency()
+        return float(self.latency)
+
+
+def _read_timeout(timeout) -> float | None:
+    if isinstance(timeout, tuple):
+        return timeout[1]
+    return timeout
+
+
+class ReplaySession:
+    """requests.Session look-alike answering from a Replayer"""
+
+    def __init__(self, replayer: Replayer):
+        self.replayer = replayer
+        self.headers = {}
+
+    def mount(self, prefix: str, adapter) -> None:
+        pass
+
+    def get(self, url: str, params=None, timeout=None, stream=False, **kwargs):
+        from requests import exceptions
+
+        status, body, delay, error = self.replayer.next_response(url, params)
+        read_timeout = _read_timeout(timeout)
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            raise exceptions.ReadTimeout(f"Replayed response slower than {timeout}")
+        if delay:
+            time.sleep(delay)
+        if error == "connection":
+            raise exceptions.ConnectionError("Injected connection error")
+        if error == "timeout":
+            raise exceptions.ReadTimeout("Injected timeout")
+        return ReplayResponse(status, body, url)
+
+    def close(self) -> None:
+        pass
+
+
+class AsyncReplaySession:
+    """aiohttp.ClientSession look-alike answering from a Replayer"""
+
+    def __init__(self, replayer: Replayer):
+        self.replayer = replayer
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+    def get(self, url: str, params=None, **kwargs) -> _AsyncRequest:
+        async def request():
+            import asyncio
+
+            import aiohttp
+
+            status, body, delay, error = self.replayer.next_response(url, params)
+            if delay:
+                await asyncio.sleep(delay)
+            if error == "connection":
+                raise aiohttp.ClientConnectionError("Injected connection error")
+            if error == "timeout":
+                raise asyncio.TimeoutError("Injected timeout")
+            return AsyncReplayResponse(status, body, url)
+
+        return _AsyncRequest(request())
@@ -1,4 +1,5 @@
 """Helper functions - Utils"""
+
 import configparser
 import enum
 import json
@@ -6,12 +7,11 @@ import logging
 from datetime import datetime
 from json import JSONDecodeError
 from typing import Any, Protocol, Callable
+import threading
 import time
 import os
 from urllib import parse
 
-from requests import exceptions
-
 
 def fetch_cmc_logger(
     log_file_location: str = "../logs/",
@@ -50,9 +50,26 @@ def fetch_cmc_logger(
     return c_logger
 
 
-logger = fetch_cmc_logger(
-    log_file_name="cmc_utils.log", log_level=logging.ERROR, logger_name="utils"
-)
+# Handlers are attached by configure_logging on the first request, importing the package or building a client
+# has no side effects
+logger = logging.getLogger("utils")
+_logging_configured = False
+_logging_lock = threading.Lock()
+
+
+def configure_logging() -> None:
+    """Set the Log Objects of the package, only the first call creates the log folder and the handlers"""
+    global _logging_configured
+    if _logging_configured:
+        return
+    with _logging_lock:
+        if _logging_configured:
+            return
+        fetch_cmc_logger(
+            log_file_name="cmc_utils.log", log_level=logging.ERROR, logger_name="utils"
+        )
+        fetch_cmc_logger(log_level=logging.INFO)
+        _logging_configured = True
 
 
 def get_todays_timestamp() -> str:
@@ -68,6 +85,11 @@ def get_todays_timestamp() -> str:
     return timestamp
 
 
+def temporary_name(path: str) -> str:
+    """Name of the file written before it is swapped in place of path, unique per process and thread"""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
 def save_to_json(file_name: str, payload: Any, timestamp: str = "") -> None:
     """Save to a json file.
 
@@ -83,13 +105,16 @@ def save_to_json(file_name: str, payload: Any, timestamp: str = "") -> None:
 
     # If folder doesn't exist, then create it.
     if not os.path.isdir(my_json_directory):
-        os.makedirs(my_json_directory)
+        os.makedirs(my_json_directory, exist_ok=True)
         print("created directory: ", my_json_directory)
 
     file_location = f"json_files/{file_name}{timestamp}.json"
     if payload is not None:
-        with open(file=file_location, mode="w", encoding="utf-8") as file:
+        # written aside and swapped in, threads saving the same file never leave it half written
+        temporary = temporary_name(file_location)
+        with open(file=temporary, mode="w", encoding="utf-8") as file:
             json.dump(payload, file, indent=6)
+        os.replace(temporary, file_location)
     else:
         raise ValueError(f"There is not data to be save on {file_name}{timestamp}.json")
 
@@ -120,12 +145,27 @@ def get_info_from_json_file(file_name: str) -> dict | None:
         return data_payload
 
 
+# (mtime, ids) of the last read of the mapping file, replaced as a whole under its lock
+_cmc_ids_memo = (None, None)
+_cmc_ids_lock = threading.Lock()
+
+
 def get_cmc_ids() -> str | None:
-    """Get the Coin Market Cap ids
+    """Get the Coin Market Cap ids, the file is read again only when it changed.
+    For lookups by symbol or slug see cmc_index.CmcIdIndex.
 
     Returns:
                     (str): list of ids
     """
+    try:
+        mtime = os.stat("json_files/cmc_ids_mapping.json").st_mtime_ns
+    except OSError:
+        mtime = None
+    global _cmc_ids_memo
+    with _cmc_ids_lock:
+        memo_mtime, memo_ids = _cmc_ids_memo
+    if mtime is not None and memo_mtime == mtime:
+        return memo_ids
     try:
         maps = get_info_from_json_file(file_name="cmc_ids_mapping")
         ids = [str(data["id"]) for data in maps["data"]]
@@ -136,9 +176,26 @@ def get_cmc_ids() -> str | None:
         logger.error(msg="The cmc mapping file doesn't exist")
         return None
     else:
+        with _cmc_ids_lock:
+            _cmc_ids_memo = (mtime, ids_string)
         return ids_string
 
 
+# (connect, read) timeout of the requests, see cmc_retry for timeouts that follow the observed latencies
+DEFAULT_TIMEOUT = (3.05, 30.0)
+
+# Serialises the read-modify-write of config.ini between the threads (and clients) of the process
+_config_lock = threading.RLock()
+
+
+def _write_config(config: configparser.ConfigParser, file_name: str) -> None:
+    """Write to a temporary file and swap it in, readers see the old or the new file, never a partial one"""
+    temporary = temporary_name(file_name)
+    with open(file=temporary, mode="w", encoding="utf-8") as configfile:
+        config.write(configfile)
+    os.replace(temporary, file_name)
+
+
 def create_config_file(file_name: str = "config.ini"):
     """Create the config file"""
     config = configparser.ConfigParser()
@@ -150,8 +207,8 @@ def create_config_file(file_name: str = "config.ini"):
         "Last_updated": 0,
     }
 
-    with open(file=file_name, mode="w", encoding="utf-8") as configfile:
-        config.write(configfile)
+    with _config_lock:
+        _write_config(config, file_name)
 
 
 def get_configuration_file(name: str = "config.ini", section: str = "DEFAULT"):
@@ -160,13 +217,14 @@ def get_configuration_file(name: str = "config.ini", section: str = "DEFAULT"):
     # You should change 'test' to your preferred folder.
     my_config = "config.ini"
 
-    # If file doesn't exist, then create it.
-    if not os.path.isfile(my_config):
-        create_config_file()
-        logger.info("created file: %s", my_config)
+    with _config_lock:
+        # If file doesn't exist, then create it.
+        if not os.path.isfile(my_config):
+            create_config_file()
+            logger.info("created file: %s", my_config)
 
-    config = configparser.ConfigParser()
-    config.read(name)
+        config = configparser.ConfigParser()
+        config.read(name)
     if section:
         configurations = config[section]
     else:
@@ -186,22 +244,23 @@ def read_configuration_file(config_key: str | bool = False, file: str = "config.
 def save_dict_value_to_configuration_file(dict_value):
     """Read the configuration files and get back the value of the key provided"""
 
-    config, configurations = get_configuration_file()
+    with _config_lock:
+        config, configurations = get_configuration_file()
 
-    for key, value in dict_value.items():
-        configurations[key] = f"{value}"
+        for key, value in dict_value.items():
+            configurations[key] = f"{value}"
 
-    with open(file="config.ini", mode="w", encoding="utf-8") as configfile:
-        config.write(configfile)
+        _write_config(config, "config.ini")
 
 
 def _check_args(exp_args: Any, given_args: dict) -> dict:
     logger.debug(
-        "Validating args:\n expected %s vs given %s " % exp_args,
+        "Validating args:\n expected %s vs given %s ",
+        exp_args,
         list(given_args.keys()),
     )
     params = {k: v for (k, v) in given_args.items() if v and k in exp_args}
-    logger.debug("params to be used: %s" % params)
+    logger.debug("params to be used: %s", params)
     return params
 
 
@@ -214,7 +273,11 @@ class DataHandler(Protocol):
         ...
 
     @staticmethod
-    def response_builder(raw_resp: str, ext_method: Callable[[dict], Any]) -> dict:
+    def response_builder(
+        raw_resp: bytes | str,
+        ext_method: Callable[[dict], Any],
+        loads: Callable[[bytes | str], Any] = json.loads,
+    ) -> dict:
         """response_builder protocol"""
         ...
 
@@ -233,35 +296,33 @@ def prepare_request(url, uri_and_args, params) -> (str, str):
     return url_endpoint, safe_param
 
 
-def fetch_data(
+def fetch_raw_data(
     request_session,
-    url: str,
-    uri_and_args: enum.Enum,
-    params: dict,
-    data_handler_class: DataHandler,
-) -> tuple[int, dict]:
-    """Fetch will do the request to the end point provided and extract
-    the information with the extraction function
+    url_endpoint: str,
+    safe_param: str,
+    timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+) -> tuple[int, bytes | dict]:
+    """Do the request to the prepared url and return the body without parsing it
 
     Args:
             request_session (request):
-            url (str):
-            uri_and_args (enum.Enum):
-            params (dict): Parameters for the search query.
-            data_handler_class (DataHandler): class that will extract the information.
+            url_endpoint (str): full url of the endpoint, see prepare_request.
+            safe_param (str): encoded query string, see prepare_request.
+            timeout (float | tuple[float, float]): seconds to connect and between two bytes of the response, a
+                    stalled connection is given up instead of blocking the caller.
 
     Returns:
-            (tuple[int, dict]): response contain the http code and the data
+            (tuple[int, bytes | dict]): the http code and the raw body, or the error code and {"message": ""}
+                when the request failed
 
     """
-
-    url_endpoint, safe_param = prepare_request(
-        url=url, uri_and_args=uri_and_args, params=params
-    )
+    from requests import exceptions
 
     try:
 
-        map_resp = request_session.get(url=url_endpoint, params=safe_param)
+        map_resp = request_session.get(
+            url=url_endpoint, params=safe_param, timeout=timeout
+        )
         if map_resp.status_code == 414:
             raise exceptions.HTTPError(f"414 Request-URI Too Large\n{map_resp.url}")
     except exceptions.ConnectionError as connection_error:
@@ -278,12 +339,77 @@ def fetch_data(
         return 414, {"message": "error"}
     else:
         logger.debug(msg="response => %s" % map_resp.status_code)
-        raw_response = map_resp.text
-        status_code = map_resp.status_code
-        response = data_handler_class.response_builder(
-            raw_resp=raw_response, ext_method=data_handler_class.data_extraction
-        )
-        return status_code, response
+        return map_resp.status_code, map_resp.content
+
+
+def build_response(
+    status_code: int,
+    raw_response: bytes | str | dict,
+    data_handler_class: DataHandler,
+    loads: Callable[[bytes | str], Any] = json.loads,
+    metrics=None,
+    uri_and_args: enum.Enum | None = None,
+) -> tuple[int, dict]:
+    """Run the data handler on a raw body, error messages from fetch_raw_data are returned as they are
+
+    Error bodies of the API (4xx/5xx) have no data to extract, the error message of their status is returned as
+    {"message": ""} instead. With metrics (cmc_metrics.Metrics) the parse and extract times are observed under the
+    uri_and_args endpoint.
+    """
+    if isinstance(raw_response, dict):
+        return status_code, raw_response
+    if status_code >= 400:
+        try:
+            message = loads(raw_response)["status"]["error_message"]
+        except (ValueError, KeyError, TypeError):
+            message = raw_response[:200]
+        logger.error("Error %s from the API: %s", status_code, message)
+        return status_code, {"message": message}
+    ext_method = data_handler_class.data_extraction
+    if metrics is not None:
+        loads = metrics.timed(loads, uri_and_args, "parse")
+        ext_method = metrics.timed(ext_method, uri_and_args, "extract")
+    response = data_handler_class.response_builder(
+        raw_resp=raw_response,
+        ext_method=ext_method,
+        loads=loads,
+    )
+    return status_code, response
+
+
+def fetch_data(
+    request_session,
+    url: str,
+    uri_and_args: enum.Enum,
+    params: dict,
+    data_handler_class: DataHandler,
+    loads: Callable[[bytes | str], Any] = json.loads,
+) -> tuple[int, dict]:
+    """Fetch will do the request to the end point provided and extract
+    the information with the extraction function
+
+    Args:
+            request_session (request):
+            url (str):
+            uri_and_args (enum.Enum):
+            params (dict): Parameters for the search query.
+            data_handler_class (DataHandler): class that will extract the information.
+            loads (Callable[[bytes | str], Any]): json parser, see cmc_datahandler.select_json_backend.
+
+    Returns:
+            (tuple[int, dict]): response contain the http code and the data
+
+    """
+
+    url_endpoint, safe_param = prepare_request(
+        url=url, uri_and_args=uri_and_args, params=params
+    )
+    status_code, raw_response = fetch_raw_data(
+        request_session=request_session,
+        url_endpoint=url_endpoint,
+        safe_param=safe_param,
+    )
+    return build_response(status_code, raw_response, data_handler_class, loads)
 
 
 def update_configuration_file(value_to_add: dict) -> None:
@@ -0,0 +1,8 @@
+"""Make the ``cmc_api`` package importable when running the suite from the repository root"""
+
+import os
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
@@ -0,0 +1,63 @@
+"""Smoke test of benchmarks/bench_handlers.py, the suite must keep running offline"""
+
+import json
+import tempfile
+import unittest
+
+from benchmarks import bench_handlers, fixtures
+from cmc_api.cmc_datahandler import (
+    HandlerDataDict,
+    HandlerDataList,
+    HandlerDataNestedDataKey,
+    HandlerDataSingleDict,
+)
+
+
+class BenchHandlersTest(unittest.TestCase):
+    """Testing class for bench_handlers"""
+
+    def test_every_case_runs(self):
+        """Testing every handler and the request preparation are measured"""
+        results = bench_handlers.run(sizes=[10], repeat=1)
+        self.assertEqual(len(results), 2 + 2 * len(bench_handlers.HANDLER_PAYLOADS))
+        for result in results.values():
+            self.assertGreaterEqual(result["ms"], 0)
+            self.assertGreaterEqual(result["peak_mib"], 0)
+
+    def test_recorded_body_picks_its_handler(self):
+        """Testing a recorded body is measured with the handler of its shape"""
+        payloads = {
+            HandlerDataList: fixtures.make_listing(3),
+            HandlerDataDict: fixtures.make_quotes(3),
+            HandlerDataNestedDataKey: fixtures.make_nested(3),
+            HandlerDataSingleDict: fixtures.make_category(3),
+        }
+        for handler, payload in payloads.items():
+            self.assertIs(bench_handlers.handler_for(payload), handler)
+        with tempfile.NamedTemporaryFile(suffix=".json", mode="w") as file:
+            json.dump(payloads[HandlerDataDict], file)
+            file.flush()
+            results = bench_handlers.run(sizes=[], repeat=1, recorded=[file.name])
+        self.assertTrue(any("HandlerDataDict" in name for name in results))
+
+    def test_compare_flags_regressions(self):
+        """Testing a slower or bigger case is reported"""
+        baseline = {"case": {"ms": 1.0, "peak_mib": 1.0}}
+        self.assertEqual(
+            bench_handlers.compare(
+                {"case": {"ms": 1.2, "peak_mib": 1.0}}, baseline, 1.5
+            ),
+            [],
+        )
+        self.assertEqual(
+            len(
+                bench_handlers.compare(
+                    {"case": {"ms": 2.0, "peak_mib": 2.0}}, baseline, 1.5
+                )
+            ),
+            2,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
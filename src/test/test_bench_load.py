@@ -0,0 +1,82 @@
+"""Smoke test of benchmarks/bench_load.py and its mock server"""
+
+import json
+import unittest
+from urllib import request
+from urllib.error import HTTPError
+
+from benchmarks import bench_load
+from cmc_api import cmc
+from cmc_api.cmc_helper import Cryptocurrency, Fiat, Exchange, GlobalMetrics, Tools, Key
+from benchmarks.mock_server import MockCmcServer
+
+
+class BenchLoadTest(unittest.TestCase):
+    """Testing class for bench_load and MockCmcServer"""
+
+    def setUp(self):
+        self.server = MockCmcServer(coins=20).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_server_sizes_the_payload(self):
+        """Testing the mock server answers with limit coins, at most its coins"""
+        url = f"{self.server.url}/v1/cryptocurrency/listings/latest?limit=5"
+        with request.urlopen(url) as response:
+            self.assertEqual(len(json.load(response)["data"]), 5)
+        url = f"{self.server.url}/v1/cryptocurrency/listings/latest?limit=500"
+        with request.urlopen(url) as response:
+            self.assertEqual(len(json.load(response)["data"]), 20)
+        with self.assertRaises(HTTPError) as error:
+            request.urlopen(f"{self.server.url}/v1/unknown")
+        self.assertEqual(error.exception.code, 404)
+
+    def test_server_answers_every_endpoint(self):
+        """Testing every endpoint of cmc_helper is served"""
+        for group in (Cryptocurrency, Fiat, Exchange, GlobalMetrics, Tools, Key):
+            for endpoint in group:
+                with self.subTest(endpoint=endpoint.name):
+                    url = f"{self.server.url}{endpoint.value[0]}?id=1,2,3"
+                    with request.urlopen(url) as response:
+                        self.assertTrue(json.load(response)["data"])
+
+    def test_price_converter_refresh(self):
+        """Testing a PriceConverter refreshes from the fiat map, the price conversion and the listing"""
+        client = cmc.Cmc(url=self.server.url, api_key="test", startup="lazy")
+        try:
+            converter = client.get_price_converter(limit=10)
+        except ImportError:  # pragma: no cover - optional dependency
+            self.skipTest("numpy is not installed")
+        self.assertEqual(self.server.requests, 3)
+        self.assertIsNotNone(converter.convert(1, "C1", "EUR"))
+        self.assertAlmostEqual(converter.convert(1, "USD", 2781), 1.0)
+
+    def test_server_rate_limits(self):
+        """Testing rate_429 = 1 answers every request with a 429"""
+        self.server.rate_429 = 1.0
+        with self.assertRaises(HTTPError) as error:
+            request.urlopen(f"{self.server.url}/v1/key/info")
+        self.assertEqual(error.exception.code, 429)
+
+    def test_every_mode_runs(self):
+        """Testing every mode sends its requests and is summarised"""
+        for mode in bench_load.MODES:
+            self.server.requests = 0
+            result = bench_load.measure(mode, self.server.url, 6, 3, 2)
+            self.assertEqual(self.server.requests, 6)
+            self.assertEqual(result["requests"], 6)
+            self.assertEqual(result["errors"], 0)
+            self.assertGreater(result["throughput"], 0)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+
+    def test_percentile(self):
+        """Testing the nearest rank percentile"""
+        values = list(range(1, 101))
+        self.assertEqual(bench_load.percentile(values, 50), 50)
+        self.assertEqual(bench_load.percentile(values, 99), 99)
+        self.assertEqual(bench_load.percentile([3.0], 95), 3.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+"""Testing suite for cmc.py"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from cmc_api import cmc, cmc_utils
+
+KEY_INFO_BODY = json.dumps(
+    {
+        "status": {
+            "timestamp": "2022-06-04T04:26:55.117Z",
+            "credit_count": 0,
+            "error_message": None,
+        },
+        "data": {
+            "plan": {"rate_limit_minute": 30},
+            "usage": {
+                "current_day": {"credits_used": 3, "credits_left": 330},
+                "current_month": {"credits_used": 3, "credits_left": 9997},
+            },
+        },
+    }
+)
+
+
+class StartupModeTest(unittest.TestCase):
+    """Testing the construction modes of Cmc"""
+
+    def setUp(self):
+        patcher = mock.patch.object(
+            cmc_utils, "fetch_raw_data", return_value=(200, KEY_INFO_BODY)
+        )
+        self.fetch_raw_data = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        if os.path.isfile("config.ini"):
+            os.remove("config.ini")
+
+    def test_eager_requests_key_info(self):
+        """Testing the default mode keeps the current behaviour"""
+        cmc.Cmc(url="http://localhost", api_key="test")
+        self.assertEqual(self.fetch_raw_data.call_count, 1)
+        self.assertTrue(os.path.isfile("config.ini"))
+
+    def test_lazy_does_no_io(self):
+        """Testing the lazy mode does no request and no disk write, the logs are set up by the first request"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        os.mkdir(os.path.join(directory.name, "work"))
+        cwd = os.getcwd()
+        os.chdir(os.path.join(directory.name, "work"))
+        self.addCleanup(os.chdir, cwd)
+        with mock.patch.object(cmc_utils, "_logging_configured", False):
+            client = cmc.Cmc(url="http://localhost", api_key="test", startup="lazy")
+            self.fetch_raw_data.assert_not_called()
+            self.assertFalse(os.path.isfile("config.ini"))
+            # fetch_cmc_logger writes to ../logs
+            self.assertEqual(os.listdir(directory.name), ["work"])
+            with mock.patch.object(cmc_utils, "fetch_cmc_logger") as fetch_cmc_logger:
+                client.get_key_info()
+            self.assertEqual(fetch_cmc_logger.call_count, 2)
+        self.assertEqual(client.usage["current_day_left"], "33")
+
+    def test_background_refreshes_on_first_call(self):
+        """Testing the background mode refreshes the usage once, on the first call"""
+        client = cmc.Cmc(url="http://localhost", api_key="test", startup="background")
+        self.fetch_raw_data.assert_not_called()
+        client.get_key_info()
+        client._refresh_thread.join()
+        client.get_key_info()
+        # two calls and a single refresh
+        self.assertEqual(self.fetch_raw_data.call_count, 3)
+        self.assertEqual(client.usage["current_day_left"], "330")
+
+
+class MapTest(unittest.TestCase):
+    """Testing the thread pool fan-out of Cmc"""
+
+    def setUp(self):
+        patcher = mock.patch.object(
+            cmc_utils, "fetch_raw_data", side_effect=self.fake_fetch
+        )
+        self.fetch_raw_data = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = cmc.Cmc(
+            url="http://localhost", api_key="test", startup="lazy", max_workers=4
+        )
+
+    @staticmethod
+    def fake_fetch(request_session, url_endpoint, safe_param, timeout=None):
+        if "id=bad" in safe_param:
+            return 400, {"message": "Connection error"}
+        category_id = safe_param.split("id=")[1]
+        return 200, json.dumps(
+            {
+                "status": {
+                    "timestamp": "2022-06-04T04:26:55.117Z",
+                    "credit_count": 1,
+                    "error_message": None,
+                },
+                "data": {"id": category_id},
+            }
+        )
+
+    def test_pool_sized_to_workers(self):
+        """Testing the session keeps one connection per worker"""
+        adapter = self.client.request_session.get_adapter("https://localhost")
+        self.assertEqual(adapter._pool_maxsize, 4)
+
+    def test_map_returns_results_in_order(self):
+        """Testing map runs every call and keeps the order, a failed call has its own error"""
+        ids = [f"c{n}" for n in range(10)]
+        results = self.client.map(
+            [("get_category", cmc_id) for cmc_id in ids[:5]]
+            + [(self.client.get_category, "bad")]
+            + [(self.client.get_category, cmc_id) for cmc_id in ids[5:]]
+        )
+        self.assertEqual(len(results), 11)
+        self.assertFalse(results[5].ok)
+        self.assertEqual(results[5].value, {"message": "Connection error"})
+        values = [result.value["data"]["id"] for result in results if result.ok]
+        self.assertEqual(values, ids)
+        self.assertEqual(self.fetch_raw_data.call_count, 11)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Testing suite for cmc_archive.py"""
+
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from benchmarks.fixtures import listing_response
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class ColumnarArchiveTest(unittest.TestCase):
+    """Testing class for ColumnarArchive"""
+
+    def setUp(self):
+        from cmc_api.cmc_archive import ColumnarArchive
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "archive")
+        self.responses = [
+            listing_response(5, f"2022-06-0{day}T00:00:00.000Z", seed=day)
+            for day in range(1, 4)
+        ]
+        archive = ColumnarArchive(self.path)
+        for response in self.responses:
+            archive.append(response)
+        self.archive = ColumnarArchive(self.path)
+
+    def test_columns_are_mapped(self):
+        """Testing a reopened archive exposes the columns as memmap views"""
+        price = self.archive.column("price")
+        self.assertIsInstance(price, np.memmap)
+        self.assertEqual(len(self.archive), 15)
+        expected = [coin["quote"]["USD"]["price"] for coin in self.responses[1]["data"]]
+        np.testing.assert_array_equal(price[5:10], expected)
+        self.assertEqual(self.archive.strings("slugs")[7], "coin-3")
+
+    def test_view_by_time(self):
+        """Testing the rows of a time range are found by binary search"""
+        view = self.archive.view(
+            start="2022-06-02T00:00:00Z", end="2022-06-02T12:00:00Z"
+        )
+        self.assertEqual((view.start, view.stop), (5, 10))
+        self.assertEqual(
+            view.strings("symbols").to_list(), ["C1", "C2", "C3", "C4", "C5"]
+        )
+        self.assertEqual(len(self.archive.view(start="2022-06-04")), 0)
+        quotes = self.archive.view(start="2022-06-03").to_quotes()
+        self.assertEqual(
+            quotes.top(1, "market_cap").row(0)["id"],
+            int(quotes.ids[np.argmax(quotes["market_cap"])]),
+        )
+
+    def test_append_in_time_order_only(self):
+        """Testing an older snapshot is refused"""
+        with self.assertRaises(ValueError):
+            self.archive.append(self.responses[0])
+
+    def test_interrupted_append_is_ignored(self):
+        """Testing bytes written after the last committed row are not visible and get overwritten"""
+        from cmc_api.cmc_archive import ColumnarArchive
+
+        with open(os.path.join(self.path, "price.bin"), "ab") as file:
+            file.write(b"\x00" * 24)
+        archive = ColumnarArchive(self.path)
+        self.assertEqual(len(archive.column("price")), 15)
+        archive.append(listing_response(2, "2022-06-05T00:00:00.000Z"))
+        self.assertEqual(os.path.getsize(os.path.join(self.path, "price.bin")), 17 * 8)
+
+    def test_export_snapshots(self):
+        """Testing the snapshots of a SnapshotStore are exported once"""
+        from cmc_api.cmc_archive import export_snapshots
+        from cmc_api.cmc_snapshot import SnapshotStore
+
+        store = SnapshotStore(os.path.join(self.directory.name, "store"))
+        self.addCleanup(store.close)
+        for response in self.responses:
+            store.append(response)
+        path = os.path.join(self.directory.name, "exported")
+        export_snapshots(store, path)
+        archive = export_snapshots(store, path)
+        self.assertEqual(len(archive), 15)
+        np.testing.assert_array_equal(archive.column("ids"), self.archive.column("ids"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Testing suite for cmc_async.py"""
+
+import asyncio
+import json
+import unittest
+
+try:
+    from aiohttp import web
+except ImportError:  # pragma: no cover - optional dependency
+    web = None
+
+LISTING_PAYLOAD = {
+    "status": {
+        "timestamp": "2022-06-04T04:26:55.117Z",
+        "credit_count": 1,
+        "error_message": None,
+    },
+    "data": [
+        {"id": 1, "symbol": "BTC", "quote": {"USD": {"price": 30000.0}}},
+        {"id": 1027, "symbol": "ETH", "quote": {"USD": {"price": 1800.0}}},
+    ],
+}
+
+
+@unittest.skipIf(web is None, "aiohttp is not installed")
+class AsyncCmcTest(unittest.IsolatedAsyncioTestCase):
+    """Testing class for AsyncCmc against a local aiohttp server"""
+
+    async def asyncSetUp(self):
+        from cmc_api.cmc_async import AsyncCmc
+
+        self.in_flight = 0
+        self.max_seen = 0
+        self.queries = []
+
+        async def listing(request):
+            self.queries.append(dict(request.query))
+            self.in_flight += 1
+            self.max_seen = max(self.max_seen, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            return web.Response(
+                text=json.dumps(LISTING_PAYLOAD), content_type="application/json"
+            )
+
+        app = web.Application()
+        app.router.add_get("/v1/cryptocurrency/listings/latest", listing)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.cmc = AsyncCmc(
+            url=f"http://127.0.0.1:{port}", api_key="test", max_in_flight=2
+        )
+
+    async def asyncTearDown(self):
+        await self.cmc.close()
+        await self.runner.cleanup()
+
+    async def test_get_listing_matches_sync_response_shape(self):
+        """Testing AsyncCmc.get_listing() builds the response with HandlerDataList"""
+        response = await self.cmc.get_listing(start=1, limit=2)
+        self.assertEqual(response["data"], LISTING_PAYLOAD["data"])
+        self.assertEqual(response["metadata"]["list_keys"], ["id", "symbol", "quote"])
+        self.assertEqual(self.queries[0], {"start": "1", "limit": "2"})
+
+    async def test_cache_serves_repeated_calls(self):
+        """Testing a cached response is served without a new request"""
+        from cmc_api.cmc_cache import MemoryCache
+
+        self.cmc.cache = MemoryCache()
+        first = await self.cmc.get_listing(start=1, limit=2)
+        second = await self.cmc.get_listing(start=1, limit=2)
+        self.assertIs(first, second)
+        self.assertEqual(len(self.queries), 1)
+        self.assertEqual(self.cmc.cache.stats["hits"], 1)
+
+    async def test_max_in_flight(self):
+        """Testing the cap on concurrent requests"""
+        await asyncio.gather(*(self.cmc.get_listing(start, 2) for start in range(1, 7)))
+        self.assertEqual(len(self.queries), 6)
+        self.assertLessEqual(self.max_seen, 2)
+
+    async def test_stream_listing(self):
+        """Testing AsyncCmc.stream_listing() yields the coins and then the status"""
+        stream = await self.cmc.stream_listing(start=1, limit=2, chunk_size=16)
+        items = [item async for item in stream]
+        self.assertEqual(items, LISTING_PAYLOAD["data"])
+        self.assertEqual(stream.status, LISTING_PAYLOAD["status"])
+
+    async def test_identical_calls_share_one_request(self):
+        """Testing concurrent identical calls are coalesced in one request"""
+        responses = await asyncio.gather(
+            *(self.cmc.get_listing(1, 2) for _ in range(5))
+        )
+        self.assertEqual(len(self.queries), 1)
+        self.assertTrue(all(response is responses[0] for response in responses))
+        self.assertEqual(self.cmc.in_flight.shared, 4)
+        self.assertEqual(len(self.cmc.in_flight), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
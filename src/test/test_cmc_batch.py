@@ -0,0 +1,85 @@
+"""Testing suite for cmc_batch.py"""
+
+import unittest
+
+from cmc_api import cmc_batch
+from cmc_api.cmc_helper import Cryptocurrency
+
+URL = "https://pro-api.coinmarketcap.com"
+
+
+class CmcBatchTest(unittest.TestCase):
+    """Testing class for cmc_batch"""
+
+    def test_plan_batches_fits_url_limit(self):
+        """Testing every chunk fits the URL limit and the chunks cover all the ids"""
+        ids = list(range(1, 10001))
+        params = {"convert": "USD", "skip_invalid": True}
+        chunks = cmc_batch.plan_batches(
+            ids, URL, Cryptocurrency.QUOTE_LATEST, params, max_url_length=2000
+        )
+        fixed = len(
+            URL + "/v2/cryptocurrency/quotes/latest?convert=USD&skip_invalid=True&id="
+        )
+        for chunk in chunks:
+            self.assertLessEqual(fixed + len(chunk), 2000)
+        joined = ",".join(chunks).split(",")
+        self.assertEqual(joined, [str(i) for i in ids])
+        # fewest requests: total characters / room, rounded up
+        room = 2000 - fixed
+        self.assertEqual(len(chunks), -(-len(",".join(joined)) // room))
+
+    def test_split_items_drops_duplicates(self):
+        """Testing ids given as string are normalised"""
+        self.assertEqual(cmc_batch.split_items("1, 2,,1,3"), ["1", "2", "3"])
+
+    def test_merge_responses(self):
+        """Testing data and metadata of the chunks are merged"""
+        first = {
+            "metadata": {
+                "timestamp": "2022-06-04T04:26:55.117Z",
+                "credit_count": 1,
+                "error_message": None,
+                "list_keys": ["1"],
+            },
+            "data": {"1": {"id": 1}},
+        }
+        second = {
+            "metadata": {
+                "timestamp": "2022-06-04T04:26:56.000Z",
+                "credit_count": 2,
+                "error_message": None,
+                "list_keys": ["2"],
+            },
+            "data": {"2": {"id": 2}},
+        }
+        merged = cmc_batch.merge_responses(
+            [(200, first), (200, second), (400, {"message": "Timeout"})]
+        )
+        self.assertEqual(set(merged["data"]), {"1", "2"})
+        self.assertEqual(merged["metadata"]["credit_count"], 3)
+        self.assertEqual(merged["metadata"]["timestamp"], "2022-06-04T04:26:56.000Z")
+        self.assertEqual(
+            merged["metadata"]["timestamp_earliest"], "2022-06-04T04:26:55.117Z"
+        )
+        self.assertEqual(merged["metadata"]["error_message"], "400: Timeout")
+        self.assertEqual(merged["metadata"]["batches"], 3)
+
+    def test_map_calls_keeps_order_and_errors(self):
+        """Testing map_calls returns one result per call, in order, with the errors of the failed calls"""
+
+        def fail(_):
+            raise ValueError("boom")
+
+        calls = [(str, 1), (fail, 2), lambda: {"message": "Timeout"}, (str, 4)]
+        results = cmc_batch.map_calls(calls, max_workers=3)
+        self.assertEqual([result.ok for result in results], [True, False, False, True])
+        self.assertEqual(results[0].value, "1")
+        self.assertEqual(results[3].result(), "4")
+        self.assertIsInstance(results[1].error, ValueError)
+        with self.assertRaises(ValueError):
+            results[1].result()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+"""Testing suite for cmc_cache.py"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from cmc_api import cmc_cache
+from cmc_api.cmc_datahandler import HandlerDataList
+from cmc_api.cmc_helper import Cryptocurrency, Fiat, Key
+
+URL = "https://pro-api.coinmarketcap.com"
+
+
+class MemoryCacheTest(unittest.TestCase):
+    """Testing class for MemoryCache"""
+
+    def setUp(self):
+        self.cache = cmc_cache.MemoryCache(max_entries=2)
+
+    def key(self, start):
+        return cmc_cache.make_key(
+            URL, Cryptocurrency.LATEST_LIST_PRICE, {"start": start}, HandlerDataList
+        )
+
+    def test_make_key_uses_prepared_request(self):
+        """Testing the key is built from prepare_request"""
+        self.assertEqual(
+            self.key(1),
+            (URL + "/v1/cryptocurrency/listings/latest", "start=1", "HandlerDataList"),
+        )
+
+    def test_hit_and_miss_counters(self):
+        """Testing the counters"""
+        self.assertIsNone(self.cache.get(self.key(1)))
+        self.cache.put(self.key(1), Cryptocurrency.LATEST_LIST_PRICE, {"data": []})
+        self.assertEqual(self.cache.get(self.key(1)), {"data": []})
+        self.assertEqual(self.cache.stats["hits"], 1)
+        self.assertEqual(self.cache.stats["misses"], 1)
+
+    def test_ttl_expiry(self):
+        """Testing entries expire after the endpoint ttl"""
+        with mock.patch.object(cmc_cache.time, "monotonic", return_value=100.0):
+            self.cache.put(self.key(1), Cryptocurrency.LATEST_LIST_PRICE, {})
+        with mock.patch.object(cmc_cache.time, "monotonic", return_value=159.0):
+            self.assertIsNotNone(self.cache.get(self.key(1)))
+        with mock.patch.object(cmc_cache.time, "monotonic", return_value=161.0):
+            self.assertIsNone(self.cache.get(self.key(1)))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_lru_eviction(self):
+        """Testing the least recently used entry is evicted"""
+        for start in (1, 2):
+            self.cache.put(self.key(start), Cryptocurrency.LATEST_LIST_PRICE, {})
+        self.cache.get(self.key(1))
+        self.cache.put(self.key(3), Cryptocurrency.LATEST_LIST_PRICE, {})
+        self.assertIsNone(self.cache.get(self.key(2)))
+        self.assertIsNotNone(self.cache.get(self.key(1)))
+        self.assertEqual(self.cache.stats["evictions"], 1)
+
+    def test_key_info_is_never_cached(self):
+        """Testing endpoints with ttl 0 are not stored"""
+        key = cmc_cache.make_key(URL, Key.KEY_INFO, {}, HandlerDataList)
+        self.cache.put(key, Key.KEY_INFO, {})
+        self.assertEqual(len(self.cache), 0)
+
+
+class SqliteCacheTest(unittest.TestCase):
+    """Testing class for SqliteCache"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.sqlite")
+        self.cache = cmc_cache.SqliteCache(path=self.path)
+        self.key = self.cache.make_key(URL + "/v1/fiat/map", "include_metals=True")
+        self.calls = []
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def fetch_raw(self):
+        self.calls.append(1)
+        return 200, '{"status": {}, "data": []}'
+
+    def test_body_is_shared_between_instances(self):
+        """Testing a second client (another process) reads the stored body"""
+        self.cache.fetch(self.key, Fiat.FIAT, self.fetch_raw)
+        other = cmc_cache.SqliteCache(path=self.path)
+        status_code, body = other.fetch(self.key, Fiat.FIAT, self.fetch_raw)
+        self.assertEqual((status_code, body), (200, '{"status": {}, "data": []}'))
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(other.stats["hits"], 1)
+
+    def test_stale_body_served_while_other_process_refreshes(self):
+        """Testing only the lease owner refreshes a stale entry"""
+        self.cache.put(self.key, Fiat.FIAT, "stale")
+        other = cmc_cache.SqliteCache(path=self.path, ttls={Fiat.FIAT: 1})
+        with mock.patch.object(cmc_cache.time, "time", return_value=10**10):
+            self.assertTrue(self.cache.acquire_lease(self.key))
+            status_code, body = other.fetch(self.key, Fiat.FIAT, self.fetch_raw)
+        self.assertEqual((status_code, body), (200, "stale"))
+        self.assertEqual(self.calls, [])
+
+    def test_body_stored_by_previous_lease_owner_is_used(self):
+        """Testing the body stored while waiting for the lease is returned instead of fetched again"""
+        other = cmc_cache.SqliteCache(path=self.path)
+        self.assertTrue(other.acquire_lease(self.key))
+        acquire_lease = self.cache.acquire_lease
+        polls = []
+
+        def poll(key):
+            polls.append(key)
+            if len(polls) == 2:
+                # the other process stores the body and gives the lease back just before the second poll
+                other.put(key, Fiat.FIAT, "fresh")
+                other.release_lease(key)
+            return acquire_lease(key)
+
+        with mock.patch.object(self.cache, "acquire_lease", side_effect=poll):
+            status_code, body = self.cache.fetch(
+                self.key, Fiat.FIAT, self.fetch_raw, poll_interval=0
+            )
+        self.assertEqual(len(polls), 2)
+        self.assertEqual((status_code, body), (200, "fresh"))
+        self.assertEqual(self.calls, [])
+
+    def test_errors_are_not_stored(self):
+        """Testing failed requests are not cached"""
+        self.cache.fetch(self.key, Fiat.FIAT, lambda: (400, {"message": "Timeout"}))
+        self.assertIsNone(self.cache.get(self.key, Fiat.FIAT))
+        self.assertEqual(self.cache.stats["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
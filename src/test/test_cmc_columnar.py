@@ -0,0 +1,115 @@
+"""Testing suite for cmc_columnar.py"""
+
+import json
+import unittest
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+LISTING_BODY = json.dumps(
+    {
+        "status": {
+            "timestamp": "2022-06-04T04:26:55.117Z",
+            "credit_count": 1,
+            "error_message": None,
+        },
+        "data": [
+            {
+                "id": 1,
+                "symbol": "BTC",
+                "slug": "bitcoin",
+                "name": "Bitcoin",
+                "cmc_rank": 1,
+                "quote": {
+                    "USD": {
+                        "price": 30000.0,
+                        "market_cap": 5.7e11,
+                        "volume_24h": 2.1e10,
+                        "percent_change_24h": 1.5,
+                        "last_updated": "2022-06-04T04:25:00.000Z",
+                    }
+                },
+            },
+            {
+                "id": 1027,
+                "symbol": "ETH",
+                "slug": "ethereum",
+                "name": "Ethereum",
+                "cmc_rank": 2,
+                "quote": {
+                    "USD": {
+                        "price": 1800.0,
+                        "market_cap": 2.2e11,
+                        "volume_24h": 1.1e10,
+                        "percent_change_24h": -2.0,
+                        "last_updated": "2022-06-04T04:25:00.000Z",
+                    }
+                },
+            },
+            {
+                "id": 99999,
+                "symbol": "NEW",
+                "slug": "new-coin",
+                "name": "New Coin",
+                "cmc_rank": None,
+                "quote": {"USD": {"price": 0.5, "market_cap": None}},
+            },
+        ],
+    }
+)
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class HandlerColumnarTest(unittest.TestCase):
+    """Testing class for HandlerColumnar"""
+
+    def setUp(self):
+        from cmc_api.cmc_columnar import HandlerColumnar
+
+        self.response = HandlerColumnar.response_builder(
+            LISTING_BODY, HandlerColumnar.data_extraction
+        )
+        self.quotes = self.response["data"]
+
+    def test_columns(self):
+        """Testing the listing is flattened into arrays"""
+        self.assertEqual(self.quotes.convert, "USD")
+        np.testing.assert_array_equal(self.quotes.ids, [1, 1027, 99999])
+        np.testing.assert_array_equal(self.quotes.cmc_rank, [1, 2, -1])
+        np.testing.assert_array_equal(self.quotes["price"], [30000.0, 1800.0, 0.5])
+        self.assertTrue(np.isnan(self.quotes["market_cap"][2]))
+        self.assertTrue(np.isnat(self.quotes.last_updated[2]))
+        self.assertEqual(list(self.quotes.symbols.decode()), ["BTC", "ETH", "NEW"])
+        self.assertEqual(self.response["metadata"]["credit_count"], 1)
+
+    def test_filter_sort_top(self):
+        """Testing the vectorized screening helpers"""
+        gainers = self.quotes.filter(self.quotes["percent_change_24h"] > 0)
+        self.assertEqual(list(gainers.ids), [1])
+        cheapest = self.quotes.sort_by("price", descending=False)
+        self.assertEqual(list(cheapest.ids), [99999, 1027, 1])
+        top = self.quotes.top(2, "market_cap")
+        self.assertEqual(list(top.ids), [1, 1027])
+        self.assertEqual(top.row(1)["symbol"], "ETH")
+        self.assertEqual(list(self.quotes.symbols.equals("ETH")), [False, True, False])
+
+    def test_quotes_by_id_and_configure(self):
+        """Testing quotes/latest data and another convert currency"""
+        from cmc_api.cmc_columnar import HandlerColumnar
+
+        payload = json.loads(LISTING_BODY)
+        for coin in payload["data"]:
+            coin["quote"]["EUR"] = {"price": 1.0}
+        payload["data"] = {str(coin["id"]): coin for coin in payload["data"]}
+        handler = HandlerColumnar.configure(convert="EUR", fields=("price",))
+        _, quotes = handler.data_extraction(payload)
+        self.assertEqual(quotes.convert, "EUR")
+        self.assertEqual(list(quotes.columns), ["price"])
+        np.testing.assert_array_equal(quotes["price"], [1.0, 1.0, 1.0])
+        self.assertNotEqual(handler.__name__, HandlerColumnar.__name__)
+
+
+if __name__ == "__main__":
+    unittest.main()
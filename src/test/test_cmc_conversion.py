@@ -0,0 +1,151 @@
+"""Testing suite for cmc_conversion.py"""
+
+import unittest
+from unittest import mock
+
+from benchmarks import fixtures
+from cmc_api import cmc
+from cmc_api.cmc_snapshot import to_epoch
+
+try:
+    import numpy as np
+
+    from cmc_api.cmc_conversion import USD_ID, PriceConverter
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+NOW = to_epoch(fixtures.TIMESTAMP) + 60
+
+FIAT_MAP = {
+    "data": [
+        {"id": 2781, "name": "United States Dollar", "sign": "$", "symbol": "USD"},
+        {"id": 2790, "name": "Euro", "sign": "€", "symbol": "EUR"},
+    ]
+}
+USD_TO_EUR = {
+    "data": {
+        "id": 2781,
+        "symbol": "USD",
+        "amount": 1,
+        "quote": {"EUR": {"price": 0.8, "last_updated": fixtures.TIMESTAMP}},
+    }
+}
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class PriceConverterTest(unittest.TestCase):
+    """Testing class for PriceConverter"""
+
+    def setUp(self):
+        self.listing = fixtures.make_listing(5)
+        self.prices = {
+            coin["id"]: coin["quote"]["USD"]["price"] for coin in self.listing["data"]
+        }
+        self.converter = PriceConverter(clock=lambda: NOW)
+        self.converter.merge_quotes(self.listing)
+
+    def test_cross_rates(self):
+        """Testing the rate of a pair is the ratio of the USD prices, by id or symbol"""
+        self.assertAlmostEqual(
+            self.converter.rate(1, 2), self.prices[1] / self.prices[2]
+        )
+        self.assertAlmostEqual(self.converter.rate("c1", "USD"), self.prices[1])
+        self.assertAlmostEqual(
+            self.converter.convert(2, "C3", 2781), 2 * self.prices[3]
+        )
+        self.assertIsNone(self.converter.rate(1, "EUR"))
+        self.assertEqual(self.converter.age(1), 60)
+        self.assertEqual(self.converter.age("USD"), 0)
+
+    def test_convert_batch(self):
+        """Testing a batch gives nan and an infinite age for unknown currencies and old rates"""
+        values, ages = self.converter.convert_batch(
+            [1.0, 2.0, 3.0, 4.0], [1, "C2", "XYZ", 5], "USD"
+        )
+        np.testing.assert_allclose(
+            values[[0, 1, 3]], [self.prices[1], 2 * self.prices[2], 4 * self.prices[5]]
+        )
+        self.assertTrue(np.isnan(values[2]))
+        self.assertEqual(list(ages), [60, 60, np.inf, 60])
+        values, _ = self.converter.convert_batch([1.0], [1], [2], max_age=30)
+        self.assertTrue(np.isnan(values[0]))
+
+    def test_fiats(self):
+        """Testing fiat rates from a price conversion and from a quote in two currencies"""
+        self.converter.merge_fiat_map(FIAT_MAP)
+        self.converter.merge_conversion(USD_TO_EUR)
+        self.assertAlmostEqual(self.converter.rate("USD", "EUR"), 0.8)
+        self.assertAlmostEqual(self.converter.rate(1, 2790), self.prices[1] * 0.8)
+        coin = fixtures.make_coin(7, fixtures.random.Random(1))
+        coin["quote"]["GBP"] = {
+            "price": coin["quote"]["USD"]["price"] / 1.25,
+            "last_updated": fixtures.TIMESTAMP,
+        }
+        self.converter.merge_quotes({"data": [coin]})
+        self.assertAlmostEqual(self.converter.rate("GBP", "USD"), 1.25)
+        self.converter.merge_fiat_map({"data": [{"id": 2791, "symbol": "GBP"}]})
+        self.assertAlmostEqual(self.converter.rate(2791, "USD"), 1.25)
+
+    def test_symbol_precedence(self):
+        """Testing a symbol means the best ranked coin, and the fiat over any coin"""
+        rng = fixtures.random.Random(2)
+        rival = fixtures.make_coin(99, rng)
+        rival["symbol"] = "C1"
+        self.converter.merge_quotes({"data": [rival]})
+        self.assertAlmostEqual(self.converter.rate("C1", "USD"), self.prices[1])
+        euro_coin = fixtures.make_coin(100, rng)
+        euro_coin.update(symbol="EUR", cmc_rank=1)
+        self.converter.merge_quotes({"data": [euro_coin]})
+        self.converter.merge_fiat_map(FIAT_MAP)
+        self.converter.merge_conversion(USD_TO_EUR)
+        self.assertAlmostEqual(self.converter.rate("EUR", "USD"), 1.25)
+
+    def test_matrix(self):
+        """Testing the cross-rate matrix"""
+        matrix = self.converter.matrix([1, 2, "USD", "XYZ"])
+        self.assertEqual(matrix.shape, (4, 4))
+        self.assertAlmostEqual(matrix[0, 1], self.prices[1] / self.prices[2])
+        self.assertAlmostEqual(matrix[2, 0], 1 / self.prices[1])
+        np.testing.assert_allclose(np.diag(matrix)[:3], 1.0)
+        self.assertTrue(np.isnan(matrix[3]).all())
+
+    def test_rates_grow(self):
+        """Testing more currencies than the initial arrays hold"""
+        self.converter.merge_quotes(fixtures.make_listing(600))
+        self.assertEqual(len(self.converter), 601)
+        self.assertIn(600, self.converter)
+
+    def test_historical_conversion(self):
+        """Testing a conversion at a time is requested from the API"""
+        client = mock.Mock()
+        client.get_price_conversion.return_value = {
+            "data": {"id": 1, "quote": {"EUR": {"price": 123.0}}}
+        }
+        self.converter.client = client
+        self.assertEqual(
+            self.converter.convert(2, 1, "EUR", at="2021-01-01T00:00:00Z"), 123.0
+        )
+        client.get_price_conversion.assert_called_once_with(
+            2, "1", time="2021-01-01T00:00:00Z", convert="EUR"
+        )
+        client.get_price_conversion.return_value = {"message": "Timeout"}
+        self.assertIsNone(self.converter.convert(2, 1, 2790, at=1609459200))
+
+    def test_client_builds_converter(self):
+        """Testing Cmc.get_price_converter merges the fiat map, the fiat rates and the listing"""
+        client = cmc.Cmc(url="http://localhost", api_key="test", startup="lazy")
+        with mock.patch.object(
+            client, "get_fiat", return_value=FIAT_MAP
+        ), mock.patch.object(
+            client, "get_price_conversion", return_value=USD_TO_EUR
+        ) as conversion, mock.patch.object(
+            client, "get_listing", return_value=self.listing
+        ) as listing:
+            converter = client.get_price_converter(limit=5, fiats="EUR")
+        conversion.assert_called_once_with(1, str(USD_ID), convert="EUR")
+        listing.assert_called_once_with(1, 5)
+        self.assertAlmostEqual(converter.rate("C1", "EUR"), self.prices[1] * 0.8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Testing suite for cmc_datahandler.py"""
+
+import json
+import unittest
+
+from cmc_api import cmc_datahandler
+from cmc_api.cmc_datahandler import HandlerDataList, HandlerRecords
+
+LISTING_BODY = json.dumps(
+    {
+        "status": {
+            "timestamp": "2022-06-04T04:26:55.117Z",
+            "credit_count": 1,
+            "error_message": None,
+        },
+        "data": [{"id": 1, "symbol": "BTC"}, {"id": 1027, "symbol": "ETH"}],
+    }
+).encode("utf-8")
+
+
+class JsonBackendTest(unittest.TestCase):
+    """Testing the selection of the json backend"""
+
+    def test_stdlib_backend(self):
+        """Testing the stdlib backend is json.loads"""
+        self.assertIs(cmc_datahandler.select_json_backend("json"), json.loads)
+
+    def test_unknown_backend(self):
+        """Testing an unknown name is refused"""
+        with self.assertRaises(ValueError):
+            cmc_datahandler.select_json_backend("yaml")
+
+    def test_every_installed_backend_builds_the_same_response(self):
+        """Testing the response does not depend on the backend"""
+        expected = HandlerDataList.response_builder(
+            LISTING_BODY.decode("utf-8"), HandlerDataList.data_extraction
+        )
+        for name in cmc_datahandler.JSON_BACKENDS + ("auto",):
+            try:
+                loads = cmc_datahandler.select_json_backend(name)
+            except ImportError:
+                continue
+            with self.subTest(backend=name):
+                response = HandlerDataList.response_builder(
+                    LISTING_BODY, HandlerDataList.data_extraction, loads
+                )
+                self.assertEqual(response, expected)
+
+
+class HandlerRecordsTest(unittest.TestCase):
+    """Testing class for HandlerRecords"""
+
+    def test_map_records(self):
+        """Testing map entries become MapRecord with interned symbols"""
+        payload = json.loads(LISTING_BODY)
+        _, data = HandlerRecords.data_extraction(payload)
+        self.assertIsInstance(data[0], cmc_datahandler.MapRecord)
+        self.assertEqual([coin.symbol for coin in data], ["BTC", "ETH"])
+        self.assertIs(data[0].symbol, "BTC")
+        self.assertFalse(hasattr(data[0], "__dict__"))
+
+    def test_quote_records_keep_the_data_shape(self):
+        """Testing quotes/latest by id and by symbol"""
+        coin = {
+            "id": 1,
+            "symbol": "BTC",
+            "slug": "bitcoin",
+            "cmc_rank": 1,
+            "quote": {"USD": {"price": 30000, "market_cap": None}, "EUR": {"price": 1}},
+        }
+        payload = json.loads(LISTING_BODY)
+        payload["data"] = {"1": coin}
+        metadata, data = HandlerRecords.data_extraction(payload)
+        self.assertEqual(data["1"].convert, "USD")
+        self.assertEqual(data["1"].price, 30000.0)
+        self.assertIsNone(data["1"].market_cap)
+        self.assertIn("price", metadata["list_keys"])
+
+        payload["data"] = {"BTC": [coin]}
+        _, data = HandlerRecords.configure(convert="EUR").data_extraction(payload)
+        self.assertEqual(data["BTC"][0].price, 1.0)
+        self.assertEqual(data["BTC"][0].to_dict()["slug"], "bitcoin")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,335 @@
+"""Testing suite for cmc_http.py"""
+
+import asyncio
+import ssl
+import sys
+import types
+import unittest
+from unittest import mock
+
+from benchmarks import fixtures
+from benchmarks.mock_server import MockCmcServer
+from cmc_api import cmc, cmc_http
+from cmc_api.cmc_async import AsyncCmc
+from cmc_api.cmc_helper import get_headers
+
+
+class HttpConfigTest(unittest.TestCase):
+    """Testing class for HttpConfig and the sessions it builds"""
+
+    def test_headers(self):
+        """Testing the API gets Accept, the compression and keep-alive headers"""
+        self.assertEqual(get_headers("key")["Accept"], "application/json")
+        self.assertEqual(cmc_http.HttpConfig().headers(), {})
+        self.assertEqual(
+            cmc_http.HttpConfig(compression="identity", keep_alive=False).headers(),
+            {"Accept-Encoding": "identity", "Connection": "close"},
+        )
+
+    def test_validation(self):
+        """Testing an unknown compression or a missing library is refused"""
+        with self.assertRaises(ValueError):
+            cmc_http.HttpConfig(compression="zip")
+        if not cmc_http._installed("brotli"):
+            with self.assertRaises(ImportError):
+                cmc_http.HttpConfig(compression="br")
+        if not cmc_http._installed("httpx", "h2"):
+            with self.assertRaises(ImportError):
+                cmc_http.HttpConfig(http2=True)
+
+    def test_session_pool(self):
+        """Testing the pool size, blocking and TLS context of the requests session"""
+        context = ssl.create_default_context()
+        config = cmc_http.HttpConfig(pool_block=True, ssl_context=context)
+        session = config.session(pool_maxsize=7)
+        adapter = session.get_adapter("https://pro-api.coinmarketcap.com")
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertTrue(adapter._pool_block)
+        self.assertIs(adapter.poolmanager.connection_pool_kw["ssl_context"], context)
+        client = cmc.Cmc(
+            url="http://localhost",
+            api_key="test",
+            startup="lazy",
+            max_workers=3,
+            http_config=cmc_http.HttpConfig(pool_maxsize=5),
+        )
+        adapter = client.request_session.get_adapter("http://localhost")
+        self.assertEqual(adapter._pool_maxsize, 5)
+        self.assertEqual(client.request_session.headers["X-CMC_PRO_API_KEY"], "test")
+
+    def test_connector_kwargs(self):
+        """Testing the aiohttp connector closes the connections without keep-alive"""
+        self.assertEqual(
+            cmc_http.HttpConfig().connector_kwargs(10, 30.0),
+            {"limit": 10, "keepalive_timeout": 30.0},
+        )
+        self.assertEqual(
+            cmc_http.HttpConfig(keep_alive=False, pool_maxsize=4).connector_kwargs(
+                10, 30.0
+            ),
+            {"limit": 4, "force_close": True},
+        )
+
+
+class HttpConfigServerTest(unittest.TestCase):
+    """Testing the settings against the mock server"""
+
+    def setUp(self):
+        self.server = MockCmcServer(coins=200).start()
+        self.addCleanup(self.server.stop)
+
+    def fetch(self, config: cmc_http.HttpConfig, calls: int = 3) -> dict:
+        client = cmc.Cmc(
+            url=self.server.url,
+            api_key="test",
+            startup="lazy",
+            single_flight=False,
+            http_config=config,
+        )
+        before = self.server.stats()
+        for start in range(1, calls + 1):
+            self.assertEqual(len(client.get_listing(start, 200)["data"]), 200)
+        after = self.server.stats()
+        return {name: after[name] - before[name] for name in after}
+
+    def test_compression(self):
+        """Testing gzip sends fewer bytes than identity for the same data"""
+        identity = self.fetch(cmc_http.HttpConfig(compression="identity"))
+        gzip = self.fetch(cmc_http.HttpConfig(compression="gzip"))
+        self.assertLess(gzip["bytes_sent"] * 3, identity["bytes_sent"])
+
+    def test_keep_alive(self):
+        """Testing keep-alive reuses one connection and its absence opens one per request"""
+        self.assertEqual(self.fetch(cmc_http.HttpConfig())["connections"], 1)
+        self.assertEqual(
+            self.fetch(cmc_http.HttpConfig(keep_alive=False))["connections"], 3
+        )
+
+    def test_async_client(self):
+        """Testing AsyncCmc uses the compression and keep-alive settings"""
+
+        async def fetch():
+            client = AsyncCmc(
+                url=self.server.url,
+                api_key="test",
+                single_flight=False,
+                http_config=cmc_http.HttpConfig(compression="gzip", keep_alive=False),
+            )
+            try:
+                responses = await asyncio.gather(
+                    *(client.get_listing(start, 200) for start in range(1, 4))
+                )
+            finally:
+                await client.close()
+            return [len(response["data"]) for response in responses]
+
+        before = self.server.stats()
+        self.assertEqual(asyncio.run(fetch()), [200, 200, 200])
+        self.assertEqual(self.server.stats()["connections"] - before["connections"], 3)
+
+
+class FakeHttpxResponse:
+    """httpx.Response stand-in, error is raised by the iteration once the body is sent"""
+
+    def __init__(self, status_code: int, body: bytes, error: Exception | None = None):
+        self.status_code = status_code
+        self.url = "https://localhost/v1/cryptocurrency/listings/latest"
+        self.body = body
+        self.error = error
+        self.closed = False
+
+    async def aread(self) -> bytes:
+        return self.body
+
+    async def aiter_bytes(self, chunk_size: int):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start : start + chunk_size]
+        if self.error is not None:
+            raise self.error
+
+    async def aclose(self) -> None:
+        await asyncio.sleep(0)
+        self.closed = True
+
+
+def fake_httpx(answers: list) -> types.ModuleType:
+    """httpx stand-in whose clients send the answers in order, an exception in answers is raised by send"""
+    httpx = types.ModuleType("httpx")
+
+    class TransportError(Exception):
+        pass
+
+    class TimeoutException(TransportError):
+        pass
+
+    class AsyncClient:
+        def __init__(self, **kwargs):
+            self.kwargs = kwargs
+            self.requests = []
+            self.is_closed = False
+
+        def build_request(self, method, url, params=None, headers=None, timeout=None):
+            self.requests.append((method, url, headers))
+            return url
+
+        async def send(self, request, stream=False):
+            answer = answers.pop(0)
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+
+        async def aclose(self) -> None:
+            self.is_closed = True
+
+    httpx.TransportError = TransportError
+    httpx.TimeoutException = TimeoutException
+    httpx.AsyncClient = AsyncClient
+    httpx.Timeout = lambda read, connect=None: (connect, read)
+    httpx.Limits = lambda **kwargs: kwargs
+    return httpx
+
+
+class Http2SessionTest(unittest.TestCase):
+    """Testing the HTTP/2 sessions with a stand-in httpx"""
+
+    def setUp(self):
+        self.answers = []
+        self.httpx = fake_httpx(self.answers)
+        for patcher in (
+            mock.patch.dict(sys.modules, {"httpx": self.httpx}),
+            mock.patch.object(cmc_http, "_installed", return_value=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.config = cmc_http.HttpConfig(compression="gzip", http2=True)
+
+    def test_sync_client(self):
+        """Testing Cmc gets its responses and its errors through Http2Session"""
+        body = fixtures.make_listing_bytes(3)
+        response = FakeHttpxResponse(200, body)
+        self.answers.extend(
+            [
+                response,
+                self.httpx.TimeoutException("read timeout"),
+                self.httpx.TransportError("connection reset"),
+            ]
+        )
+        client = cmc.Cmc(
+            url="https://localhost",
+            api_key="test",
+            startup="lazy",
+            single_flight=False,
+            http_config=self.config,
+        )
+        session = client.request_session
+        self.assertIsInstance(session, cmc_http.Http2Session)
+        self.assertTrue(session.client.kwargs["http2"])
+        self.assertEqual(len(client.get_listing(1, 3)["data"]), 3)
+        self.assertTrue(response.closed)
+        method, url, headers = session.client.requests[0]
+        self.assertEqual(
+            (method, url),
+            (
+                "GET",
+                "https://localhost/v1/cryptocurrency/listings/latest?start=1&limit=3",
+            ),
+        )
+        self.assertEqual(headers["X-CMC_PRO_API_KEY"], "test")
+        self.assertEqual(headers["Accept-Encoding"], "gzip")
+        self.assertEqual(client.get_listing(1, 4), {"message": "Timeout"})
+        self.assertEqual(client.get_listing(1, 5), {"message": "Connection error"})
+        session.close()
+        self.assertTrue(session.client.is_closed)
+        self.assertFalse(session._loop._thread.is_alive())
+
+    def test_sync_client_close(self):
+        """Testing closing Cmc, or leaving its with block, stops the HTTP/2 loop thread"""
+        with cmc.Cmc(
+            url="https://localhost",
+            api_key="test",
+            startup="lazy",
+            http_config=self.config,
+        ) as client:
+            session = client.request_session
+            self.assertTrue(session._loop._thread.is_alive())
+        self.assertTrue(session.client.is_closed)
+        self.assertFalse(session._loop._thread.is_alive())
+        client.close()
+
+    def test_sync_stream(self):
+        """Testing a streamed response stays open, is read in chunks and maps the errors of the iteration"""
+        from requests import exceptions
+
+        session = self.config.session(pool_maxsize=4)
+        self.addCleanup(session.close)
+        self.answers.extend(
+            [
+                FakeHttpxResponse(200, b"0123456789"),
+                FakeHttpxResponse(
+                    200, b"0123", error=self.httpx.TransportError("reset")
+                ),
+                FakeHttpxResponse(200, b"", error=self.httpx.TimeoutException("slow")),
+            ]
+        )
+        response = session.get("https://localhost/v1/x", "a=1", stream=True)
+        self.assertFalse(response._response.closed)
+        self.assertEqual(list(response.iter_content(4)), [b"0123", b"4567", b"89"])
+        response.close()
+        self.assertTrue(response._response.closed)
+        response = session.get("https://localhost/v1/x", stream=True)
+        with self.assertRaises(exceptions.ConnectionError):
+            list(response.iter_content(4))
+        response = session.get("https://localhost/v1/x", stream=True)
+        with self.assertRaises(exceptions.ReadTimeout):
+            list(response.iter_content(4))
+
+    def test_async_client(self):
+        """Testing AsyncCmc gets its responses, its errors and its streams through AsyncHttp2Session"""
+        streamed = FakeHttpxResponse(200, fixtures.make_listing_bytes(3))
+        # its body is read at once and the response released, the session awaits the release when it closes
+        missing = FakeHttpxResponse(404, b'{"status": {"error_message": "missing"}}')
+        self.answers.extend(
+            [
+                FakeHttpxResponse(200, fixtures.make_listing_bytes(3)),
+                self.httpx.TimeoutException("read timeout"),
+                self.httpx.TransportError("connection reset"),
+                streamed,
+                missing,
+            ]
+        )
+
+        async def fetch():
+            client = AsyncCmc(
+                url="https://localhost",
+                api_key="test",
+                single_flight=False,
+                http_config=self.config,
+            )
+            try:
+                responses = [await client.get_listing(1, 3)]
+                responses.append(await client.get_listing(1, 4))
+                responses.append(await client.get_listing(1, 5))
+                stream = await client.stream_listing(1, 3)
+                responses.append([coin["id"] async for coin in stream])
+                responses.append(await client.stream_listing(1, 6))
+                session = client.request_session
+                self.assertIsInstance(session, cmc_http.AsyncHttp2Session)
+            finally:
+                await client.close()
+            self.assertTrue(session.closed)
+            self.assertEqual(session._closing, set())
+            return responses
+
+        responses = asyncio.run(fetch())
+        self.assertEqual(len(responses[0]["data"]), 3)
+        self.assertEqual(
+            responses[1:3], [{"message": "Timeout"}, {"message": "Connection error"}]
+        )
+        self.assertEqual(responses[3], [1, 2, 3])
+        self.assertEqual(responses[4], {"message": "missing"})
+        self.assertTrue(streamed.closed)
+        self.assertTrue(missing.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""Testing suite for cmc_index.py"""
+
+import os
+import tempfile
+import unittest
+
+from cmc_api.cmc_index import CmcIdIndex
+
+MAP_DATA = [
+    {"id": 1, "rank": 1, "symbol": "BTC", "slug": "bitcoin", "is_active": 1},
+    {"id": 1027, "rank": 2, "symbol": "ETH", "slug": "ethereum", "is_active": 1},
+    {"id": 9000, "rank": 900, "symbol": "BTC", "slug": "bitcoin-copy", "is_active": 0},
+    {
+        "id": 825,
+        "rank": 3,
+        "symbol": "USDT",
+        "slug": "tether",
+        "is_active": 1,
+        "platform": {
+            "id": 1027,
+            "token_address": "0xdac17f958d2ee523a2206206994597c13d831ec7",
+        },
+    },
+]
+
+
+class CmcIdIndexTest(unittest.TestCase):
+    """Testing class for CmcIdIndex"""
+
+    def setUp(self):
+        self.index = CmcIdIndex({"data": MAP_DATA})
+
+    def test_lookups(self):
+        """Testing the lookups by id, slug and symbol"""
+        self.assertEqual(self.index.get("1027").slug, "ethereum")
+        self.assertEqual(self.index.id_for_slug("Bitcoin"), 1)
+        self.assertEqual(self.index.ids_for_symbol("btc"), [1, 9000])
+        self.assertEqual(self.index.ids_for_symbol("BTC", active=True), [1])
+        self.assertEqual(self.index.ids_for_symbol("BTC", active=False), [9000])
+        self.assertEqual(self.index.ids_string(active=True), "1,1027,825")
+        self.assertIsNone(self.index.get(5))
+
+    def test_merge_updates_in_place(self):
+        """Testing a new page updates the changed entries and unlinks the old symbol"""
+        changed = self.index.merge(
+            [
+                {
+                    "id": 1027,
+                    "rank": 2,
+                    "symbol": "ETH",
+                    "slug": "ethereum",
+                    "is_active": 1,
+                },
+                {
+                    "id": 9000,
+                    "rank": 900,
+                    "symbol": "BTCX",
+                    "slug": "bitcoin-copy",
+                    "is_active": 0,
+                },
+                {"id": 52, "rank": 7, "symbol": "XRP", "slug": "xrp", "is_active": 1},
+            ]
+        )
+        self.assertEqual(changed, 2)
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(self.index.ids_for_symbol("BTC"), [1])
+        self.assertEqual(self.index.ids_for_symbol("BTCX"), [9000])
+        self.assertTrue(self.index.remove(52))
+        self.assertNotIn(52, self.index)
+
+    def test_save_and_load(self):
+        """Testing the compact form round trip"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.json")
+            self.index.save(path)
+            loaded = CmcIdIndex.load(path)
+        self.assertEqual(
+            [record.to_dict() for record in loaded],
+            [record.to_dict() for record in self.index],
+        )
+        self.assertEqual(loaded.get(825).platform_id, 1027)
+        self.assertEqual(loaded.ids_for_symbol("BTC"), [1, 9000])
+
+    def test_concurrent_saves(self):
+        """Testing threads saving the same path don't share a temporary file"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.json")
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda _: self.index.save(path), range(64)))
+            self.assertEqual(len(CmcIdIndex.load(path)), len(self.index))
+            self.assertEqual(os.listdir(directory), ["index.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
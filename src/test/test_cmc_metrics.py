@@ -0,0 +1,153 @@
+"""Testing suite for cmc_metrics.py"""
+
+import asyncio
+import unittest
+import urllib.request
+from unittest import mock
+
+from benchmarks import fixtures
+from cmc_api import cmc, cmc_cache, cmc_utils
+from cmc_api.cmc_helper import Cryptocurrency
+from cmc_api.cmc_metrics import Histogram, Metrics
+from cmc_api.cmc_ratelimit import RateLimiter
+from cmc_api.cmc_retry import RetryPolicy
+from cmc_api.cmc_transport import Cassette, Replayer
+
+
+class MetricsTest(unittest.TestCase):
+    """Testing class for Metrics"""
+
+    def setUp(self):
+        self.metrics = Metrics(latency_buckets=(0.1, 1.0), size_buckets=(1024,))
+
+    def test_histogram_buckets(self):
+        """Testing observations land in the first bucket whose bound they don't exceed"""
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        self.assertEqual(
+            histogram.cumulative(), [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+        )
+        self.assertEqual(histogram.quantile(0.5), 0.1)
+        self.assertEqual(histogram.quantile(0.99), float("inf"))
+
+    def test_snapshot(self):
+        """Testing the snapshot groups the values by endpoint"""
+        self.metrics.observe(Cryptocurrency.LATEST_LIST_PRICE, "parse", 0.05)
+        self.metrics.count_status(Cryptocurrency.LATEST_LIST_PRICE, 200)
+        self.metrics.count_cache_hit(Cryptocurrency.INFO, "memory")
+        self.metrics.count_credits(Cryptocurrency.LATEST_LIST_PRICE, 2)
+        snapshot = self.metrics.snapshot()
+        endpoint = "Cryptocurrency.LATEST_LIST_PRICE"
+        self.assertEqual(snapshot["phase_seconds"][endpoint]["parse"]["count"], 1)
+        self.assertEqual(snapshot["responses"][endpoint], {200: 1})
+        self.assertEqual(snapshot["cache_hits"]["Cryptocurrency.INFO"], {"memory": 1})
+        self.assertEqual(snapshot["credits"][endpoint], 2)
+
+    def test_prometheus_text(self):
+        """Testing the exposition format of histograms and counters"""
+        self.metrics.observe(Cryptocurrency.INFO, "network", 0.5)
+        self.metrics.count_credits(Cryptocurrency.INFO, 1)
+        text = self.metrics.to_prometheus()
+        labels = 'endpoint="Cryptocurrency.INFO",phase="network"'
+        self.assertIn("# TYPE cmc_phase_seconds histogram", text)
+        self.assertIn(f'cmc_phase_seconds_bucket{{{labels},le="0.1"}} 0', text)
+        self.assertIn(f'cmc_phase_seconds_bucket{{{labels},le="+Inf"}} 1', text)
+        self.assertIn(f"cmc_phase_seconds_sum{{{labels}}} 0.5", text)
+        self.assertIn('cmc_credits_total{endpoint="Cryptocurrency.INFO"} 1', text)
+
+    def test_serve(self):
+        """Testing the scrape endpoint serves the text format"""
+        self.metrics.count_status(Cryptocurrency.INFO, 200)
+        server = self.metrics.serve(port=0)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode("utf-8")
+        self.assertEqual(body, self.metrics.to_prometheus())
+
+
+class ClientMetricsTest(unittest.TestCase):
+    """Testing the metrics recorded by Cmc"""
+
+    def test_requests_are_instrumented(self):
+        """Testing a network fetch and a cache hit are both recorded"""
+        body = fixtures.make_listing_bytes(5)
+        metrics = Metrics()
+        with mock.patch.object(cmc_utils, "fetch_raw_data", return_value=(200, body)):
+            client = cmc.Cmc(
+                url="http://localhost",
+                api_key="test",
+                startup="lazy",
+                cache=cmc_cache.MemoryCache(),
+                metrics=metrics,
+            )
+            client.get_listing(1, 5)
+            client.get_listing(1, 5)
+        endpoint = "Cryptocurrency.LATEST_LIST_PRICE"
+        snapshot = metrics.snapshot()
+        self.assertEqual(
+            set(snapshot["phase_seconds"][endpoint]),
+            {"network", "parse", "extract", "total"},
+        )
+        self.assertEqual(snapshot["responses"][endpoint], {200: 1})
+        self.assertEqual(snapshot["cache_hits"][endpoint], {"memory": 1})
+        self.assertEqual(snapshot["response_bytes"][endpoint]["count"], 1)
+        self.assertEqual(snapshot["credits"][endpoint], 1)
+
+    def test_clients_record_the_same_metrics(self):
+        """Testing Cmc and AsyncCmc record every request sent, after the rate limiter, at the same point"""
+        try:
+            from cmc_api.cmc_async import AsyncCmc
+            import aiohttp  # noqa: F401
+        except ImportError:  # pragma: no cover - optional dependency
+            self.skipTest("aiohttp is not installed")
+
+        def options():
+            cassette = Cassette()
+            for status_code, body in (
+                (503, b'{"status": {"error_message": "down", "credit_count": 0}}'),
+                (200, fixtures.make_listing_bytes(5)),
+            ):
+                cassette.add(
+                    "http://localhost/v1/cryptocurrency/listings/latest",
+                    "start=1&limit=5",
+                    status_code,
+                    body,
+                )
+            return {
+                "url": "http://localhost",
+                "api_key": "test",
+                "single_flight": False,
+                "metrics": Metrics(),
+                # the retry waits about 0.1 s for a token
+                "rate_limiter": RateLimiter(requests_per_minute=600, burst=1),
+                "retry_policy": RetryPolicy(base_delay=0.001),
+                "transport": Replayer(cassette),
+            }
+
+        sync_options, async_options = options(), options()
+        cmc.Cmc(startup="lazy", **sync_options).get_listing(1, 5)
+
+        async def fetch():
+            client = AsyncCmc(**async_options)
+            try:
+                await client.get_listing(1, 5)
+            finally:
+                await client.close()
+
+        asyncio.run(fetch())
+        endpoint = "Cryptocurrency.LATEST_LIST_PRICE"
+        for metrics in (sync_options["metrics"], async_options["metrics"]):
+            snapshot = metrics.snapshot()
+            network = snapshot["phase_seconds"][endpoint]["network"]
+            self.assertEqual(network["count"], 2)
+            self.assertLess(network["sum"], 0.05)
+            self.assertEqual(snapshot["responses"][endpoint], {503: 1, 200: 1})
+            self.assertEqual(snapshot["response_bytes"][endpoint]["count"], 2)
+            self.assertEqual(snapshot["credits"][endpoint], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Testing suite for cmc_pagination.py"""
+
+import asyncio
+import unittest
+
+from cmc_api import cmc_pagination
+
+
+def fake_listing(total_rows: int, calls: list):
+    """Build a fetch_page function that serves total_rows rows"""
+
+    def fetch_page(start: int, limit: int) -> dict:
+        calls.append((start, limit))
+        rows = [{"id": i} for i in range(start, min(start + limit, total_rows + 1))]
+        return {"metadata": {}, "data": rows}
+
+    return fetch_page
+
+
+class PaginateTest(unittest.TestCase):
+    """Testing class for paginate()"""
+
+    def test_stops_at_short_page(self):
+        """Testing the iteration stops after the last short page"""
+        calls = []
+        rows = list(cmc_pagination.paginate(fake_listing(25, calls), page_size=10))
+        self.assertEqual([row["id"] for row in rows], list(range(1, 26)))
+        self.assertEqual(calls, [(1, 10), (11, 10), (21, 10)])
+
+    def test_max_rows(self):
+        """Testing the cap on the total number of rows"""
+        calls = []
+        rows = list(
+            cmc_pagination.paginate(fake_listing(100, calls), page_size=10, max_rows=15)
+        )
+        self.assertEqual(len(rows), 15)
+        self.assertEqual(calls, [(1, 10), (11, 5)])
+
+    def test_by_page(self):
+        """Testing the pages are yielded whole"""
+        pages = list(
+            cmc_pagination.paginate(fake_listing(20, []), page_size=10, by_page=True)
+        )
+        self.assertEqual([len(page["data"]) for page in pages], [10, 10, 0])
+
+    def test_error_response_stops(self):
+        """Testing an error response ends the iteration"""
+        rows = list(cmc_pagination.paginate(lambda s, l: {"message": "error"}))
+        self.assertEqual(rows, [])
+
+    def test_apaginate(self):
+        """Testing the async generator version"""
+        fetch_page = fake_listing(25, [])
+
+        async def afetch_page(start, limit):
+            return fetch_page(start, limit)
+
+        async def collect():
+            return [row async for row in cmc_pagination.apaginate(afetch_page, 10)]
+
+        self.assertEqual(len(asyncio.run(collect())), 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Testing suite for cmc_poller.py"""
+
+import asyncio
+import copy
+import queue
+import unittest
+from unittest import mock
+
+from cmc_api import cmc_poller
+from cmc_api.cmc_poller import Poller
+
+
+def response(prices: dict, timestamp: str = "2022-06-04T04:26:55.117Z") -> dict:
+    return {
+        "metadata": {"timestamp": timestamp},
+        "data": {
+            str(cmc_id): {
+                "id": cmc_id,
+                "quote": {
+                    "USD": {"price": price, "last_updated": "2022-06-04T04:26:00.000Z"}
+                },
+            }
+            for cmc_id, price in prices.items()
+        },
+    }
+
+
+class PollerTest(unittest.TestCase):
+    """Testing class for Poller"""
+
+    def setUp(self):
+        self.responses = [
+            response({1: 30000.0, 1027: 1800.0}),
+            response({1: 30000.0, 1027: 1800.0}),
+            response({1: 30100.0, 1027: 1800.0}, "2022-06-04T04:27:55.117Z"),
+            response({1: 30100.0}, "2022-06-04T04:27:55.117Z"),
+        ]
+        self.poller = Poller(lambda: copy.deepcopy(self.responses.pop(0)), interval=0)
+
+    def test_only_changes_are_published(self):
+        """Testing subscribers receive the changed coins and the removed ids"""
+        received = []
+        deltas = queue.Queue()
+        self.poller.subscribe(received.append)
+        self.poller.subscribe(deltas)
+
+        first = self.poller.poll_once()
+        self.assertEqual([coin["id"] for coin in first["changed"]], [1, 1027])
+        self.poller.poll_once()
+        third = self.poller.poll_once()
+        self.assertEqual([coin["id"] for coin in third["changed"]], [1])
+        fourth = self.poller.poll_once()
+        self.assertEqual((fourth["changed"], fourth["removed"]), ([], [1027]))
+
+        self.assertEqual([delta["poll"] for delta in received], [1, 3, 4])
+        self.assertEqual(deltas.qsize(), 3)
+        self.assertEqual(list(self.poller.state), [1])
+
+    def test_failed_poll_and_subscriber(self):
+        """Testing an error response publishes nothing and a failing subscriber does not stop the others"""
+        self.responses.insert(0, {"message": "Timeout"})
+        received = []
+        self.poller.subscribe(lambda delta: 1 / 0)
+        unsubscribe = self.poller.subscribe(received.append)
+        with self.assertLogs("poller", level="ERROR"):
+            self.assertIsNone(self.poller.poll_once())
+            self.poller.poll_once()
+        self.assertEqual(len(received), 1)
+        unsubscribe()
+        self.poller.poll_once()
+        self.poller.poll_once()
+        self.assertEqual(len(received), 1)
+
+    def test_stall_skips_missed_polls(self):
+        """Testing a poll stalled for several intervals is not followed by the missed polls back to back"""
+        clock = [0.0]
+        started = []
+
+        def fetch():
+            started.append(clock[0])
+            if len(started) == 2:
+                # stalled for three and a half intervals
+                clock[0] += 35.0
+            return response({1: 30000.0})
+
+        class Stop:
+            def is_set(self):
+                return len(started) == 5
+
+            def wait(self, seconds):
+                clock[0] += seconds
+
+        poller = Poller(fetch, interval=10.0)
+        poller._stop = Stop()
+        with mock.patch.object(cmc_poller.time, "monotonic", lambda: clock[0]):
+            poller._run()
+        self.assertEqual(started, [0.0, 10.0, 45.0, 55.0, 65.0])
+
+    def test_thread_and_asyncio_queue(self):
+        """Testing the background thread hands the deltas to an asyncio queue"""
+
+        async def consume():
+            deltas = asyncio.Queue()
+            self.poller.subscribe(deltas, loop=asyncio.get_running_loop())
+            with self.poller:
+                first = await asyncio.wait_for(deltas.get(), 5)
+                second = await asyncio.wait_for(deltas.get(), 5)
+            return first, second
+
+        first, second = asyncio.run(consume())
+        self.assertEqual((first["poll"], second["poll"]), (1, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
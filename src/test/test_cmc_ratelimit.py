@@ -0,0 +1,86 @@
+"""Testing suite for cmc_ratelimit.py"""
+
+import unittest
+from unittest import mock
+
+from cmc_api import cmc_ratelimit
+
+KEY_INFO = {
+    "metadata": {"credit_count": 0},
+    "data": {
+        "plan": {
+            "credit_limit_daily": 333,
+            "credit_limit_monthly": 10000,
+            "rate_limit_minute": 30,
+        },
+        "usage": {
+            "current_day": {"credits_used": 330, "credits_left": 3},
+            "current_month": {"credits_used": 1000, "credits_left": 9000},
+        },
+    },
+}
+
+
+class TokenBucketTest(unittest.TestCase):
+    """Testing class for TokenBucket"""
+
+    def test_burst_then_queue(self):
+        """Testing a burst over the capacity is queued at the refill rate"""
+        with mock.patch.object(cmc_ratelimit.time, "monotonic", return_value=0.0):
+            bucket = cmc_ratelimit.TokenBucket(rate_per_minute=60, capacity=2)
+            delays = [bucket.reserve() for _ in range(4)]
+        self.assertEqual(delays, [0.0, 0.0, 1.0, 2.0])
+
+    def test_refill(self):
+        """Testing tokens come back over time"""
+        with mock.patch.object(cmc_ratelimit.time, "monotonic", return_value=0.0):
+            bucket = cmc_ratelimit.TokenBucket(rate_per_minute=60, capacity=1)
+            bucket.reserve()
+        with mock.patch.object(cmc_ratelimit.time, "monotonic", return_value=1.0):
+            self.assertEqual(bucket.reserve(), 0.0)
+
+
+class RateLimiterTest(unittest.TestCase):
+    """Testing class for RateLimiter"""
+
+    def test_from_key_info(self):
+        """Testing the limits are seeded from /v1/key/info"""
+        limiter = cmc_ratelimit.RateLimiter.from_key_info(KEY_INFO)
+        self.assertEqual(limiter.requests_per_minute, 30)
+        # burst + refill per minute never exceeds the plan limit
+        self.assertEqual(
+            limiter.bucket.capacity + limiter.bucket.rate_per_second * 60, 30
+        )
+        self.assertEqual(limiter.budget.remaining(), (3, 9000))
+
+    def test_credit_budget(self):
+        """Testing the credits of the responses are accounted and the budget raises when spent"""
+        limiter = cmc_ratelimit.RateLimiter.from_key_info(KEY_INFO)
+        limiter.record(200, {"metadata": {"credit_count": 3}})
+        self.assertEqual(limiter.budget.remaining(), (0, 8997))
+        with self.assertRaises(cmc_ratelimit.CreditBudgetExceeded):
+            limiter.acquire()
+
+    def test_credits_of_raw_bodies(self):
+        """Testing the credit_count is read from a raw body, wherever its status is"""
+        self.assertEqual(
+            cmc_ratelimit.credit_count(b'{"status": {"credit_count": 2}, "data": []}'),
+            2,
+        )
+        self.assertEqual(
+            cmc_ratelimit.credit_count('{"data": [], "status": {"credit_count":1}}'), 1
+        )
+        self.assertIsNone(cmc_ratelimit.credit_count({"message": "Timeout"}))
+        limiter = cmc_ratelimit.RateLimiter()
+        limiter.record(200, b'{"status": {"credit_count": 4}, "data": {}}')
+        self.assertEqual(limiter.budget.used_today, 4)
+
+    def test_429_pauses_bucket(self):
+        """Testing a 429 drains the bucket"""
+        limiter = cmc_ratelimit.RateLimiter(requests_per_minute=30)
+        limiter.record(429, {"message": "rate limit"})
+        self.assertLess(limiter.bucket.tokens, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+"""Testing suite for cmc_retry.py"""
+
+import asyncio
+import threading
+import time
+import unittest
+
+from cmc_api import cmc_retry
+from cmc_api.cmc_retry import LatencyTracker, RetryBudget, RetryPolicy
+
+ENDPOINT = "https://pro-api.coinmarketcap.com/v2/cryptocurrency/quotes/latest"
+
+
+def warmed_tracker(seconds: float = 0.01, samples: int = 20) -> LatencyTracker:
+    tracker = LatencyTracker(min_samples=samples, min_timeout=0.001)
+    for _ in range(samples):
+        tracker.record(ENDPOINT, seconds)
+    return tracker
+
+
+class LatencyTrackerTest(unittest.TestCase):
+    """Testing class for LatencyTracker"""
+
+    def test_timeout_follows_percentiles(self):
+        """Testing the timeout is the clamped p99 times the multiplier"""
+        tracker = LatencyTracker(min_samples=10, multiplier=2.0, max_timeout=5.0)
+        self.assertEqual(tracker.timeout_for(ENDPOINT), 5.0)
+        for latency in range(1, 101):
+            tracker.record(ENDPOINT, latency / 100)
+        self.assertEqual(tracker.percentile(ENDPOINT, 95), 0.95)
+        self.assertEqual(tracker.timeout_for(ENDPOINT), 1.98)
+        self.assertIsNone(tracker.hedge_delay("other"))
+
+
+class RetryPolicyTest(unittest.TestCase):
+    """Testing class for RetryPolicy"""
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3, base_delay=0.001)
+        self.timeouts = []
+
+    def attempts(self, *responses):
+        responses = list(responses)
+
+        def attempt(timeout):
+            self.timeouts.append(timeout)
+            return responses.pop(0)
+
+        return attempt
+
+    def test_transient_errors_are_retried(self):
+        """Testing a connection error and a 503 are retried until a response comes"""
+        attempt = self.attempts(
+            (400, {"message": "Connection error"}), (503, b""), (200, b"{}")
+        )
+        self.assertEqual(self.policy.run(ENDPOINT, attempt), (200, b"{}"))
+        self.assertEqual(self.policy.retries, 2)
+        self.assertEqual(len(self.timeouts), 3)
+
+    def test_client_errors_and_writes_are_not_retried(self):
+        """Testing a 401 and a non idempotent method are sent once"""
+        attempt = self.attempts((401, b"bad key"))
+        self.assertEqual(self.policy.run(ENDPOINT, attempt), (401, b"bad key"))
+        attempt = self.attempts((503, b""), (200, b"{}"))
+        self.assertEqual(self.policy.run(ENDPOINT, attempt, method="POST"), (503, b""))
+        self.assertEqual(self.policy.retries, 0)
+
+    def test_budget_limits_retries(self):
+        """Testing retries stop when the budget is spent"""
+        policy = RetryPolicy(
+            base_delay=0.001, budget=RetryBudget(ratio=0, min_tokens=1)
+        )
+        attempt = self.attempts((503, b""), (503, b""), (200, b"{}"))
+        self.assertEqual(policy.run(ENDPOINT, attempt), (503, b""))
+        self.assertEqual(policy.retries, 1)
+
+    def test_deadline_bounds_timeouts(self):
+        """Testing the deadline caps the timeout and ends the call once passed"""
+        with cmc_retry.deadline(0.5):
+            self.policy.run(ENDPOINT, self.attempts((200, b"{}")))
+        self.assertLessEqual(self.timeouts[0], 0.5)
+        with cmc_retry.deadline(0):
+            self.assertEqual(
+                self.policy.run(ENDPOINT, self.attempts((200, b"{}"))),
+                (400, {"message": "Deadline exceeded"}),
+            )
+
+    def test_slow_request_is_hedged(self):
+        """Testing a request slower than p95 is raced by a second one and the fastest wins"""
+        policy = RetryPolicy(hedge=True, latency=warmed_tracker())
+        calls = []
+        release = threading.Event()
+
+        def attempt(timeout):
+            calls.append(timeout)
+            if len(calls) == 1:
+                release.wait(1)
+                return 200, b"slow"
+            return 200, b"fast"
+
+        started = time.monotonic()
+        self.assertEqual(policy.run(ENDPOINT, attempt), (200, b"fast"))
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(policy.hedges, 1)
+        release.set()
+
+    def test_admit_is_not_timed(self):
+        """Testing the wait in admit neither counts in the latency nor triggers a hedge"""
+        tracker = warmed_tracker()
+        policy = RetryPolicy(hedge=True, latency=tracker)
+        responses = []
+
+        def attempt(timeout):
+            return 200, b"{}"
+
+        def on_response(status_code, raw_response, seconds):
+            responses.append(seconds)
+
+        self.assertEqual(
+            policy.run(
+                ENDPOINT,
+                attempt,
+                admit=lambda: time.sleep(0.1),
+                on_response=on_response,
+            ),
+            (200, b"{}"),
+        )
+        self.assertEqual(policy.hedges, 0)
+        self.assertEqual(len(responses), 1)
+        self.assertLess(responses[0], 0.05)
+        self.assertLess(tracker.percentile(ENDPOINT, 100), 0.05)
+
+    def test_hedge_that_lost_is_accounted(self):
+        """Testing on_response sees both requests of a hedged call"""
+        policy = RetryPolicy(hedge=True, latency=warmed_tracker())
+        release = threading.Event()
+        responses = []
+
+        def attempt(timeout):
+            if not responses and not release.is_set():
+                release.set()
+                time.sleep(0.2)
+                return 200, b"slow"
+            return 200, b"fast"
+
+        def on_response(status_code, raw_response, seconds):
+            responses.append(raw_response)
+
+        self.assertEqual(
+            policy.run(ENDPOINT, attempt, on_response=on_response), (200, b"fast")
+        )
+        time.sleep(0.3)
+        self.assertEqual(responses, [b"fast", b"slow"])
+
+
+class AsyncRetryPolicyTest(unittest.IsolatedAsyncioTestCase):
+    """Testing class for RetryPolicy.arun"""
+
+    async def test_timeout_cancels_and_retries(self):
+        """Testing a stalled attempt is cancelled at its timeout and retried"""
+        policy = RetryPolicy(base_delay=0.001, latency=warmed_tracker())
+        calls = []
+
+        async def attempt():
+            calls.append(1)
+            if len(calls) == 1:
+                await asyncio.sleep(10)
+            return 200, {"data": 1}
+
+        self.assertEqual(await policy.arun(ENDPOINT, attempt), (200, {"data": 1}))
+        self.assertEqual(policy.retries, 1)
+
+    async def test_hedge_cancels_the_loser(self):
+        """Testing the slower of two hedged requests is cancelled"""
+        policy = RetryPolicy(hedge=True, latency=warmed_tracker())
+        cancelled = []
+
+        async def attempt():
+            if not cancelled:
+                cancelled.append(False)
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled[0] = True
+                    raise
+            return 200, {"data": "fast"}
+
+        self.assertEqual(await policy.arun(ENDPOINT, attempt), (200, {"data": "fast"}))
+        await asyncio.sleep(0.01)
+        self.assertEqual(cancelled, [True])
+
+    async def test_admit_is_not_timed(self):
+        """Testing requests queued in admit do not time out and the first one is not hedged while queued"""
+        # timeout 0.15 s and hedge after 0.05 s, the ten requests take 0.2 s one at a time
+        policy = RetryPolicy(hedge=True, latency=warmed_tracker(0.05), base_delay=0.001)
+        slot = asyncio.Semaphore(1)
+        responses = []
+
+        async def attempt():
+            await asyncio.sleep(0.02)
+            return 200, {"data": 1}
+
+        def on_response(status_code, response, seconds):
+            responses.append(status_code)
+
+        results = await asyncio.gather(
+            *(
+                policy.arun(
+                    ENDPOINT, attempt, admit=lambda: slot, on_response=on_response
+                )
+                for _ in range(10)
+            )
+        )
+        self.assertEqual(results, [(200, {"data": 1})] * 10)
+        self.assertEqual((policy.retries, policy.hedges), (0, 0))
+        self.assertEqual(responses, [200] * 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""Testing suite for cmc_singleflight.py"""
+
+import asyncio
+import threading
+import time
+import unittest
+
+from cmc_api.cmc_singleflight import AsyncSingleFlight, SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+    """Testing class for SingleFlight"""
+
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.calls = 0
+
+    def slow_fetch(self):
+        self.calls += 1
+        time.sleep(0.05)
+        return {"data": self.calls}
+
+    def test_concurrent_calls_share_one_fetch(self):
+        """Testing threads asking for the same key get the result of one fetch"""
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(self.flight.do("key", self.slow_fetch))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(self.flight.shared, 4)
+        self.assertEqual(len(self.flight), 0)
+
+    def test_error_reaches_every_caller(self):
+        """Testing an error of the fetch is raised in every waiting thread"""
+        started = threading.Event()
+        errors = []
+
+        def failing_fetch():
+            started.set()
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        def call():
+            try:
+                self.flight.do("key", failing_fetch)
+            except ValueError as error:
+                errors.append(error)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=call)
+        follower.start()
+        leader.join()
+        follower.join()
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(len(self.flight), 0)
+
+    def test_sequential_calls_fetch_again(self):
+        """Testing a finished flight is not reused"""
+        self.flight.do("key", self.slow_fetch)
+        self.flight.do("key", self.slow_fetch)
+        self.assertEqual(self.calls, 2)
+
+
+class AsyncSingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    """Testing class for AsyncSingleFlight"""
+
+    async def test_gathered_calls_share_one_fetch(self):
+        """Testing gathered calls for one key await a single fetch"""
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"data": len(calls)}
+
+        results = await asyncio.gather(
+            *(flight.do("key", fetch) for _ in range(4)), flight.do("other", fetch)
+        )
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(all(result is results[0] for result in results[:4]))
+        self.assertEqual(flight.shared, 3)
+        self.assertEqual(len(flight), 0)
+
+    async def test_cancelled_caller_does_not_cancel_flight(self):
+        """Testing the flight goes on for the others when one caller is cancelled"""
+        flight = AsyncSingleFlight()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("key", fetch))
+        second = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, "done")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""Testing suite for cmc_snapshot.py"""
+
+import gzip
+import os
+import tempfile
+import unittest
+
+from benchmarks.fixtures import listing_response
+from cmc_api.cmc_snapshot import SnapshotStore
+
+
+class SnapshotStoreTest(unittest.TestCase):
+    """Testing class for SnapshotStore"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.store = SnapshotStore(self.directory.name, block_size=4)
+        self.addCleanup(self.store.close)
+        self.responses = [
+            listing_response(10, f"2022-06-04T0{hour}:00:00.000Z", seed=hour)
+            for hour in range(3)
+        ]
+        for response in self.responses:
+            self.store.append(response)
+
+    def test_snapshots_are_appended_not_overwritten(self):
+        """Testing several snapshots of the same day are kept"""
+        snapshots = self.store.snapshots(endpoint="listing")
+        self.assertEqual(len(snapshots), 3)
+        self.assertEqual(snapshots[1]["timestamp"], "2022-06-04T01:00:00.000Z")
+        self.assertEqual(snapshots[1]["metadata"]["credit_count"], 1)
+        # the same response again is not a new snapshot
+        self.assertEqual(self.store.append(self.responses[0]), snapshots[0]["id"])
+
+    def test_read_range_and_coins(self):
+        """Testing a time range for a subset of coins"""
+        rows = list(
+            self.store.read(
+                start="2022-06-04T00:30:00Z",
+                end="2022-06-04T02:00:00Z",
+                coin_ids=[2, 9],
+            )
+        )
+        self.assertEqual(
+            [(timestamp, coin["id"]) for timestamp, coin in rows],
+            [
+                ("2022-06-04T01:00:00.000Z", 2),
+                ("2022-06-04T01:00:00.000Z", 9),
+                ("2022-06-04T02:00:00.000Z", 2),
+                ("2022-06-04T02:00:00.000Z", 9),
+            ],
+        )
+        self.assertEqual(rows[1][1], self.responses[1]["data"][8])
+
+    def test_chunks_are_gzip_files(self):
+        """Testing the chunk files can be read with gzip"""
+        (chunk,) = [
+            name
+            for name in os.listdir(self.directory.name)
+            if name.endswith(".jsonl.gz")
+        ]
+        with gzip.open(os.path.join(self.directory.name, chunk)) as file:
+            self.assertEqual(file.read().count(b'"quote"'), 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Testing suite for cmc_stream.py"""
+
+import json
+import unittest
+from unittest import mock
+
+from benchmarks import fixtures
+from cmc_api import cmc_stream, cmc_utils
+from cmc_api.cmc_stream import StreamParser, StreamedResponse
+
+
+def chunked(body: bytes, size: int):
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+class StreamParserTest(unittest.TestCase):
+    """Testing class for StreamParser"""
+
+    def test_items_match_a_full_parse(self):
+        """Testing every chunk size gives the items of json.loads"""
+        body = fixtures.make_listing_bytes(20)
+        expected = json.loads(body)
+        for size in (1, 7, 1000, len(body)):
+            with self.subTest(chunk_size=size):
+                stream = StreamedResponse(chunked(body, size))
+                self.assertEqual(list(stream), expected["data"])
+                self.assertEqual(stream.status, expected["status"])
+                self.assertEqual(stream.metadata["items"], 20)
+                self.assertEqual(
+                    stream.metadata["list_keys"], list(expected["data"][0])
+                )
+
+    def test_items_come_before_the_end_of_the_body(self):
+        """Testing an item is handed out as soon as it is complete, status can come last"""
+        parser = StreamParser()
+        self.assertEqual(parser.feed(b'{"data": [{"id": 1}, {"id"'), [{"id": 1}])
+        self.assertIsNone(parser.metadata)
+        self.assertEqual(
+            parser.feed(b': 2}], "status": {"credit_count": 1'), [{"id": 2}]
+        )
+        self.assertEqual(parser.feed(b"}}"), [])
+        self.assertEqual(parser.close(), [])
+        self.assertEqual(parser.metadata["credit_count"], 1)
+
+    def test_numbers_split_between_chunks(self):
+        """Testing a number at the end of a chunk is not cut"""
+        parser = StreamParser()
+        items = parser.feed(b'{"data": [12') + parser.feed(b"34, 5]}")
+        items += parser.close()
+        self.assertEqual(items, [1234, 5])
+
+    def test_dict_data(self):
+        """Testing data as a dict gives (key, value) items"""
+        stream = StreamedResponse(chunked(b'{"data": {"1": {"id": 1}, "2": {}}}', 3))
+        self.assertEqual(list(stream), [("1", {"id": 1}), ("2", {})])
+
+    def test_truncated_body(self):
+        """Testing a body cut in the middle is an error"""
+        stream = StreamedResponse([b'{"data": [{"id": 1}, {"id": 2'])
+        with self.assertRaises(ValueError):
+            list(stream)
+
+
+class OpenStreamTest(unittest.TestCase):
+    """Testing class for open_stream"""
+
+    def test_stream_and_close(self):
+        """Testing the body is read in chunks and the connection released"""
+        body = fixtures.make_listing_bytes(3)
+        map_resp = mock.Mock(status_code=200)
+        map_resp.iter_content.return_value = iter(chunked(body, 100))
+        session = mock.Mock()
+        session.get.return_value = map_resp
+        completed = []
+
+        status_code, stream = cmc_stream.open_stream(
+            session, "http://localhost/v1/x", "", on_complete=completed.append
+        )
+        self.assertEqual(status_code, 200)
+        self.assertEqual(len(list(stream)), 3)
+        session.get.assert_called_once_with(
+            url="http://localhost/v1/x",
+            params="",
+            stream=True,
+            timeout=cmc_utils.DEFAULT_TIMEOUT,
+        )
+        map_resp.close.assert_called_once()
+        self.assertEqual(completed, [stream.metadata])
+
+    def test_error_status(self):
+        """Testing an error response gives the message like fetch_data"""
+        map_resp = mock.Mock(status_code=401)
+        map_resp.content = b'{"status": {"error_message": "bad key"}}'
+        session = mock.Mock()
+        session.get.return_value = map_resp
+
+        status_code, response = cmc_stream.open_stream(session, "http://x", "")
+        self.assertEqual((status_code, response), (401, {"message": "bad key"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+"""Testing suite for cmc_transport.py"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from benchmarks import fixtures
+from cmc_api import cmc
+from cmc_api.cmc_retry import LatencyTracker, RetryPolicy
+from cmc_api.cmc_transport import (
+    Cassette,
+    Recorder,
+    RecordingSession,
+    Replayer,
+    ReplayResponse,
+)
+
+URL = "http://localhost"
+
+
+class FakeSession:
+    """Live session stand-in, answers every request with a listing"""
+
+    def __init__(self):
+        self.headers = {}
+        self.calls = 0
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        self.calls += 1
+        return ReplayResponse(200, fixtures.make_listing_bytes(3), url)
+
+
+class TransportTest(unittest.TestCase):
+    """Testing class for Recorder and Replayer"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "listing.json.gz")
+
+    def record(self) -> dict:
+        recorder = Recorder(self.path)
+        client = cmc.Cmc(url=URL, api_key="test", startup="lazy", transport=recorder)
+        client.request_session.session = FakeSession()
+        response = client.get_listing(1, 3)
+        recorder.save()
+        return response
+
+    def replayed_client(self, **kwargs) -> cmc.Cmc:
+        return cmc.Cmc(
+            url=URL,
+            api_key="test",
+            startup="lazy",
+            single_flight=False,
+            transport=Replayer(self.path, **kwargs),
+        )
+
+    def test_record_then_replay(self):
+        """Testing a replayed client returns the recorded response without network"""
+        recorded = self.record()
+        cassette = Cassette(self.path)
+        self.assertEqual(len(cassette), 1)
+        client = self.replayed_client()
+        self.assertEqual(client.get_listing(1, 3), recorded)
+        self.assertEqual(
+            client.get_listing(1, 4),
+            {
+                "message": "No recorded response for "
+                f"{URL}/v1/cryptocurrency/listings/latest?start=1&limit=4"
+            },
+        )
+
+    def test_replay_throughput(self):
+        """Testing the pipeline runs at memory speed on a replayed cassette"""
+        self.record()
+        client = self.replayed_client()
+        started = time.perf_counter()
+        for _ in range(200):
+            client.get_listing(1, 3)
+        self.assertLess(time.perf_counter() - started, 2.0)
+        self.assertEqual(client.transport.requests, 200)
+
+    def test_error_injection(self):
+        """Testing injected errors go through the usual error handling"""
+        self.record()
+        client = self.replayed_client(error_rate=1.0, errors=("connection",))
+        self.assertEqual(client.get_listing(1, 3), {"message": "Connection error"})
+        client = self.replayed_client(error_rate=1.0, errors=(503,))
+        self.assertEqual(client.get_listing(1, 3), {"message": "Injected 503"})
+        self.assertEqual(client.transport.injected, 1)
+
+    def test_latency_past_timeout(self):
+        """Testing a simulated latency longer than the read timeout times out"""
+        self.record()
+        client = self.replayed_client(latency=0.05)
+        session = client.request_session
+        with self.assertRaises(Exception) as context:
+            session.get(
+                f"{URL}/v1/cryptocurrency/listings/latest",
+                "start=1&limit=3",
+                timeout=(1, 0.01),
+            )
+        self.assertEqual(type(context.exception).__name__, "ReadTimeout")
+
+    def test_concurrent_autosave(self):
+        """Testing responses recorded from threads are all saved, by a few whole file writes"""
+        recorder = Recorder(self.path, autosave=True, autosave_interval=0.05)
+        session = RecordingSession(FakeSession(), recorder)
+        saves = []
+        save = recorder.cassette.save
+
+        def counted_save(path=None):
+            saves.append(1)
+            save(path)
+
+        def record(thread):
+            for start in range(50):
+                session.get(URL, f"thread={thread}&start={start}")
+                if start % 10 == 0:
+                    # saves of several threads at once
+                    recorder.cassette.save()
+
+        with mock.patch.object(recorder.cassette, "save", side_effect=counted_save):
+            threads = [
+                threading.Thread(target=record, args=(thread,)) for thread in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            autosaves = len(saves) - 40
+            recorder.save()
+        self.assertEqual(len(Cassette(self.path)), 400)
+        self.assertLess(autosaves, 20)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["listing.json.gz"])
+
+
+class AsyncTransportTest(unittest.IsolatedAsyncioTestCase):
+    """Testing a replayed AsyncCmc"""
+
+    async def test_async_replay(self):
+        """Testing AsyncCmc serves a cassette without opening a connection"""
+        try:
+            from cmc_api.cmc_async import AsyncCmc
+            import aiohttp  # noqa: F401
+        except ImportError:  # pragma: no cover - optional dependency
+            self.skipTest("aiohttp is not installed")
+        cassette = Cassette()
+        cassette.add(
+            f"{URL}/v1/cryptocurrency/listings/latest",
+            "start=1&limit=3",
+            200,
+            fixtures.make_listing_bytes(3),
+        )
+        client = AsyncCmc(url=URL, api_key="test", transport=Replayer(cassette))
+        response = await client.get_listing(1, 3)
+        self.assertEqual(len(response["data"]), 3)
+        stream = await client.stream_listing(1, 3)
+        self.assertEqual(len([coin async for coin in stream]), 3)
+        await client.close()
+
+    async def test_queued_calls_are_not_timed_out(self):
+        """Testing calls waiting for a max_in_flight slot are neither timed out nor retried"""
+        try:
+            from cmc_api.cmc_async import AsyncCmc
+            import aiohttp  # noqa: F401
+        except ImportError:  # pragma: no cover - optional dependency
+            self.skipTest("aiohttp is not installed")
+        cassette = Cassette()
+        cassette.add(
+            f"{URL}/v1/cryptocurrency/listings/latest",
+            "start=1&limit=3",
+            200,
+            fixtures.make_listing_bytes(3),
+        )
+        # eight requests of 0.05 s one at a time take 0.4 s, the timeout of each is 0.15 s
+        policy = RetryPolicy(
+            base_delay=0.001, latency=LatencyTracker(min_timeout=0.01, max_timeout=0.15)
+        )
+        transport = Replayer(cassette, latency=0.05)
+        client = AsyncCmc(
+            url=URL,
+            api_key="test",
+            max_in_flight=1,
+            single_flight=False,
+            retry_policy=policy,
+            transport=transport,
+        )
+        try:
+            responses = await asyncio.gather(
+                *(client.get_listing(1, 3) for _ in range(8))
+            )
+        finally:
+            await client.close()
+        self.assertEqual([len(response["data"]) for response in responses], [3] * 8)
+        self.assertEqual((policy.retries, transport.requests), (0, 8))
+
+
+if __name__ == "__main__":
+    unittest.main()
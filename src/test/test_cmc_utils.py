@@ -34,6 +34,50 @@ class CmcUtilsTest(unittest.TestCase):
         )
         self.assertNotIsInstance(obj=configuration, cls=configparser.SectionProxy)
 
+    def test_save_dict_value_from_threads(self):
+        """Testing concurrent updates of the configuration file are not lost or interleaved"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        cmc_utils.create_config_file()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(
+                executor.map(
+                    lambda n: cmc_utils.save_dict_value_to_configuration_file(
+                        {f"key_{n}": n}
+                    ),
+                    range(32),
+                )
+            )
+        _, configuration = cmc_utils.read_configuration_file()
+        for n in range(32):
+            self.assertEqual(configuration[f"key_{n}"], str(n))
+        self.assertEqual(
+            [name for name in os.listdir(".") if name.endswith(".tmp")], []
+        )
+
+    def test_temporary_name_is_unique_per_process(self):
+        """Testing the temporary file of a swap carries the process id, processes never share it"""
+        cmc_utils.create_config_file()
+        name = cmc_utils.temporary_name("config.ini")
+        self.assertIn(f".{os.getpid()}.", name)
+        self.assertTrue(name.startswith("config.ini.") and name.endswith(".tmp"))
+
+    def test_get_cmc_ids_from_threads(self):
+        """Testing threads reading the ids memo get the ids of the mapping file"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        cmc_utils.create_config_file()
+        created = not os.path.isdir("json_files")
+        cmc_utils.save_to_json("cmc_ids_mapping", {"data": [{"id": 1}, {"id": 1027}]})
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                ids = set(executor.map(lambda _: cmc_utils.get_cmc_ids(), range(32)))
+        finally:
+            os.remove("json_files/cmc_ids_mapping.json")
+            if created:
+                os.rmdir("json_files")
+        self.assertEqual(ids, {"1,1027"})
+
     def tearDown(self) -> None:
         os.remove("config.ini")
         # TODO: remove logs folder and the content, now i have an error that said
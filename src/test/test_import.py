@@ -0,0 +1,20 @@
+"""Import-time regression guard, see benchmarks/bench_import.py"""
+
+import unittest
+
+from benchmarks import bench_import
+
+
+class ImportTest(unittest.TestCase):
+    """Importing the package must be cheap and free of side effects"""
+
+    def test_import_cmc_has_no_side_effects(self):
+        """Testing import cmc_api.cmc loads no heavy module, handler or file"""
+        result = bench_import.probe("cmc_api.cmc")
+        self.assertEqual(result["heavy"], [])
+        self.assertEqual(result["handlers"], 0)
+        self.assertEqual(result["created"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()